@@ -1,7 +1,13 @@
+import os
 import streamlit as st
+from qqa import warmup
 
 st.set_page_config(page_title="Quantum Quotient Analytics", layout="wide")
 
+# Load the heavy libraries in the background while the landing page is read
+if os.environ.get("QQA_WARMUP"):
+    warmup.start()
+
 st.title("📊 Quantum Quotient Analytics")
 
 st.write("Welcome to the **Quantum Quotient Analytics** dashboard! Navigate using the sidebar.")
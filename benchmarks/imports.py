@@ -0,0 +1,73 @@
+"""Import-time budget check for the Streamlit pages.
+
+Each page's top-level imports are timed in a fresh interpreter, after the
+modules every page needs anyway (streamlit, numpy, pandas) are loaded, so the
+figure is what that page adds to a cold replica's first request::
+
+    python -m benchmarks.imports                 # report, fail over budget
+    python -m benchmarks.imports --budget 0.3
+
+Heavy libraries (scipy, statsmodels, scikit-learn) belong inside the
+sections that use them, not at the top of a page.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_MODULES = ["streamlit", "numpy", "pandas"]
+DEFAULT_BUDGET = 0.25
+
+_TIMER = """
+import json, time
+{baseline}
+started = time.perf_counter()
+{imports}
+print(json.dumps(time.perf_counter() - started))
+"""
+
+
+def page_imports(path):
+    """Source of the module-level import statements of ``path``."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def time_imports(statements, repeat=3):
+    """Best-of-``repeat`` seconds for ``statements`` in a fresh interpreter."""
+    code = _TIMER.format(baseline="\n".join(f"import {m}" for m in BASELINE_MODULES), imports="\n".join(statements))
+    best = float("inf")
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        best = min(best, json.loads(result.stdout))
+    return best
+
+
+def pages():
+    return [ROOT / "Home.py"] + sorted((ROOT / "pages").glob("*.py"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check per-page import time against a budget.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds allowed per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    over = []
+    for page in pages():
+        seconds = time_imports(page_imports(page), args.repeat)
+        flag = "OVER BUDGET" if seconds > args.budget else ""
+        print(f"{page.relative_to(ROOT).as_posix():<55} {seconds:7.3f}s {flag}")
+        if flag:
+            over.append(page.name)
+    if over:
+        print(f"{len(over)} page(s) over the {args.budget:.2f}s import budget: {', '.join(over)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""Offline benchmarks for the indicator, decomposition, modeling and chart hot paths.
+
+Everything runs on seeded synthetic random walks, so no network access is
+needed and runs are comparable across machines and commits::
+
+    python -m benchmarks.run                      # 1K, 100K and 10M bars
+    python -m benchmarks.run --sizes 1000 100000  # skip the 10M tier
+    python -m benchmarks.run --save-baseline      # store results as the baseline
+    python -m benchmarks.run --compare            # fail if anything regressed
+
+Results are written as JSON (``--output``); ``--compare`` prints the ratio of
+each timing to the stored baseline and exits non-zero when one is slower than
+``--threshold`` times its baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_SIZES = [1_000, 100_000, 10_000_000]
+# Cases that are too slow to be useful above this many bars are skipped there
+MODEL_MAX_BARS = 100_000
+DECOMPOSE_MAX_BARS = 10_000_000
+STL_MAX_BARS = 100_000
+FIGURE_MAX_BARS = 1_000_000
+STREAM_BARS = 100_000
+SURFACE_MAX_BARS = 100_000
+UNIVERSE_SYMBOLS = 50
+UNIVERSE_BARS = 2_520  # ten years of trading days
+FETCH_SESSIONS = 16
+FETCH_SYMBOLS = 8
+
+
+def timed(func, repeat):
+    """Best wall-clock time of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def repeats_for(bars):
+    return 5 if bars <= 10_000 else 3 if bars <= 1_000_000 else 1
+
+
+def bench_indicators(bars, data, results):
+    from qqa.indicators import INDICATORS, IndicatorSet
+
+    repeat = repeats_for(bars)
+    for name in INDICATORS:
+        # A fresh IndicatorSet per call so shared intermediates are not reused between timings
+        seconds = timed(lambda: IndicatorSet(*data.values()).compute([name]), repeat)
+        results.append({"name": f"indicators.{name}", "bars": bars, "seconds": seconds})
+    if bars <= FIGURE_MAX_BARS:
+        seconds = timed(lambda: IndicatorSet(*data.values()).compute(), repeat)
+        results.append({"name": "indicators.all", "bars": bars, "seconds": seconds})
+
+
+def bench_streaming(results):
+    from qqa.streaming import StreamingIndicators
+    from qqa.synthetic import random_walk_arrays
+
+    data = random_walk_arrays(STREAM_BARS, seed=1)
+    bars = list(zip(*(column.tolist() for column in data.values())))
+
+    def run():
+        stream = StreamingIndicators()
+        for bar in bars:
+            stream.update(*bar)
+
+    results.append({"name": "streaming.update", "bars": STREAM_BARS, "seconds": timed(run, 1)})
+
+
+def bench_surface(bars, data, results):
+    from qqa.masurface import MASurface
+
+    if bars > SURFACE_MAX_BARS:
+        return
+    close = data["Close"]
+    repeat = repeats_for(bars)
+    results.append({"name": "masurface.build", "bars": bars,
+                    "seconds": timed(lambda: MASurface.build(close), repeat)})
+    surface = MASurface.build(close)
+    results.append({"name": "masurface.lookup", "bars": bars,
+                    "seconds": timed(lambda: [surface.sma(p) for p in surface.periods], repeat) / len(surface.periods)})
+    results.append({"name": "masurface.crossover_sweep.step5", "bars": bars,
+                    "seconds": timed(lambda: surface.crossover_sweep(close, step=5), repeat)})
+
+
+def bench_decomposition(bars, data, results):
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
+    if bars > DECOMPOSE_MAX_BARS:
+        return
+    close = pd.Series(data["Close"])
+    seconds = timed(lambda: seasonal_decompose(close, model="multiplicative", period=30), repeats_for(bars))
+    results.append({"name": "decomposition.seasonal_decompose", "bars": bars, "seconds": seconds})
+
+    from qqa.decomposition import DecompositionCache, decompose
+
+    close.index = pd.date_range("2000-01-03", periods=bars, freq="min")
+    seconds = timed(lambda: decompose(close, [30]), repeats_for(bars))
+    results.append({"name": "decomposition.classical", "bars": bars, "seconds": seconds})
+    if bars > STL_MAX_BARS:
+        return
+    seconds = timed(lambda: decompose(close, [30], "stl"), 1)
+    results.append({"name": "decomposition.stl", "bars": bars, "seconds": seconds})
+
+    def extend():
+        cache = DecompositionCache()
+        cache.get("BENCH", close.iloc[:-5], [30], "stl")
+        started = time.perf_counter()
+        cache.get("BENCH", close, [30], "stl")
+        return time.perf_counter() - started
+
+    results.append({"name": "decomposition.stl_extend", "bars": bars, "seconds": extend()})
+
+
+def bench_model(bars, data, results):
+    from sklearn.ensemble import RandomForestRegressor
+
+    if bars > MODEL_MAX_BARS:
+        return
+    close = pd.Series(data["Close"])
+    features = pd.DataFrame({
+        "Prev Close": close.shift(1),
+        "MA50": close.rolling(50).mean(),
+        "Open": data["Open"],
+    }).iloc[200:]
+    target = close.iloc[200:]
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    results.append({"name": "model.fit", "bars": bars,
+                    "seconds": timed(lambda: model.fit(features, target), 1)})
+    seconds = timed(lambda: model.predict(features), repeats_for(bars))
+    results.append({"name": "model.predict", "bars": bars, "seconds": seconds,
+                    "rows_per_second": len(features) / seconds})
+
+
+def bench_figures(bars, data, results):
+    import plotly.graph_objects as go
+
+    from qqa.plotting import aggregate_ohlc, downsample_figure, prepare_figure
+
+    if bars > FIGURE_MAX_BARS:
+        return
+    dates = pd.date_range("2000-01-03", periods=bars, freq="B" if bars < 50_000 else "min")
+    repeat = repeats_for(bars)
+
+    def line_figure():
+        return go.Figure([go.Scatter(x=dates, y=data["Close"], mode="lines"),
+                          go.Scatter(x=dates, y=data["Open"], mode="lines")])
+
+    results.append({"name": "figure.line.json", "bars": bars,
+                    "seconds": timed(lambda: line_figure().to_json(), repeat),
+                    "bytes": len(line_figure().to_json())})
+    reduced = downsample_figure(line_figure()).to_json()
+    results.append({"name": "figure.line.downsampled.json", "bars": bars,
+                    "seconds": timed(lambda: downsample_figure(line_figure()).to_json(), repeat),
+                    "bytes": len(reduced)})
+    prepared = prepare_figure(line_figure()).to_json()
+    results.append({"name": "figure.line.prepared.json", "bars": bars,
+                    "seconds": timed(lambda: prepare_figure(line_figure()).to_json(), repeat),
+                    "bytes": len(prepared)})
+    frame = pd.DataFrame(data).assign(Date=dates)
+
+    def candles():
+        bars_, _ = aggregate_ohlc(frame)
+        return go.Figure(go.Candlestick(x=bars_["Date"], open=bars_["Open"], high=bars_["High"],
+                                        low=bars_["Low"], close=bars_["Close"])).to_json()
+
+    results.append({"name": "figure.candlestick.aggregated.json", "bars": bars,
+                    "seconds": timed(candles, repeat), "bytes": len(candles())})
+
+
+def bench_universe(results):
+    from qqa.indicators import IndicatorSet
+    from qqa.screener import SCREEN_INDICATORS
+    from qqa.synthetic import random_walk_universe
+
+    panel = random_walk_universe(UNIVERSE_SYMBOLS, UNIVERSE_BARS)
+    seconds = timed(lambda: IndicatorSet.from_panel(panel).compute(SCREEN_INDICATORS), 3)
+    results.append({"name": "universe.screen", "bars": UNIVERSE_BARS * UNIVERSE_SYMBOLS, "seconds": seconds})
+
+    from qqa.correlation import RollingMatrices
+
+    returns = pd.DataFrame(panel["Close"]).pct_change()
+    seconds = timed(lambda: RollingMatrices.build(returns, 60), 3)
+    results.append({"name": "universe.rolling_correlation", "bars": UNIVERSE_BARS * UNIVERSE_SYMBOLS,
+                    "seconds": seconds})
+
+    import plotly.graph_objects as go
+
+    from qqa.plotting import downsample_figure, figure, prepare_figure, wall_clock
+
+    # The Comparative Analysis chart: one line per symbol over shared, time-zone aware dates
+    closes = pd.DataFrame(panel["Close"], index=pd.bdate_range("2015-01-01", periods=UNIVERSE_BARS, tz="Asia/Kolkata"))
+
+    def comparison():
+        # As the page built it before the shared figure factory
+        fig = go.Figure()
+        for symbol in closes:
+            fig.add_trace(go.Scatter(x=closes.index, y=closes[symbol], mode="lines"))
+        return downsample_figure(fig).to_json()
+
+    def prepared_comparison():
+        fig = figure()
+        for symbol in closes:
+            fig.add_trace(go.Scatter(x=wall_clock(closes.index), y=closes[symbol], mode="lines"))
+        return prepare_figure(fig).to_json()
+
+    for name, build in (("downsampled", comparison), ("prepared", prepared_comparison)):
+        results.append({"name": f"figure.comparison.{name}.json", "bars": UNIVERSE_BARS * UNIVERSE_SYMBOLS,
+                        "seconds": timed(build, 1), "bytes": len(build())})
+
+
+def bench_cache(results):
+    import qqa.data
+    from qqa.providers import SyntheticProvider, get_provider, set_provider
+
+    original = qqa.data.CACHE_DIR, get_provider()
+    with tempfile.TemporaryDirectory() as directory:
+        qqa.data.CACHE_DIR = Path(directory)
+        set_provider(SyntheticProvider())
+        try:
+            bars = len(qqa.data.load_history("BENCH", "2014-01-01", "2024-01-01"))
+
+            def warm_disk():
+                qqa.data._memory.clear()
+                qqa.data.load_history("BENCH", "2014-01-01", "2024-01-01")
+
+            results.append({"name": "data.load_history.warm_disk", "bars": bars, "seconds": timed(warm_disk, 5)})
+            results.append({"name": "data.load_history.warm_memory", "bars": bars,
+                            "seconds": timed(lambda: qqa.data.load_history("BENCH", "2014-01-01", "2024-01-01"), 5)})
+        finally:
+            qqa.data.CACHE_DIR, provider = original
+            set_provider(provider)
+            qqa.data._memory.clear()
+
+
+def bench_fetch(results):
+    """Sessions opening the same symbols at once against a throttled stand-in API."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from qqa.providers import SimulatedProvider
+    from qqa.upstream import FetchCoordinator
+
+    provider = SimulatedProvider(latency=0.05, rate=20)
+    coordinator = FetchCoordinator(rate=20, burst=20, provider=provider)
+    symbols = [f"BENCH{i}" for i in range(FETCH_SYMBOLS)]
+
+    def session(_):
+        for symbol in symbols:
+            coordinator.history(symbol, "2023-01-01", "2024-01-01")
+
+    def run():
+        with ThreadPoolExecutor(FETCH_SESSIONS) as pool:
+            list(pool.map(session, range(FETCH_SESSIONS)))
+
+    results.append({"name": "upstream.concurrent_sessions", "bars": FETCH_SESSIONS * FETCH_SYMBOLS,
+                    "seconds": timed(run, 1), "upstream_calls": provider.calls,
+                    "throttled": provider.throttled, "retries": coordinator.retried})
+
+
+def run(sizes):
+    from qqa.synthetic import random_walk_arrays
+
+    results = []
+    for bars in sizes:
+        data = random_walk_arrays(bars, seed=0)
+        print(f"{bars:,} bars", file=sys.stderr)
+        bench_indicators(bars, data, results)
+        bench_surface(bars, data, results)
+        bench_decomposition(bars, data, results)
+        bench_model(bars, data, results)
+        bench_figures(bars, data, results)
+        del data
+    bench_streaming(results)
+    bench_universe(results)
+    bench_cache(results)
+    bench_fetch(results)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print timing ratios against ``baseline``; return the names that regressed."""
+    previous = {(r["name"], r["bars"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["bars"]))
+        if not before:
+            continue
+        ratio = result["seconds"] / before
+        flag = "REGRESSED" if ratio > threshold else ""
+        print(f"{result['name']:<40} {result['bars']:>12,} {before:>10.4f}s {result['seconds']:>10.4f}s "
+              f"{ratio:>6.2f}x {flag}")
+        if flag:
+            regressions.append(f"{result['name']}@{result['bars']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="bar counts to benchmark")
+    parser.add_argument("--output", type=Path, default=HERE / "results.json")
+    parser.add_argument("--baseline", type=Path, default=HERE / "baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="also store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(HERE.parent))
+    report = {
+        "meta": {
+            "created": pd.Timestamp.now(tz="UTC").isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": run(args.sizes),
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        if not args.baseline.exists():
+            parser.error(f"no baseline at {args.baseline}; run with --save-baseline first")
+        regressions = compare(report["results"], json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
+from qqa.data import load_history
+from qqa.metadata import metadata
+from qqa.ui import begin_page_run, end_page_run, prefetch
+from qqa.universe import NIFTY_50
 
 # Set page title
 st.set_page_config(page_title="Quantum Quotient Analytics", layout="wide")
+begin_page_run("Basic Information")
 
 st.title("Quantum Quotient Analytics")
     
@@ -12,15 +16,23 @@ with st.sidebar.expander("Basic Information", expanded=True):
     stock_symbol = st.text_input("Enter Stock Symbol (e.g., AAPL, TSLA)", "AAPL")
     start_date = st.date_input("Start Date", pd.to_datetime("2021-01-01"))
     end_date = st.date_input("End Date", pd.to_datetime("today"))
+    if st.button("Prefetch Nifty-50 company information"):
+        with st.spinner("Fetching company information..."):
+            fetched, errors = metadata.prefetch(NIFTY_50)
+        st.caption(f"Refreshed {fetched} symbols" + (f", {len(errors)} failed" if errors else ""))
+# Warm the other pages for this selection while the user reads this one
+prefetch(stock_symbol, start_date, end_date)
     
 # Fetch stock data
 if stock_symbol:
     try:
-        stock = yf.Ticker(stock_symbol)
-        df = stock.history(start=start_date, end=end_date)
+        df = load_history(stock_symbol, start_date, end_date)
         df.reset_index(inplace=True)
         df.insert(0, "Serial No.", range(1, len(df) + 1))  # Adding Serial No.
         df = df[["Serial No.", "Date", "Open", "High", "Low", "Close", "Volume"]]  # Selected columns
+        # Prices are cached as float32; show them to the cent rather than with float32 noise digits
+        df = df.astype({"Open": "float64", "High": "float64", "Low": "float64", "Close": "float64"}).round(
+            {"Open": 2, "High": 2, "Low": 2, "Close": 2})
             
         # Display stock data table
         st.subheader(f"Stock Data Table for {stock_symbol.upper()}")
@@ -28,7 +40,8 @@ if stock_symbol:
             
         # Additional Company Information
         st.subheader("Company Information")
-        info = stock.info  # Get stock metadata
+        # Cached; refreshed in the background once one of these fields is stale
+        info = metadata.get(stock_symbol, ["longName", "industry", "exchange", "website", "marketCap", "trailingPE", "trailingEps"])
         company_name = info.get("longName", "N/A")
         industry = info.get("industry", "N/A")
         exchange = info.get("exchange", "N/A")
@@ -45,6 +58,12 @@ if stock_symbol:
         st.markdown(f"**Market Cap:** {market_cap}")
         st.markdown(f"**P/E Ratio:** {pe_ratio}")
         st.markdown(f"**Earnings Per Share (EPS):** {eps}")
+        age = metadata.age(stock_symbol)
+        if age is not None and age > 60:
+            refreshing = " (refreshing in the background)" if metadata.refreshing(stock_symbol) else ""
+            st.caption(f"Company information fetched {pd.Timedelta(seconds=round(age))} ago{refreshing}")
         
     except Exception as e:
-        st.error(f"Error fetching data for {stock_symbol.upper()}. Please check the symbol and try again.")
\ No newline at end of file
+        st.error(f"Error fetching data for {stock_symbol.upper()}. Please check the symbol and try again.")
+
+end_page_run()
@@ -1,18 +1,24 @@
 import streamlit as st
-import yfinance as yf
+from qqa.barstore import BAR_INTERVALS, load_bars
+from qqa.decomposition import decompositions, suggest_periods
+from qqa.plotting import aggregate_ohlc, figure
+from qqa.ui import begin_page_run, chart_options, end_page_run, plotly_chart, prefetch
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from statsmodels.tsa.seasonal import seasonal_decompose
 
 # Page Configuration
 st.set_page_config(page_title="Time Series Analysis", layout="wide")
+begin_page_run("Time Series Analysis")
 
 # Sidebar Inputs
 st.sidebar.header("Time Series Analysis")
 stock_symbol = st.sidebar.text_input("Enter Stock Symbol (e.g., AAPL, TSLA)", "AAPL")
 start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2021-01-01"))
 end_date = st.sidebar.date_input("End Date", pd.to_datetime("today"))
+interval = st.sidebar.selectbox("Bar Interval", BAR_INTERVALS, help="Intraday bars cover the most recent weeks only")
+chart_options()
+prefetch(stock_symbol, start_date, end_date)
 
 # Custom CSS for Justifying Text
 st.markdown("""
@@ -26,8 +32,7 @@ st.markdown("""
 # Fetch Stock Data
 if stock_symbol:
     try:
-        stock = yf.Ticker(stock_symbol)
-        df = stock.history(start=start_date, end=end_date)
+        df = load_bars(stock_symbol, start_date, end_date, interval)
         df.reset_index(inplace=True)
 
         st.title(f"📊 Time Series Analysis for {stock_symbol.upper()}")
@@ -39,7 +44,7 @@ if stock_symbol:
             'It helps in identifying long-term trends and patterns, such as uptrends, downtrends, and consolidations.</div>',
             unsafe_allow_html=True)
         fig_close = px.line(df, x="Date", y="Close", labels={"Close": "Closing Price (USD)"})
-        st.plotly_chart(fig_close, use_container_width=True)
+        plotly_chart(fig_close)
 
         # 📊 Volume Traded Over Time
         st.subheader("Volume Traded Over Time")
@@ -48,7 +53,7 @@ if stock_symbol:
             'may indicate strong investor interest and potential price movement.</div>',
             unsafe_allow_html=True)
         fig_volume = px.bar(df, x="Date", y="Volume", labels={"Volume": "Volume Traded"})
-        st.plotly_chart(fig_volume, use_container_width=True)
+        plotly_chart(fig_volume)
 
         # Opening vs Closing Prices Over Time
         st.subheader("Opening vs Closing Prices Over Time")
@@ -56,11 +61,11 @@ if stock_symbol:
             '<div class="justified-text">This graph compares the stock’s opening and closing prices each day. A significant '
             'difference between them may indicate high volatility and investor reactions to market news.</div>',
             unsafe_allow_html=True)
-        fig_open_close = go.Figure()
+        fig_open_close = figure()
         fig_open_close.add_trace(go.Scatter(x=df["Date"], y=df["Open"], mode="lines", name="Opening Price"))
         fig_open_close.add_trace(go.Scatter(x=df["Date"], y=df["Close"], mode="lines", name="Closing Price"))
         fig_open_close.update_layout(xaxis_title="Date", yaxis_title="Price (USD)")
-        st.plotly_chart(fig_open_close, use_container_width=True)
+        plotly_chart(fig_open_close)
 
         # Time Series Decomposition
         st.subheader("Time Series Decomposition")
@@ -69,13 +74,33 @@ if stock_symbol:
             'components. The trend shows the long-term movement, the seasonal component captures periodic patterns, and the residual '
             'reveals unexplained fluctuations.</div>',
             unsafe_allow_html=True)
-        decomposition = seasonal_decompose(df['Close'].dropna(), model='multiplicative', period=30)
-        fig_decomp = go.Figure()
-        fig_decomp.add_trace(go.Scatter(x=df['Date'], y=decomposition.trend, mode='lines', name='Trend'))
-        fig_decomp.add_trace(go.Scatter(x=df['Date'], y=decomposition.seasonal, mode='lines', name='Seasonal'))
-        fig_decomp.add_trace(go.Scatter(x=df['Date'], y=decomposition.resid, mode='lines', name='Residual'))
-        fig_decomp.update_layout(height=600)
-        st.plotly_chart(fig_decomp, use_container_width=True)
+        close = df.set_index('Date')['Close'].dropna()
+        detected, period_options, default_periods = suggest_periods(close)
+        if not period_options:
+            st.info("The selected range is too short to decompose; widen it to at least 10 bars.")
+        else:
+            decomp_cols = st.columns(3)
+            method = decomp_cols[0].radio("Method", ["Classical", "STL"], horizontal=True,
+                                          help="STL fits the trend and seasonality with local regression")
+            model = decomp_cols[1].radio("Model", ["Multiplicative", "Additive"], horizontal=True)
+            robust = decomp_cols[2].checkbox("Robust to outliers", value=True, disabled=method != "STL")
+            periods = st.multiselect("Seasonal Periods (bars)", period_options, default=default_periods,
+                                     help="Choose several periods for a multi-seasonal decomposition")
+            if detected:
+                st.caption(f"Dominant cycles in the periodogram: {', '.join(map(str, detected))} bars.")
+            else:
+                st.caption("No clear cycle in the periodogram; defaulting to "
+                           f"{default_periods[0]} bars.")
+            if periods:
+                with st.spinner("Decomposing..."):
+                    decomposition = decompositions.get(stock_symbol, close, periods, method.lower(),
+                                                       model.lower(), robust)
+                fig_decomp = figure()
+                for column in decomposition.columns.drop('Observed'):
+                    fig_decomp.add_trace(go.Scatter(x=decomposition.index, y=decomposition[column],
+                                                    mode='lines', name=column))
+                fig_decomp.update_layout(height=600)
+                plotly_chart(fig_decomp)
 
         # Candlestick Chart (OHLC)
         st.subheader("OHLC Chart (Candlestick Chart)")
@@ -84,12 +109,22 @@ if stock_symbol:
             'show the highest and lowest prices, while the body indicates the opening and closing prices. It helps in understanding '
             'market sentiment and trend reversals.</div>',
             unsafe_allow_html=True)
-        fig_candlestick = go.Figure(data=[go.Candlestick(x=df['Date'],
-                                                    open=df['Open'],
-                                                    high=df['High'],
-                                                    low=df['Low'],
-                                                    close=df['Close'])])
-        st.plotly_chart(fig_candlestick, use_container_width=True)
+        # Narrow the visible range for full daily resolution; wide ranges are drawn as coarser bars
+        first_day, last_day = df['Date'].iloc[0].date(), df['Date'].iloc[-1].date()
+        visible_range = st.slider("Candlestick Range", min_value=first_day, max_value=last_day,
+                                  value=(first_day, last_day)) if first_day < last_day else (first_day, last_day)
+        visible = df[(df['Date'].dt.date >= visible_range[0]) & (df['Date'].dt.date <= visible_range[1])]
+        candles, period = aggregate_ohlc(visible)
+        if period:
+            st.caption(f"Showing {period} bars for {len(visible):,} trading days; narrow the range for daily candles.")
+        fig_candlestick = figure(go.Candlestick(x=candles['Date'],
+                                                open=candles['Open'],
+                                                high=candles['High'],
+                                                low=candles['Low'],
+                                                close=candles['Close']))
+        plotly_chart(fig_candlestick)
 
     except Exception as e:
         st.error(f"Error fetching data for {stock_symbol.upper()}. Please check the symbol and try again.")
+
+end_page_run()
@@ -1,58 +1,86 @@
 import streamlit as st
-import pandas as pd
-import streamlit as st
-import yfinance as yf
+from qqa.correlation import rolling_matrices_for
+from qqa.data import load_many
+from qqa.plotting import figure, wall_clock
+from qqa.ui import begin_page_run, chart_options, end_page_run, plotly_chart
+from qqa.universe import NIFTY_50
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
 
 st.set_page_config(page_title="Comparative & Statistical Analysis", layout="wide")
+begin_page_run("Comparative Analysis")
 
 # Sidebar Inputs for Stock Symbol(s) and Date Range
 st.sidebar.header("Stock Comparison")
 symbols_input = st.sidebar.text_input("Enter Stock Symbols (comma separated, e.g., AAPL, MSFT, GOOGL)", "AAPL, MSFT, GOOGL")
 symbols_list = [symbol.strip() for symbol in symbols_input.split(',')]
+if st.sidebar.checkbox("Compare the Nifty-50 instead"):
+    symbols_list = NIFTY_50
 start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2021-01-01"))
 end_date = st.sidebar.date_input("End Date", pd.to_datetime("today"))
-
-# Function to fetch stock data
-def load_data(symbol, start_date, end_date):
-    stock = yf.Ticker(symbol)
-    data = stock.history(start=start_date, end=end_date)
-    data.reset_index(inplace=True)
-    return data
+chart_options()
 
 st.title("⚖️ Comparative and Statistical Analysis")
+# Fetch closing prices for all symbols at once, shared by both sections below
+closes, errors = load_many(symbols_list, start_date, end_date)
+for symbol, e in errors.items():
+    st.write(f"Could not fetch data for {symbol}: {e}")
+
 # Comparative Closing Prices Plot
 st.subheader("Comparative Closing Prices")
-fig_compare = go.Figure()
-for symbol in symbols_list:
-    try:
-        compare_data = load_data(symbol, start_date, end_date)
-        fig_compare.add_trace(go.Scatter(x=compare_data['Date'], y=compare_data['Close'], mode='lines', name=symbol))
-    except Exception as e:
-        st.write(f"Could not fetch data for {symbol}: {e}")
+fig_compare = figure()
+for symbol in closes.columns:
+    close = closes[symbol].dropna()
+    fig_compare.add_trace(go.Scatter(x=wall_clock(close.index), y=close, mode='lines', name=symbol))
 
 fig_compare.update_layout(xaxis_title="Date", yaxis_title="Closing Price (USD)")
-st.plotly_chart(fig_compare, use_container_width=True)
+plotly_chart(fig_compare)
 
 
 # Histogram of Returns
 st.subheader("Histogram of Returns")
-returns = pd.DataFrame()
-for symbol in symbols_list:
-    try:
-        # Fetch data for each symbol
-        stock_data = load_data(symbol, start_date, end_date)
-        stock_data['Daily Return'] = stock_data['Close'].pct_change()
-        returns[symbol] = stock_data['Daily Return']
-
-    except Exception as e:
-        st.write(f"Could not fetch data for {symbol}: {e}")
+returns = closes.apply(lambda close: close.dropna().pct_change())
 
 # Plot histogram
 fig_hist = px.histogram(returns, x=returns.columns, nbins=50, labels={"value": "Daily Return"})
 fig_hist.update_layout(barmode='overlay')
 fig_hist.update_traces(opacity=0.75)
-st.plotly_chart(fig_hist, use_container_width=True)
\ No newline at end of file
+plotly_chart(fig_hist)
+
+
+# Rolling Correlation & Covariance
+st.subheader("Rolling Correlation & Covariance")
+if returns.shape[1] < 2:
+    st.info("Enter at least two symbols to compare their correlation.")
+else:
+    matrix_cols = st.columns(2)
+    window = matrix_cols[0].select_slider("Rolling Window (days)", options=[20, 60, 126, 252], value=60)
+    kind = matrix_cols[1].radio("Matrix", ["Correlation", "Covariance"], horizontal=True)
+    # Built once per returns frame and window, then read from a memory-mapped cache file
+    matrices = rolling_matrices_for(returns, window)
+    dates, frames = matrices.frames(kind.lower())
+    if not len(dates):
+        st.info(f"Not enough overlapping history for a {window}-day window.")
+    else:
+        frames = np.asarray(frames)
+        limit = 1.0 if kind == "Correlation" else float(np.nanmax(np.abs(frames)))
+        fig_heatmap = px.imshow(frames, x=matrices.symbols, y=matrices.symbols, animation_frame=0,
+                                zmin=-limit, zmax=limit, color_continuous_scale="RdBu_r", aspect="auto",
+                                labels={"color": kind})
+        for step, date in zip(fig_heatmap.layout.sliders[0].steps, dates):
+            step.label = f"{date:%Y-%m-%d}"
+        fig_heatmap.layout.sliders[0].currentvalue.prefix = "Window ending "
+        fig_heatmap.update_layout(height=max(500, 14 * len(matrices.symbols)))
+        plotly_chart(fig_heatmap)
+
+        pair_cols = st.columns(2)
+        first = pair_cols[0].selectbox("First Symbol", matrices.symbols, index=0)
+        second = pair_cols[1].selectbox("Second Symbol", matrices.symbols, index=1)
+        pair = matrices.pair(first, second, kind.lower())
+        fig_pair = figure(go.Scatter(x=pair.index, y=pair, mode='lines', name=pair.name))
+        fig_pair.update_layout(xaxis_title="Date", yaxis_title=f"{window}-Day {kind}", title=pair.name)
+        plotly_chart(fig_pair)
+
+end_page_run()
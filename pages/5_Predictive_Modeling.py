@@ -1,21 +1,18 @@
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, r2_score
 import streamlit as st
+from qqa.evaluation import walk_forward
+from qqa.features import load_features
+from qqa.forecast import StackedFeatures, forecast_universe
+from qqa.models import fingerprint, model_key, registry
+from qqa.plotting import figure
+from qqa.ui import begin_page_run, chart_options, end_page_run, plotly_chart, prefetch
+from qqa.universe import NIFTY_50
 
 # Page Configuration
 st.set_page_config(page_title="Predictive Modeling", layout="wide")
-
-# Function to fetch stock data
-def load_data(symbol, start_date, end_date):
-    stock = yf.Ticker(symbol)
-    data = stock.history(start=start_date, end=end_date)
-    data.reset_index(inplace=True)
-    return data
+begin_page_run("Predictive Modeling")
 
 st.title("🫧 Stock Predictive Modeling")
 # Sidebar Inputs for Stock Symbol and Date Range
@@ -23,30 +20,46 @@ st.sidebar.header("Stock Predictive Modeling")
 stock_symbol = st.sidebar.text_input("Enter Stock Symbol (e.g., AAPL, MSFT, GOOGL)", "AAPL")
 start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2021-01-01"))
 end_date = st.sidebar.date_input("End Date", pd.to_datetime("today"))
+chart_options()
+prefetch(stock_symbol, start_date, end_date)
 
 # Fetch Stock Data
 if stock_symbol:
     try:
-        df = load_data(stock_symbol, start_date, end_date)
-        # Feature Engineering: Add features like previous day's close and moving averages
-        df['Prev Close'] = df['Close'].shift(1)  # Previous day's closing price
-        df['MA50'] = df['Close'].rolling(window=50).mean()  # 50-day Moving Average
-        df['MA200'] = df['Close'].rolling(window=200).mean()  # 200-day Moving Average
-        df.dropna(inplace=True)  # Drop rows with NaN values
+        # Features are materialised once per bar in the feature store: previous close, the bar's moving
+        # averages and OHLCV, lagged returns and the Technical Indicators page's series as of the previous bar
+        features = load_features(stock_symbol, start_date, end_date)
 
         # Sidebar options for selecting features
-        selected_features = st.sidebar.multiselect("Select features:", ['Prev Close', 'MA50', 'MA200', 'Open', 'High', 'Low', 'Adj Close'])
+        selected_features = st.sidebar.multiselect("Select features:", [c for c in features.columns if c != 'Close'],
+                                                   default=['Prev Close', 'MA50', 'MA200'])
+        df = features.frame(['Close'] + selected_features).reset_index()
+        df.dropna(inplace=True)  # Drop rows with NaN values
+        evaluation_mode = st.sidebar.radio("Evaluation mode:", ["Random split", "Walk-forward"])
+        if evaluation_mode == "Walk-forward":
+            n_folds = st.sidebar.slider("Number of folds:", min_value=2, max_value=10, value=5)
 
         # Split data into features and target
         X = df[selected_features]
         y = df['Close']  # Target: Closing Price
 
-        # Train-test split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        # Model training, reused from the model registry unless the data, features or parameters changed
+        model_params = {"n_estimators": 100, "random_state": 42}
+        key = model_key(stock_symbol, start_date, end_date, selected_features, model_params, fingerprint(X, y))
+
+        def train():
+            # scikit-learn is only imported when a model actually has to be fitted
+            from sklearn.ensemble import RandomForestRegressor
+            from sklearn.model_selection import train_test_split
 
-        # Model training
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_train, y_train)
+            # Train-test split
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            model = RandomForestRegressor(**model_params)
+            model.fit(X_train, y_train)
+            return {"model": model, "y_test": y_test, "y_pred": model.predict(X_test)}
+
+        trained = registry.get_or_train(key, train)
+        model, y_test, y_pred = trained["model"], trained["y_test"], trained["y_pred"]
 
         # Prediction
         def predict_close_price(features):
@@ -64,8 +77,13 @@ if stock_symbol:
         st.subheader("Predicted Close Price")
         st.write(f"The predicted close price is: ${predicted_close:.2f}")
 
+        # Walk-forward evaluation: train on the past, test on the following block, folds fitted in parallel
+        if evaluation_mode == "Walk-forward":
+            folds, predictions, summary = walk_forward(X, y, n_folds, model_params, cache_prefix=stock_symbol)
+            y_test, y_pred = y.loc[predictions.index], predictions.to_numpy()
+
         # Model evaluation
-        y_pred = model.predict(X_test)
+        from sklearn.metrics import mean_squared_error, r2_score
         mse = mean_squared_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
 
@@ -73,15 +91,24 @@ if stock_symbol:
         st.subheader("Model Metrics")
         st.write(f"Mean Squared Error: {mse:.2f}")
         st.write(f"R-squared Score: {r2:.2f}")
+        if evaluation_mode == "Walk-forward":
+            st.write(f"Total Training Time: {summary['Fit Seconds']:.2f}s across {n_folds} folds "
+                     f"({summary['Folds Trained']} trained, {n_folds - summary['Folds Trained']} from cache, "
+                     f"{summary['Wall Seconds']:.2f}s wall clock)")
+            st.write(f"Prediction Throughput: {summary['Predictions/sec']:,.0f} rows/sec")
+            st.dataframe(folds.round(4), width=1000)
+
+        # Order test rows by date so the chart follows time
+        results = pd.DataFrame({"Date": df.loc[y_test.index, 'Date'], "Actual": y_test, "Predicted": y_pred}).sort_values("Date")
 
         # Plot actual vs predicted values (Interactive)
         st.subheader("Actual vs Predicted Closing Prices")
-        fig_actual_predicted = go.Figure()
+        fig_actual_predicted = figure()
 
         # Plot Actual values
         fig_actual_predicted.add_trace(go.Scatter(
-            x=df['Date'].iloc[-len(y_test):],
-            y=y_test,
+            x=results['Date'],
+            y=results['Actual'],
             mode='lines',
             name='Actual',
             line=dict(color='darkcyan')
@@ -89,8 +116,8 @@ if stock_symbol:
 
         # Plot Predicted values
         fig_actual_predicted.add_trace(go.Scatter(
-            x=df['Date'].iloc[-len(y_pred):],
-            y=y_pred,
+            x=results['Date'],
+            y=results['Predicted'],
             mode='lines',
             name='Predicted',
             line=dict(color='crimson', dash='dash')
@@ -102,12 +129,12 @@ if stock_symbol:
             hovermode='closest'
         )
 
-        st.plotly_chart(fig_actual_predicted, use_container_width=True)
+        plotly_chart(fig_actual_predicted)
 
         # Residuals Plot (Interactive)
         st.subheader("Residuals Plot")
         residuals = y_test - y_pred
-        fig_residuals = go.Figure()
+        fig_residuals = figure()
 
         # Plot Residuals
         fig_residuals.add_trace(go.Scatter(
@@ -133,7 +160,51 @@ if stock_symbol:
             hovermode='closest'
         )
 
-        st.plotly_chart(fig_residuals, use_container_width=True)
+        plotly_chart(fig_residuals)
 
     except Exception as e:
-        st.write(f"Could not fetch or process data for {stock_symbol}: {e}")
\ No newline at end of file
+        st.write(f"Could not fetch or process data for {stock_symbol}: {e}")
+
+# Universe forecast: one pooled model (or one per symbol, fitted in parallel) scored across every symbol in one batch
+st.subheader("Universe Next-Day Forecast")
+with st.form("universe_forecast"):
+    universe_input = st.text_area("Universe Symbols (comma separated)", ", ".join(NIFTY_50))
+    universe_cols = st.columns(2)
+    universe_mode = universe_cols[0].radio(
+        "Model", ["Pooled", "Per symbol"], horizontal=True,
+        help="Pooled fits one model on every symbol's rows; per symbol fits one model each, in parallel")
+    hold_out = universe_cols[1].checkbox("Hold out the last 20% of dates for evaluation", value=True)
+    submitted = st.form_submit_button("Train and Forecast")
+if submitted:
+    with st.spinner("Loading features and training..."):
+        universe = StackedFeatures.load(universe_input.split(','), start_date, end_date)
+        if universe.symbols:
+            forecasts, summary = forecast_universe(universe, universe_mode.lower().replace(' ', '-'),
+                                                   holdout=0.2 if hold_out else 0)
+            st.session_state["universe_results"] = (forecasts, summary, universe.errors)
+        else:
+            st.session_state.pop("universe_results", None)
+            st.write("Could not load features for any of the universe symbols.")
+if "universe_results" in st.session_state:
+    forecasts, summary, universe_errors = st.session_state["universe_results"]
+    for symbol, error in universe_errors.items():
+        st.write(f"Could not load {symbol}: {error}")
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Training Time", f"{summary['Fit Seconds']:.2f}s",
+                          help="Reused from the model registry" if summary["Cached"] else None)
+    metric_cols[1].metric("Batch Forecast", f"{summary['Forecast Seconds'] * 1000:.0f} ms",
+                          help=f"{summary['Symbols']} symbols")
+    if "Test Rows" in summary:
+        metric_cols[2].metric("Inference Throughput", f"{summary['Predictions/sec']:,.0f} rows/sec")
+        metric_cols[3].metric("Direction Hit Rate", f"{summary['Hit Rate']:.1%}",
+                              help=f"Test MSE {summary['Test MSE']:.2e}, R² {summary['Test R²']:.3f}")
+    st.caption(f"{summary['Mode'].capitalize()} model trained on {summary['Train Rows']:,} of "
+               f"{summary['Rows']:,} rows across {summary['Symbols']} symbols.")
+    fig_forecast = px.bar(forecasts.reset_index(), x="Symbol", y="Predicted Return",
+                          labels={"Predicted Return": "Predicted Next-Day Return"})
+    fig_forecast.update_layout(yaxis_tickformat=".2%")
+    plotly_chart(fig_forecast)
+    st.dataframe(forecasts.style.format({"Close": "{:.2f}", "Predicted Return": "{:.3%}",
+                                         "Predicted Close": "{:.2f}"}), width=1000)
+
+end_page_run()
@@ -0,0 +1,66 @@
+import streamlit as st
+import pandas as pd
+from qqa.screener import load_universe, rank, screen
+from qqa.ui import begin_page_run, end_page_run
+from qqa.universe import NIFTY_50
+
+st.set_page_config(page_title="Universe Screener", layout="wide")
+begin_page_run("Universe Screener")
+
+# Sidebar Inputs for Universe and Date Range
+st.sidebar.header("Universe Screener")
+symbols_input = st.sidebar.text_area("Enter Stock Symbols (comma separated)", ", ".join(NIFTY_50))
+symbols_list = [symbol.strip() for symbol in symbols_input.split(',')]
+start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2021-01-01"))
+end_date = st.sidebar.date_input("End Date", pd.to_datetime("today"))
+
+st.title("🔎 Universe Screener")
+st.write("""
+Ranks every symbol in the universe by the technical indicators from the Technical Indicators page, computed for all
+symbols at once on the latest bar in the selected range.
+- **RSI** (14) and **Chaikin Money Flow** (20)
+- **ATR %**: 14-day Average True Range as a percentage of the close
+- **Volatility %**: 30-day annualized volatility
+- **%B**: position of the close within the 20-day Bollinger Bands (above 1 is over the upper band, below 0 under the lower band)
+- **Breakout**: 1 when the close breaks above the previous 20-day Donchian high, -1 below the Donchian low
+""")
+
+
+# The panel and its ranking depend only on the universe and dates, so filter and sort changes reuse them
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def ranking(symbols, start_date, end_date):
+    universe = load_universe(symbols, start_date, end_date)
+    as_of = universe.dates[-1].date() if len(universe) else None
+    return rank(universe), as_of, {symbol: str(e) for symbol, e in universe.errors.items()}
+
+
+try:
+    with st.spinner("Loading the universe..."):
+        table, as_of, errors = ranking(tuple(symbols_list), start_date, end_date)
+except Exception as e:
+    st.error(f"Error fetching data for the universe. Please check the symbols and try again.\n\n{e}")
+else:
+    for symbol, e in errors.items():
+        st.write(f"Could not fetch data for {symbol}: {e}")
+
+    # Ranking and Filters
+    sort_by = st.sidebar.selectbox("Sort by", list(table.columns), index=list(table.columns).index("RSI"))
+    ascending = st.sidebar.checkbox("Ascending", value=False)
+    rsi_range = st.sidebar.slider("RSI Range", min_value=0, max_value=100, value=(0, 100))
+    min_cmf = st.sidebar.slider("Minimum CMF", min_value=-1.0, max_value=1.0, value=-1.0, step=0.05)
+    max_atr_percent = st.sidebar.number_input("Maximum ATR %", min_value=0.0, value=None, step=0.5,
+                                              placeholder="Any")
+    breakout = st.sidebar.selectbox("Donchian Breakout", ["Any", "Upside", "Downside"])
+
+    # Leave a filter off while it is at its widest so symbols without enough history still show
+    filtered = screen(table,
+                      rsi_range=None if rsi_range == (0, 100) else rsi_range,
+                      min_cmf=None if min_cmf == -1.0 else min_cmf,
+                      max_atr_percent=max_atr_percent,
+                      breakout={"Any": None, "Upside": 1, "Downside": -1}[breakout])
+    filtered = filtered.sort_values(sort_by, ascending=ascending, na_position="last")
+
+    st.subheader(f"Ranking as of {as_of}" if as_of else "Ranking")
+    st.dataframe(filtered.round(2), width=1000)
+
+end_page_run()
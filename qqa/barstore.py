@@ -0,0 +1,222 @@
+"""Memory-mapped columnar store for intraday bars and session-aware indicators.
+
+Each (interval, symbol) directory holds one raw little-endian file per column
+(``Date`` as int64 UTC nanoseconds, prices and volume as float64) plus a small
+``meta.json`` with the committed row count and exchange timezone. Files are
+only ever appended to and are opened with ``np.memmap``, so a symbol can hold
+millions of bars while a page touches only the slice it plots.
+
+``BarView`` is a zero-copy slice of the store. The session functions
+(``session_vwap``, ``intraday_intensity``, ``opening_range``) reset at each
+exchange-local trading day and read the view's columns without copying them.
+"""
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import CACHE_DIR, OHLCV_COLUMNS, _download, load_history
+from qqa.upstream import KeyedLocks, coordinator
+
+# Intervals served from the bar store and how many days back Yahoo Finance serves them
+INTRADAY_INTERVALS = {"1m": 7, "5m": 59, "15m": 59, "1h": 729}
+BAR_INTERVALS = ["1d", "1h", "15m", "5m", "1m"]
+SYNC_SECONDS = 60
+
+_DTYPES = {"Date": np.dtype("<i8"), **{column: np.dtype("<f8") for column in OHLCV_COLUMNS}}
+
+
+class BarView:
+    """Read-only slice of one symbol's bars; columns are memmap views, not copies."""
+
+    def __init__(self, columns, tz):
+        self.columns = columns
+        self.tz = tz
+        self._starts = None
+
+    def __len__(self):
+        return len(self.columns["Date"])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex(np.asarray(self.columns["Date"]).view("datetime64[ns]"), tz="UTC").tz_convert(self.tz)
+
+    def session_starts(self):
+        """Row offsets where a new exchange-local trading day begins."""
+        if self._starts is None:
+            days = self.dates.tz_localize(None).normalize().asi8
+            self._starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.empty(0, np.int64)
+        return self._starts
+
+    def to_frame(self):
+        """Copy the slice into a DataFrame indexed by ``Date``, like ``load_history``."""
+        frame = pd.DataFrame({column: np.array(self.columns[column]) for column in OHLCV_COLUMNS}, index=self.dates)
+        frame.index.name = "Date"
+        return frame
+
+
+class BarStore:
+    def __init__(self, root=CACHE_DIR / "bars"):
+        self.root = root
+        self._key_locks = KeyedLocks()
+
+    def _key_lock(self, symbol, interval):
+        return self._key_locks((symbol, interval))
+
+    def _dir(self, symbol, interval):
+        return self.root / interval / symbol.strip().upper()
+
+    def _meta(self, symbol, interval):
+        path = self._dir(symbol, interval) / "meta.json"
+        if not path.exists():
+            return {"rows": 0, "tz": None}
+        return json.loads(path.read_text())
+
+    def _columns(self, symbol, interval, rows):
+        directory = self._dir(symbol, interval)
+        if rows == 0:
+            return {column: np.empty(0, dtype) for column, dtype in _DTYPES.items()}
+        return {column: np.memmap(directory / f"{column}.bin", dtype=dtype, mode="r", shape=(rows,))
+                for column, dtype in _DTYPES.items()}
+
+    def rows(self, symbol, interval):
+        return self._meta(symbol, interval)["rows"]
+
+    def last_timestamp(self, symbol, interval):
+        meta = self._meta(symbol, interval)
+        if not meta["rows"]:
+            return None
+        stamp = int(self._columns(symbol, interval, meta["rows"])["Date"][-1])
+        return pd.Timestamp(stamp, tz="UTC")
+
+    def append(self, symbol, interval, frame):
+        """Append bars newer than the last stored one; returns the number of rows written."""
+        if frame.empty:
+            return 0
+        with self._key_lock(symbol, interval):
+            directory = self._dir(symbol, interval)
+            directory.mkdir(parents=True, exist_ok=True)
+            meta = self._meta(symbol, interval)
+            index = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+            stamps = index.tz_convert("UTC").as_unit("ns").asi8
+            if meta["rows"]:
+                last = int(self._columns(symbol, interval, meta["rows"])["Date"][-1])
+                keep = stamps > last
+                frame, stamps = frame[keep], stamps[keep]
+            if not len(stamps):
+                return 0
+            order = np.argsort(stamps, kind="stable")
+            values = {"Date": stamps[order]}
+            values.update({column: frame[column].to_numpy(dtype=np.float64)[order] for column in OHLCV_COLUMNS})
+            for column, dtype in _DTYPES.items():
+                path = directory / f"{column}.bin"
+                with open(path, "ab") as handle:
+                    # Drop bytes from an append that never reached meta.json
+                    handle.truncate(meta["rows"] * dtype.itemsize)
+                    handle.write(np.ascontiguousarray(values[column], dtype=dtype).tobytes())
+            meta = {"rows": meta["rows"] + len(stamps), "tz": meta["tz"] or str(index.tz)}
+            tmp = directory / "meta.tmp"
+            tmp.write_text(json.dumps(meta))
+            os.replace(tmp, directory / "meta.json")
+            return len(stamps)
+
+    def view(self, symbol, interval, start=None, end=None):
+        """Zero-copy ``BarView`` of bars in ``[start, end)`` (exchange-local dates or timestamps)."""
+        meta = self._meta(symbol, interval)
+        columns = self._columns(symbol, interval, meta["rows"])
+        tz = meta["tz"] or "UTC"
+        lo, hi = 0, meta["rows"]
+        if start is not None:
+            lo = int(np.searchsorted(columns["Date"], _utc_nanos(start, tz), side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(columns["Date"], _utc_nanos(end, tz), side="left"))
+        return BarView({column: values[lo:hi] for column, values in columns.items()}, tz)
+
+
+def _utc_nanos(value, tz):
+    stamp = pd.Timestamp(value)
+    if stamp.tz is None:
+        stamp = stamp.tz_localize(tz)
+    return stamp.tz_convert("UTC").as_unit("ns").value
+
+
+store = BarStore()
+_synced = {}
+
+
+@telemetry.span("intraday sync", "fetch")
+def sync_intraday(symbol, interval, bar_store=None):
+    """Download bars newer than the last stored one (within Yahoo's window) into the store."""
+    bar_store = bar_store or store
+    symbol = symbol.strip().upper()
+    now = pd.Timestamp.now(tz="UTC")
+    start = now - pd.Timedelta(days=INTRADAY_INTERVALS[interval])
+    last = bar_store.last_timestamp(symbol, interval)
+    if last is not None:
+        start = max(start, last + pd.Timedelta(seconds=1))
+    written = bar_store.append(symbol, interval, _download(symbol, start, now + pd.Timedelta(days=1), interval))
+    _synced[(symbol, interval)] = time.monotonic()
+    return written
+
+
+def bar_view(symbol, start_date, end_date, interval, bar_store=None):
+    """``BarView`` of intraday bars for ``[start_date, end_date)``, syncing at most once a minute."""
+    bar_store = bar_store or store
+    key = (symbol.strip().upper(), interval)
+    if time.monotonic() - _synced.get(key, -SYNC_SECONDS) >= SYNC_SECONDS:
+        # Sessions opening the same symbol together share one sync
+        coordinator.single_flight(("intraday sync",) + key, lambda: sync_intraday(symbol, interval, bar_store))
+    return bar_store.view(symbol, interval, start_date, end_date)
+
+
+def load_bars(symbol, start_date, end_date, interval="1d"):
+    """Daily bars from the Parquet cache, intraday bars from the bar store, as a ``Date``-indexed frame."""
+    if interval not in INTRADAY_INTERVALS:
+        return load_history(symbol, start_date, end_date, interval)
+    return bar_view(symbol, start_date, end_date, interval).to_frame()
+
+
+def _session_cumsum(values, starts):
+    total = np.cumsum(values)
+    before = np.concatenate(([0.0], total[starts[1:] - 1]))
+    return total - np.repeat(before, np.diff(np.append(starts, len(values))))
+
+
+def session_vwap(view):
+    """VWAP of the typical price (high + low + close) / 3, reset at each session open."""
+    if not len(view):
+        return np.empty(0)
+    starts = view.session_starts()
+    volume = view["Volume"]
+    typical = (view["High"] + view["Low"] + view["Close"]) / 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _session_cumsum(typical * volume, starts) / _session_cumsum(volume, starts)
+
+
+def intraday_intensity(view):
+    """Cumulative intraday intensity, ((2 * close - high - low) / (high - low)) * volume, per session."""
+    if not len(view):
+        return np.empty(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intensity = (2 * view["Close"] - view["High"] - view["Low"]) / (view["High"] - view["Low"]) * view["Volume"]
+    return _session_cumsum(np.nan_to_num(intensity, nan=0.0, posinf=0.0, neginf=0.0), view.session_starts())
+
+
+def opening_range(view, minutes=30):
+    """High and low of each session's first ``minutes``, repeated across the session."""
+    if not len(view):
+        return np.empty(0), np.empty(0)
+    starts = view.session_starts()
+    lengths = np.diff(np.append(starts, len(view)))
+    stamps = view["Date"]
+    elapsed = stamps - np.repeat(stamps[starts], lengths)
+    in_range = elapsed < minutes * 60 * 10**9
+    high = np.maximum.reduceat(np.where(in_range, view["High"], -np.inf), starts)
+    low = np.minimum.reduceat(np.where(in_range, view["Low"], np.inf), starts)
+    return np.repeat(high, lengths), np.repeat(low, lengths)
@@ -0,0 +1,145 @@
+"""Rolling covariance and correlation matrices across many symbols.
+
+For a window of ``w`` bars, every pair's covariance and correlation follow
+from five running sums over the bars where both symbols traded: the count,
+the sum of each return, the sum of each squared return and the sum of the
+cross products. Each window is the difference of two prefix sums, so
+sliding it one bar costs O(N^2) however long the window is. Prefix sums are
+taken over blocks of rows (overlapping by one window) rather than the whole
+history, which bounds memory and the float drift of long cumulative sums.
+
+Results are stored as ``.npy`` files keyed by a hash of the returns and the
+window, and opened memory-mapped, like the moving-average surfaces.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import CACHE_DIR
+from qqa.upstream import coordinator
+
+MAX_FILES = 32
+BLOCK_BYTES = 64 * 2**20  # working memory for the prefix sums of one block
+
+
+class RollingMatrices:
+    def __init__(self, index, symbols, window, values):
+        self.index = index
+        self.symbols = list(symbols)
+        self.window = window
+        self.values = values  # (2, n_bars, n_symbols, n_symbols) float32: covariance, then correlation
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    def _kind(self, kind):
+        return self.values[{"covariance": 0, "correlation": 1}[kind]]
+
+    def matrix(self, kind="correlation", at=-1):
+        """The matrix ending at bar position ``at`` (default the last) as a symbol x symbol frame."""
+        return pd.DataFrame(self._kind(kind)[at], index=self.symbols, columns=self.symbols)
+
+    def pair(self, first, second, kind="correlation"):
+        """Rolling series for one pair of symbols."""
+        i, j = self.symbols.index(first), self.symbols.index(second)
+        return pd.Series(self._kind(kind)[:, i, j], index=self.index, name=f"{first} / {second}")
+
+    def frames(self, kind="correlation", count=60):
+        """Up to ``count`` evenly spaced matrices (skipping the warm-up) as ``(dates, array)``."""
+        filled = np.flatnonzero(np.isfinite(self._kind(kind)).any(axis=(1, 2)))
+        if not len(filled):
+            return self.index[:0], self._kind(kind)[:0]
+        positions = np.unique(np.linspace(filled[0], len(self) - 1, count).round().astype(int))
+        return self.index[positions], self._kind(kind)[positions]
+
+    @classmethod
+    def build(cls, returns, window, min_periods=None, out=None):
+        """Rolling matrices of the columns of ``returns`` (NaN where a symbol did not trade).
+
+        Pairs use the bars where both symbols have a return, like
+        ``returns.rolling(window, min_periods).cov()``; windows with fewer than
+        ``min_periods`` (default ``window``) such bars are NaN. ``out`` may be a
+        preallocated (e.g. memory-mapped) array.
+        """
+        min_periods = window if min_periods is None else min_periods
+        x = returns.to_numpy(dtype=np.float64)
+        n_bars, n = x.shape
+        valid = np.isfinite(x)
+        # Centring leaves covariances unchanged and keeps the sums small
+        with np.errstate(invalid="ignore"):
+            centre = np.nan_to_num(np.nanmean(x, axis=0))
+        x = np.where(valid, x - centre, 0.0)
+        mask = valid.astype(np.float64)
+        values = np.empty((2, n_bars, n, n), dtype=np.float32) if out is None else out
+        block = max(window, BLOCK_BYTES // (4 * 8 * n * n) - window)
+        for start in range(0, n_bars, block):
+            stop = min(start + block, n_bars)
+            lo = max(0, start - window)
+            rows = slice(lo, stop)
+            # Prefix sums from ``lo``, with a zero row in front so every window is a plain difference
+            sums = [np.concatenate((np.zeros((1, n, n)), np.cumsum(term, axis=0)))
+                    for term in (np.einsum("ti,tj->tij", mask[rows], mask[rows]),
+                                 np.einsum("ti,tj->tij", x[rows], mask[rows]),
+                                 np.einsum("ti,tj->tij", x[rows] ** 2, mask[rows]),
+                                 np.einsum("ti,tj->tij", x[rows], x[rows]))]
+            ends = np.arange(start, stop) - lo + 1
+            begins = np.maximum(ends - window, 0)
+            count, sx, sxx, sxy = (s[ends] - s[begins] for s in sums)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                sy = sx.transpose(0, 2, 1)
+                cov = (sxy - sx * sy / count) / (count - 1)
+                var_x = (sxx - sx * sx / count) / (count - 1)
+                corr = np.clip(cov / np.sqrt(var_x * var_x.transpose(0, 2, 1)), -1.0, 1.0)
+            short = count < max(min_periods, 2)
+            cov[short] = np.nan
+            corr[short] = np.nan
+            values[0, start:stop] = cov
+            values[1, start:stop] = corr
+        return cls(returns.index, returns.columns, window, values)
+
+
+def _key(returns, window, min_periods):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(returns, index=True).to_numpy().tobytes())
+    digest.update(f"{list(returns.columns)}:{window}:{min_periods}".encode())
+    return digest.hexdigest()
+
+
+@telemetry.span("rolling matrices")
+def rolling_matrices_for(returns, window, min_periods=None, directory=None):
+    """Memory-mapped ``RollingMatrices`` for ``returns``, built and stored on first use."""
+    directory = directory or CACHE_DIR / "correlations"
+    path = directory / f"{_key(returns, window, min_periods)}.npy"
+    if path.exists():
+        os.utime(path)
+        telemetry.count("cache_hits", "correlation")
+    else:
+        # Sessions opening the page with the default symbols ask for the same matrices at once
+        coordinator.single_flight(("rolling matrices", str(path)),
+                                  lambda: _build(returns, window, min_periods, path))
+    return RollingMatrices(returns.index, returns.columns, window, np.load(path, mmap_mode="r"))
+
+
+def _build(returns, window, min_periods, path):
+    if path.exists():
+        return  # built by a caller that finished just before this one started
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A temp file per writer, so another process building the same matrices never truncates this one
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix=".tmp")
+    os.close(fd)
+    n = returns.shape[1]
+    try:
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(2, len(returns), n, n))
+        RollingMatrices.build(returns, window, min_periods, out)
+        out.flush()
+        del out
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    files = sorted(path.parent.glob("*.npy"), key=lambda p: p.stat().st_mtime)
+    for stale in files[:-MAX_FILES]:
+        stale.unlink(missing_ok=True)
@@ -0,0 +1,293 @@
+"""On-disk OHLCV cache shared by every page.
+
+History is kept as one Parquet file per (symbol, interval) together with the
+date range that has already been requested from upstream. A request for a new
+range only downloads the missing leading and/or trailing dates, so repeat
+loads and slider changes are served from disk. Downloads go to the active
+``qqa.providers`` source through ``qqa.upstream``, which coalesces identical
+concurrent requests and rate limits them; ``store_history`` lets the bulk
+ingester (``qqa.ingest``) fill the cache without any download at all.
+
+Loaded histories are also kept in memory, once per process, in a compact
+form: only the OHLCV columns, prices as ``PRICE_DTYPE`` (float32 by default,
+``QQA_PRICE_DTYPE``) and volume as float64, whose share counts exceed
+float32's exact integer range. The memory is an LRU bounded by
+``MEMORY_BUDGET`` bytes (``QQA_MEMORY_MB``). ``load_history`` returns a row
+slice of the shared frame; under pandas' copy-on-write a session only copies
+the columns it modifies. Copy-on-write is always on from pandas 3, which
+requirements.txt pins.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from qqa import telemetry
+from qqa.providers import OHLCV_COLUMNS
+from qqa.upstream import KeyedLocks, coordinator
+
+CACHE_DIR = Path(os.environ.get("QQA_CACHE_DIR", Path.home() / ".cache" / "qqa"))
+_COVERAGE_KEY = b"qqa.coverage"
+PRICE_DTYPE = np.dtype(os.environ.get("QQA_PRICE_DTYPE", "float32"))
+MEMORY_BUDGET = int(float(os.environ.get("QQA_MEMORY_MB", 256)) * 2**20)
+
+
+def compact(frame):
+    """``frame`` as the cache keeps it: OHLCV columns only, prices as ``PRICE_DTYPE``, sorted by date."""
+    frame = frame.reindex(columns=OHLCV_COLUMNS).astype(
+        {**{column: PRICE_DTYPE for column in OHLCV_COLUMNS[:4]}, "Volume": np.float64})
+    return frame if frame.index.is_monotonic_increasing else frame.sort_index()
+
+
+class HistoryMemory:
+    """LRU of compact history frames shared by every session, bounded by ``budget`` bytes.
+
+    The most recently used entry is kept even when it alone exceeds the
+    budget. Evicted histories are read back from their Parquet file on the
+    next request; sessions still holding a slice keep it alive until they
+    drop it.
+    """
+
+    def __init__(self, budget=MEMORY_BUDGET):
+        self.budget = budget
+        self._entries = OrderedDict()  # (symbol, interval) -> (frame, lo, hi, bytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, key):
+        """``(frame, lo, hi)`` for ``key``, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[:3]
+
+    def put(self, key, frame, lo, hi):
+        size = int(frame.memory_usage(index=True).sum())
+        with self._lock:
+            self.discard(key, locked=True)
+            self._entries[key] = (frame, lo, hi, size)
+            self.nbytes += size
+            while self.nbytes > self.budget and len(self._entries) > 1:
+                _, (_, _, _, dropped) = self._entries.popitem(last=False)
+                self.nbytes -= dropped
+                self.evictions += 1
+                telemetry.count("evictions", "history")
+
+    def discard(self, key, locked=False):
+        if not locked:
+            with self._lock:
+                return self.discard(key, locked=True)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+_lock = threading.Lock()
+_key_locks = KeyedLocks()
+_memory = HistoryMemory()
+
+
+def _normalise_symbol(symbol):
+    return symbol.strip().upper()
+
+
+def _key_lock(symbol, interval):
+    # One lock per cache file so different symbols can load concurrently
+    return _key_locks((symbol, interval))
+
+
+def _cache_path(symbol, interval):
+    return CACHE_DIR / interval / f"{symbol}.parquet"
+
+
+def _naive(index):
+    # Compare dates in exchange-local time regardless of the index timezone
+    return index.tz_localize(None) if getattr(index, "tz", None) is not None else index
+
+
+def _download(symbol, start, end, interval):
+    frame = coordinator.history(symbol, start, end, interval)
+    telemetry.count("upstream_calls", "history")
+    # Providers hand back parsed frames, so their in-memory size stands in for the bytes on the wire
+    telemetry.count("bytes_downloaded", "history", int(frame.memory_usage(deep=True).sum()))
+    return frame
+
+
+def _read(symbol, interval):
+    key = (symbol, interval)
+    entry = _memory.get(key)
+    if entry is not None:
+        return entry
+    path = _cache_path(symbol, interval)
+    if not path.exists():
+        return None
+    table = pq.read_table(path)
+    coverage = json.loads(table.schema.metadata[_COVERAGE_KEY])
+    # Files written before the compact layout are converted as they are read
+    entry = (compact(table.to_pandas()), pd.Timestamp(coverage["start"]), pd.Timestamp(coverage["end"]))
+    _memory.put(key, *entry)
+    return entry
+
+
+def _write(symbol, interval, frame, lo, hi):
+    """Store ``frame`` (compacted) as the cached history with coverage ``[lo, hi)``; returns the compact frame."""
+    frame = compact(frame)
+    path = _cache_path(symbol, interval)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(frame)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_COVERAGE_KEY] = json.dumps({"start": lo.isoformat(), "end": hi.isoformat()}).encode()
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(table.replace_schema_metadata(metadata), tmp)
+    os.replace(tmp, path)
+    _memory.put((symbol, interval), frame, lo, hi)
+    return frame
+
+
+def load_history(symbol, start_date, end_date, interval="1d"):
+    """Return OHLCV bars for ``symbol`` in ``[start_date, end_date)``, indexed by ``Date``.
+
+    Mirrors ``yf.Ticker(symbol).history(start, end)`` but reads through the
+    local cache and only fetches the dates it has not seen from the provider.
+    """
+    symbol = _normalise_symbol(symbol)
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    # Bars from today onwards may still change, so never mark them as covered
+    horizon = pd.Timestamp.today().normalize()
+
+    with telemetry.span("history", "fetch"), _key_lock(symbol, interval):
+        in_memory = (symbol, interval) in _memory
+        cached = _read(symbol, interval)
+        if cached is None:
+            frame = _download(symbol, start, end, interval)
+            lo, hi, changed = start, min(end, horizon), not frame.empty
+        else:
+            telemetry.count("cache_hits", "history_memory" if in_memory else "history_disk")
+            frame, lo, hi = cached
+            parts = [frame]
+            if start < lo:
+                parts.insert(0, _download(symbol, start, lo, interval))
+                lo = start
+            if end > hi:
+                parts.append(_download(symbol, hi, end, interval))
+                hi = max(hi, min(end, horizon))
+            changed = len(parts) > 1
+            if changed:
+                frame = pd.concat([p for p in parts if not p.empty])
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        if changed:
+            frame = _write(symbol, interval, frame, lo, hi)
+
+    if frame.empty:
+        return compact(frame)
+    dates = _naive(frame.index)
+    # A row slice shares the cached arrays; copy-on-write protects them from callers that modify it
+    return frame.iloc[dates.searchsorted(start):dates.searchsorted(end)]
+
+
+def store_history(symbol, frame, interval="1d"):
+    """Merge already-downloaded bars into the cache and mark their date range as covered.
+
+    Rows in ``frame`` replace cached rows with the same timestamp. Coverage
+    grows to include the frame's first to last date when the two ranges
+    touch; otherwise it becomes the frame's range, so the gap between them is
+    fetched on demand. Returns the number of cached rows.
+    """
+    symbol = _normalise_symbol(symbol)
+    if frame.empty:
+        return 0
+    dates = _naive(frame.index)
+    start = dates.min().normalize()
+    end = min(dates.max().normalize() + pd.Timedelta(days=1), pd.Timestamp.today().normalize())
+    with _key_lock(symbol, interval):
+        cached = _read(symbol, interval)
+        if cached is not None:
+            old, lo, hi = cached
+            frame = pd.concat([old, frame]) if not old.empty else frame
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            if lo <= end and start <= hi:
+                start, end = min(start, lo), max(end, hi)
+        _write(symbol, interval, frame, start, max(start, end))
+    return len(frame)
+
+
+def load_panel(symbols, start_date, end_date, columns=OHLCV_COLUMNS, interval="1d", max_workers=8):
+    """Load several symbols concurrently into one wide frame per column.
+
+    Returns ``(panel, errors)``: ``panel`` maps each of ``columns`` to a
+    date x symbol frame aligned on exchange-local dates, and ``errors`` maps
+    each symbol that failed to the exception (or message) explaining why.
+    One bad symbol never aborts the batch.
+    """
+    symbols = list(dict.fromkeys(s.strip() for s in symbols if s.strip()))
+
+    def fetch(symbol):
+        try:
+            data = load_history(symbol, start_date, end_date, interval)
+        except Exception as e:
+            return symbol, None, e
+        if data.empty:
+            return symbol, None, "no data returned"
+        data.index = _naive(data.index)
+        return symbol, data, None
+
+    frames, errors = {}, {}
+    with telemetry.span("panel", "fetch"), \
+            ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+        for symbol, data, error in pool.map(telemetry.propagate(fetch), symbols):
+            if error is None:
+                frames[symbol] = data
+            else:
+                errors[symbol] = error
+    panel = {}
+    for column in columns:
+        wide = pd.DataFrame({symbol: data[column] for symbol, data in frames.items()})
+        wide.index.name = "Date"
+        panel[column] = wide.sort_index()
+    return panel, errors
+
+
+def load_many(symbols, start_date, end_date, column="Close", interval="1d", max_workers=8):
+    """Load ``column`` for several symbols concurrently as one date x symbol frame.
+
+    Returns ``(wide, errors)``; see ``load_panel``.
+    """
+    panel, errors = load_panel(symbols, start_date, end_date, [column], interval, max_workers)
+    return panel[column], errors
+
+
+def clear_cache(symbol=None, interval=None):
+    """Drop cached history, for one symbol/interval or everything."""
+    with _lock:
+        for key in _memory.keys():
+            if (symbol is None or key[0] == _normalise_symbol(symbol)) and (interval is None or key[1] == interval):
+                _memory.discard(key)
+        pattern = f"{_normalise_symbol(symbol)}.parquet" if symbol else "*.parquet"
+        for path in CACHE_DIR.glob(f"{interval or '*'}/{pattern}"):
+            path.unlink()
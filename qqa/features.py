@@ -0,0 +1,241 @@
+"""Per-symbol feature store for the Predictive Modeling page.
+
+Every feature is materialised once as a column of a memory-mapped store,
+laid out like the intraday bar store: one raw float64 file per column plus
+``meta.json`` with the committed row count and column names. The features
+are:
+
+* the page's original ones, defined as the page always did: ``Prev Close``,
+  and ``MA50``, ``MA200`` and OHLCV *of the row's own bar*. The moving
+  averages include that bar's close, so they leak the target when used to
+  predict it; they are kept for the page's default model, not for
+  forecasting;
+* lagged daily returns (``Return Lag k``, the return of the bar k bars back);
+* every series of the Technical Indicators page (``qqa.indicators``) with
+  default parameters, as of the previous bar.
+
+``Prev Close``, the lagged returns and the indicators only use bars before
+their row, so they can predict that row's close (``qqa.forecast`` uses only
+those).
+
+``FeatureStore.update`` appends rows for bars newer than the last stored
+one. As a deliberate simplification it does not carry indicator state
+forward: every update recomputes all features over the whole history in one
+vectorised pass (about 7 ms for ten years of daily bars) and writes only the
+new rows. ``qqa.streaming`` covers a subset of the indicators, and keeping a
+checkpoint per symbol in step with the stored rows is not worth it at daily
+bar counts. Revised or backfilled history rebuilds the symbol into a fresh
+generation directory, so readers holding memmaps of the old files are never
+truncated under them.
+
+``FeatureView`` is a zero-copy slice; ``frame`` wraps its columns in a
+DataFrame without copying them.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import CACHE_DIR, OHLCV_COLUMNS, load_history
+from qqa.indicators import IndicatorSet, pct_change, rolling_mean, shift
+from qqa.upstream import KeyedLocks
+
+RETURN_LAGS = (1, 2, 3, 5, 10, 20)
+VERSION = 1  # bump when compute_features changes, so stores are rebuilt
+
+
+def compute_features(bars):
+    """All feature columns for an OHLCV frame, as name -> float64 array in store order."""
+    ind = IndicatorSet.from_frame(bars)
+    features = dict(zip(OHLCV_COLUMNS, (ind.open, ind.high, ind.low, ind.close, ind.volume)))
+    features["Prev Close"] = ind.prev_close()
+    features["MA50"] = rolling_mean(ind.close, 50)
+    features["MA200"] = rolling_mean(ind.close, 200)
+    returns = pct_change(ind.close)
+    for lag in RETURN_LAGS:
+        features[f"Return Lag {lag}"] = shift(returns, lag)
+    for name, values in ind.compute().items():
+        if np.ndim(values) == 1 and name not in features:
+            features[name] = shift(values)
+    return {name: np.asarray(values, dtype=np.float64) for name, values in features.items()}
+
+
+def next_row(bars):
+    """Feature values for the bar after the last one in ``bars``, i.e. those known before it opens.
+
+    Computed by appending an empty bar, so its OHLCV (and anything using
+    its close, such as MA50) is NaN.
+    """
+    ahead = pd.concat([bars, pd.DataFrame(np.nan, index=bars.index[-1:] + pd.Timedelta(days=1),
+                                          columns=bars.columns)])
+    return {name: values[-1] for name, values in compute_features(ahead).items()}
+
+
+class FeatureView:
+    """Read-only slice of one symbol's features; columns are memmap views, not copies."""
+
+    def __init__(self, dates, columns):
+        self.dates = dates
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def frame(self, columns=None):
+        """The slice as a ``Date``-indexed DataFrame whose columns share the store's memory."""
+        frame = pd.DataFrame({name: self.columns[name] for name in (columns or self.columns)},
+                             index=self.dates, copy=False)
+        frame.index.name = "Date"
+        return frame
+
+
+class FeatureStore:
+    def __init__(self, root=CACHE_DIR / "features"):
+        self.root = root
+        self._key_locks = KeyedLocks()
+        self.appended = self.rebuilt = 0
+
+    def _key_lock(self, symbol, interval):
+        return self._key_locks((symbol, interval))
+
+    def _dir(self, symbol, interval):
+        return self.root / interval / symbol.strip().upper()
+
+    def _meta(self, symbol, interval):
+        path = self._dir(symbol, interval) / "meta.json"
+        if not path.exists():
+            return {"rows": 0, "tz": None, "columns": [], "generation": 0, "version": VERSION}
+        return json.loads(path.read_text())
+
+    def _files(self, symbol, interval, meta):
+        directory = self._dir(symbol, interval) / str(meta["generation"])
+        return {"Date": directory / "Date.bin",
+                **{name: directory / f"{i:03d}.bin" for i, name in enumerate(meta["columns"])}}
+
+    def _read(self, symbol, interval, meta):
+        if not meta["rows"]:
+            return {"Date": np.empty(0, np.int64), **{name: np.empty(0) for name in meta["columns"]}}
+        return {name: np.memmap(path, dtype=np.int64 if name == "Date" else np.float64, mode="r",
+                                shape=(meta["rows"],))
+                for name, path in self._files(symbol, interval, meta).items()}
+
+    def _commit(self, symbol, interval, meta):
+        directory = self._dir(symbol, interval)
+        tmp = directory / "meta.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, directory / "meta.json")
+
+    def columns(self, symbol, interval="1d"):
+        return self._meta(symbol, interval)["columns"]
+
+    def rows(self, symbol, interval="1d"):
+        return self._meta(symbol, interval)["rows"]
+
+    def span(self, symbol, interval="1d"):
+        """First and last stored timestamps, or ``(None, None)``."""
+        meta = self._meta(symbol, interval)
+        if not meta["rows"]:
+            return None, None
+        dates = self._read(symbol, interval, meta)["Date"]
+        return (pd.Timestamp(int(dates[0]), tz="UTC").tz_convert(meta["tz"]),
+                pd.Timestamp(int(dates[-1]), tz="UTC").tz_convert(meta["tz"]))
+
+    def update(self, symbol, bars, interval="1d"):
+        """Bring the store up to date with ``bars`` (a ``Date``-indexed OHLCV frame); returns rows written.
+
+        ``bars`` must include the stored history (``load_features`` asks for
+        it); if its first bar or any stored close differs, the symbol is
+        rebuilt from ``bars``.
+        """
+        if bars.empty:
+            return 0
+        with self._key_lock(symbol, interval):
+            meta = self._meta(symbol, interval)
+            index = bars.index if bars.index.tz is not None else bars.index.tz_localize("UTC")
+            stamps = index.tz_convert("UTC").as_unit("ns").asi8
+            order = np.argsort(stamps, kind="stable")
+            bars, stamps = bars.iloc[order], stamps[order]
+            stored = self._read(symbol, interval, meta)
+            n = meta["rows"]
+            close = bars["Close"].to_numpy(dtype=np.float64)
+            same = (n and len(stamps) >= n and meta.get("version") == VERSION
+                    and np.array_equal(stamps[:n], stored["Date"])
+                    and np.allclose(close[:n], stored["Close"], rtol=1e-12, equal_nan=True))
+            if same and len(stamps) == n:
+                return 0
+            features = compute_features(bars)
+            if same:
+                new = {"Date": stamps[n:], **{name: values[n:] for name, values in features.items()}}
+                for name, path in self._files(symbol, interval, meta).items():
+                    with open(path, "ab") as handle:
+                        # Drop bytes from an append that never reached meta.json
+                        handle.truncate(n * 8)
+                        handle.write(np.ascontiguousarray(new[name]).tobytes())
+                meta["rows"] = len(stamps)
+                self._commit(symbol, interval, meta)
+                self.appended += 1
+                return len(stamps) - n
+            # First load, a new VERSION or revised history: write a new generation and switch to it
+            old = meta["generation"] if n else None
+            meta = {"rows": len(stamps), "tz": str(index.tz), "columns": list(features),
+                    "generation": meta["generation"] + 1, "version": VERSION}
+            files = self._files(symbol, interval, meta)
+            next(iter(files.values())).parent.mkdir(parents=True, exist_ok=True)
+            for name, path in files.items():
+                path.write_bytes(np.ascontiguousarray(stamps if name == "Date" else features[name]).tobytes())
+            self._commit(symbol, interval, meta)
+            if old is not None:
+                # Open memmaps keep the unlinked files alive until their readers drop them
+                shutil.rmtree(self._dir(symbol, interval) / str(old), ignore_errors=True)
+            self.rebuilt += 1
+            return len(stamps)
+
+    def view(self, symbol, interval="1d", start=None, end=None):
+        """Zero-copy ``FeatureView`` of rows in ``[start, end)`` (exchange-local dates or timestamps)."""
+        meta = self._meta(symbol, interval)
+        columns = self._read(symbol, interval, meta)
+        tz = meta["tz"] or "UTC"
+        lo, hi = 0, meta["rows"]
+        if start is not None:
+            lo = int(np.searchsorted(columns["Date"], _utc_nanos(start, tz), side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(columns["Date"], _utc_nanos(end, tz), side="left"))
+        dates = pd.DatetimeIndex(np.asarray(columns.pop("Date")[lo:hi]).view("datetime64[ns]"), tz="UTC")
+        return FeatureView(dates.tz_convert(tz), {name: values[lo:hi] for name, values in columns.items()})
+
+    def clear(self, symbol=None, interval="1d"):
+        shutil.rmtree(self._dir(symbol, interval) if symbol else self.root, ignore_errors=True)
+
+
+def _utc_nanos(value, tz):
+    stamp = pd.Timestamp(value)
+    if stamp.tz is None:
+        stamp = stamp.tz_localize(tz)
+    return stamp.tz_convert("UTC").as_unit("ns").value
+
+
+store = FeatureStore()
+
+
+@telemetry.span("features")
+def load_features(symbol, start_date, end_date, interval="1d", feature_store=None):
+    """``FeatureView`` for ``[start_date, end_date)``, updating the store from the history cache first.
+
+    The store keeps one contiguous history per symbol, so the bars loaded
+    span both the requested range and what is already stored.
+    """
+    feature_store = feature_store or store
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    first, last = feature_store.span(symbol, interval)
+    if first is not None:
+        start = min(start, first.tz_localize(None).normalize())
+        end = max(end, last.tz_localize(None).normalize() + pd.Timedelta(days=1))
+    if not feature_store.update(symbol, load_history(symbol, start, end, interval), interval):
+        telemetry.count("cache_hits", "features")
+    return feature_store.view(symbol, interval, start_date, end_date)
@@ -0,0 +1,222 @@
+"""Next-bar return forecasts for a whole universe.
+
+Each symbol's feature store rows become scale-free features: lagged returns,
+oscillators and gaps to its moving averages and bands relative to the
+previous close. The target is the bar's return. All symbols are stacked into
+one float32 matrix, then either
+
+* ``pooled``: one Random Forest is fitted on the stacked rows of every
+  symbol (using every core through scikit-learn's threads), or
+* ``per-symbol``: one forest per symbol, fitted in parallel worker
+  processes. joblib hands the stacked matrix to them as a shared read-only
+  memmap instead of copying a slice to each one.
+
+The latest feature row of every symbol is scored in one batched ``predict``
+(one per model in per-symbol mode) to give next-bar estimates. The last
+``holdout`` share of dates is kept out of training to measure the error,
+direction hit rate and prediction throughput. Fitted models are cached in
+the model registry, keyed by the stacked data.
+"""
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import OHLCV_COLUMNS
+from qqa.features import load_features, next_row, store
+from qqa.models import model_key, registry
+
+RETURN_FEATURES = ["Return Lag 1", "Return Lag 2", "Return Lag 3", "Return Lag 5", "Return Lag 10", "Return Lag 20",
+                   "rolling_volatility", "ulcer_index", "drawdown", "RSI", "%K", "%D", "Fisher", "CMF"]
+# Price-level features, made comparable across symbols as a ratio to the previous close
+RELATIVE_FEATURES = {"SMA Gap": "SMA", "EMA Gap": "EMA", "Upper Band Gap": "upper_band",
+                     "Lower Band Gap": "lower_band", "ATR Ratio": "ATR"}
+FEATURES = RETURN_FEATURES + list(RELATIVE_FEATURES)
+MODES = ("pooled", "per-symbol")
+# Subsampled features and rows keep the pooled fit to seconds; returns are too noisy for deep, full trees anyway
+DEFAULT_PARAMS = {"n_estimators": 100, "min_samples_leaf": 20, "max_features": 0.3, "max_samples": 0.5,
+                  "random_state": 42}
+
+
+def scale_free(columns):
+    """``FEATURES`` as float32 arrays from store columns (a ``FeatureView`` or a ``next_row`` dict)."""
+    prev_close = np.asarray(columns["Prev Close"], dtype=np.float64)
+    out = {name: np.asarray(columns[name], dtype=np.float32) for name in RETURN_FEATURES}
+    for name, source in RELATIVE_FEATURES.items():
+        ratio = np.asarray(columns[source], dtype=np.float64) / prev_close
+        out[name] = (ratio if name == "ATR Ratio" else ratio - 1).astype(np.float32)
+    return out
+
+
+class StackedFeatures:
+    """Feature rows of many symbols stacked into one matrix; ``bounds[i]`` are symbol i's rows."""
+
+    def __init__(self, symbols, X, y, dates, bounds, latest, last_close, last_date, errors=None):
+        self.symbols = symbols
+        self.X = X  # (rows, len(FEATURES)) float32, C-contiguous
+        self.y = y  # bar returns, float64
+        self.dates = dates  # int64 UTC nanoseconds per row
+        self.bounds = bounds
+        self.latest = latest  # (symbols, len(FEATURES)): each symbol's next-bar features
+        self.last_close = last_close
+        self.last_date = last_date
+        self.errors = errors or {}
+
+    def __len__(self):
+        return len(self.y)
+
+    def fingerprint(self):
+        digest = hashlib.sha1()
+        for array in (self.X, self.y, self.dates, self.latest):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(",".join(self.symbols).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    @telemetry.span("universe features", "fetch")
+    def load(cls, symbols, start_date, end_date, max_workers=8):
+        """Load every symbol's features through the feature store; symbols that fail go to ``errors``."""
+        symbols = list(dict.fromkeys(s.strip() for s in symbols if s.strip()))
+
+        def fetch(symbol):
+            try:
+                view = load_features(symbol, start_date, end_date)
+                # Continue the stored history the training rows were computed on, so the next row's
+                # EMAs and rolling windows have the same warm-up as theirs
+                latest = next_row(store.view(symbol, end=end_date).frame(OHLCV_COLUMNS))
+            except Exception as e:
+                return symbol, None, e
+            if len(view) < 2:
+                return symbol, None, "not enough bars"
+            columns = scale_free(view)
+            X = np.column_stack([columns[name] for name in FEATURES])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                y = np.asarray(view["Close"]) / np.asarray(view["Prev Close"]) - 1
+            keep = np.isfinite(X).all(axis=1) & np.isfinite(y)
+            nxt = scale_free(latest)
+            return symbol, (X[keep], y[keep], view.dates.asi8[keep], [nxt[name] for name in FEATURES],
+                            float(view["Close"][-1]), view.dates[-1]), None
+
+        parts, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+            for symbol, part, error in pool.map(telemetry.propagate(fetch), symbols):
+                if error is None and len(part[1]):
+                    parts[symbol] = part
+                else:
+                    errors[symbol] = error or "no complete feature rows"
+        names = list(parts)
+        sizes = np.cumsum([0] + [len(parts[s][1]) for s in names])
+        return cls(
+            names,
+            np.ascontiguousarray(np.concatenate([parts[s][0] for s in names]) if names
+                                 else np.empty((0, len(FEATURES)), np.float32)),
+            np.concatenate([parts[s][1] for s in names]) if names else np.empty(0),
+            np.concatenate([parts[s][2] for s in names]) if names else np.empty(0, np.int64),
+            list(zip(sizes[:-1], sizes[1:])),
+            np.array([parts[s][3] for s in names], dtype=np.float32).reshape(len(names), len(FEATURES)),
+            np.array([parts[s][4] for s in names]),
+            [parts[s][5] for s in names],
+            errors,
+        )
+
+
+def _fit(X, y, rows, params, n_jobs=1):
+    from sklearn.ensemble import RandomForestRegressor
+
+    model = RandomForestRegressor(n_jobs=n_jobs, **params)
+    model.fit(X[rows], y[rows])
+    return model
+
+
+def _fit_symbol(X, y, dates, lo, hi, cutoff, params):
+    # X arrives as a read-only memmap shared by every worker; only this symbol's rows are read
+    rows = np.arange(lo, hi)[dates[lo:hi] < cutoff]
+    return _fit(X, y, rows, params) if len(rows) else None
+
+
+def train_universe(data, mode="pooled", params=None, holdout=0.2, n_jobs=-1):
+    """Fit the universe model(s) on all but the last ``holdout`` share of dates.
+
+    Returns ``(models, cutoff, fit_seconds, cached)``: one model (pooled) or
+    one per symbol (``None`` where a symbol has no training rows).
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    cutoff = np.quantile(data.dates, 1 - holdout) if holdout else np.iinfo(np.int64).max
+    key = model_key(f"universe:{mode}", data.dates.min(), data.dates.max(), FEATURES,
+                    {**params, "holdout": holdout}, data.fingerprint())
+
+    def train():
+        started = time.perf_counter()
+        if mode == "pooled":
+            models = _fit(data.X, data.y, np.flatnonzero(data.dates < cutoff), params, n_jobs)
+        else:
+            models = joblib.Parallel(n_jobs=n_jobs)(
+                joblib.delayed(_fit_symbol)(data.X, data.y, data.dates, lo, hi, cutoff, params)
+                for lo, hi in data.bounds)
+        return {"models": models, "fit_seconds": time.perf_counter() - started}
+
+    fits = registry.fits
+    trained = registry.get_or_train(key, train)
+    return trained["models"], cutoff, trained["fit_seconds"], registry.fits == fits
+
+
+def _predict(models, data, rows_by_symbol):
+    """Predictions for the given rows of each symbol: one call for a pooled model, one per symbol otherwise."""
+    if not isinstance(models, list):
+        return models.predict(data.X[np.concatenate(rows_by_symbol)])
+    return np.concatenate([
+        models[i].predict(data.X[rows]) if models[i] is not None and len(rows) else np.full(len(rows), np.nan)
+        for i, rows in enumerate(rows_by_symbol)])
+
+
+@telemetry.span("universe forecast", "model")
+def forecast_universe(data, mode="pooled", params=None, holdout=0.2, n_jobs=-1):
+    """Train (or reuse) the universe model and forecast every symbol's next bar.
+
+    Returns ``(forecasts, summary)``: one row per symbol (Last Date, Close,
+    Predicted Return, Predicted Close) and the training/inference timings
+    with the holdout metrics (MSE, R², direction hit rate).
+    """
+    models, cutoff, fit_seconds, cached = train_universe(data, mode, params, holdout, n_jobs)
+    summary = {"Mode": mode, "Symbols": len(data.symbols), "Rows": len(data),
+               "Train Rows": int((data.dates < cutoff).sum()), "Fit Seconds": fit_seconds, "Cached": cached}
+
+    test = [np.arange(lo, hi)[data.dates[lo:hi] >= cutoff] for lo, hi in data.bounds]
+    n_test = sum(len(rows) for rows in test)
+    if n_test:
+        started = time.perf_counter()
+        predicted = _predict(models, data, test)
+        seconds = time.perf_counter() - started
+        actual = data.y[np.concatenate(test)]
+        ok = np.isfinite(predicted)
+        errors = actual[ok] - predicted[ok]
+        summary.update({
+            "Test Rows": n_test,
+            "Test MSE": float(np.mean(errors ** 2)),
+            "Test R²": float(1 - np.sum(errors ** 2) / np.sum((actual[ok] - actual[ok].mean()) ** 2)),
+            "Hit Rate": float(np.mean(np.sign(predicted[ok]) == np.sign(actual[ok]))),
+            "Predictions/sec": n_test / seconds if seconds else float("inf"),
+        })
+
+    # Symbols whose latest features are incomplete (e.g. a flat window for the Fisher transform) get no forecast
+    ready = np.isfinite(data.latest).all(axis=1)
+    predicted = np.full(len(data.symbols), np.nan)
+    started = time.perf_counter()
+    if isinstance(models, list):
+        for i in np.flatnonzero(ready):
+            if models[i] is not None:
+                predicted[i] = models[i].predict(data.latest[i:i + 1])[0]
+    elif ready.any():
+        predicted[ready] = models.predict(data.latest[ready])  # the whole universe in one batch
+    summary["Forecast Seconds"] = time.perf_counter() - started
+    forecasts = pd.DataFrame({
+        "Last Date": data.last_date,
+        "Close": data.last_close,
+        "Predicted Return": predicted,
+        "Predicted Close": data.last_close * (1 + predicted),
+    }, index=pd.Index(data.symbols, name="Symbol"))
+    return forecasts.sort_values("Predicted Return", ascending=False), summary
@@ -0,0 +1,384 @@
+"""NumPy implementation of the technical indicators shown on the Technical Indicators page.
+
+``IndicatorSet`` wraps one symbol's OHLCV arrays and memoises every shared
+intermediate (previous close, true range, EMAs, rolling windows), so asking
+for several indicators at once computes each building block a single time::
+
+    ind = IndicatorSet.from_frame(df)
+    out = ind.compute(["MACD", "ATR", "Keltner"])
+
+Every formula reproduces the pandas expression the page used before, including
+where the first values are NaN, with two intentional changes:
+
+* The true range (``TR``, ``ATR`` and Keltner's width) is the maximum of all
+  three of ``High - Low``, ``|High - prev Close|`` and ``|Low - prev Close|``.
+  The page's ATR called ``np.maximum(H - L, |H - prevC|, |L - prevC|)``,
+  which passes the third term as ``out``, so it was a two-way maximum that
+  missed gaps down; Keltner already used all three.
+* RSI is NaN for the window after a missing close instead of counting that
+  bar as an unchanged close.
+
+Arrays may also be 2-D (time x symbol); all operations run along axis 0, so
+a whole universe is computed in one pass.
+"""
+import functools
+import inspect
+
+import numpy as np
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+TRADING_DAYS = 252
+
+# Rows per block when a rolling window is materialised with sliding_window_view
+_BLOCK = 1 << 16
+
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def shift(x, periods=1):
+    out = np.empty_like(x)
+    out[:periods] = np.nan
+    out[periods:] = x[:-periods]
+    return out
+
+
+def diff(x):
+    return x - shift(x)
+
+
+def pct_change(x):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / shift(x) - 1
+
+
+def cumsum(x):
+    """``Series.cumsum()``: NaNs are skipped but stay NaN in the output."""
+    out = np.nancumsum(x, axis=0)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def cumprod(x):
+    out = np.nancumprod(x, axis=0)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def rolling_sum(x, window):
+    """``Series.rolling(window).sum()``: NaN until the window is full or while it holds a NaN."""
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    missing = np.isnan(x)
+    zero = np.zeros((1,) + x.shape[1:])
+    total = np.concatenate((zero, np.cumsum(np.where(missing, 0.0, x), axis=0)))
+    gaps = np.concatenate((zero, np.cumsum(missing, axis=0)))
+    sums = total[window:] - total[:-window]
+    sums[(gaps[window:] - gaps[:-window]) > 0] = np.nan
+    out[window - 1:] = sums
+    return out
+
+
+def rolling_mean(x, window):
+    return rolling_sum(x, window) / window
+
+
+def _rolling_reduce(x, window, reduce):
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    views = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+    for start in range(0, len(views), _BLOCK):
+        out[window - 1 + start:window - 1 + start + _BLOCK] = reduce(views[start:start + _BLOCK])
+    return out
+
+
+def rolling_max(x, window):
+    return _rolling_reduce(x, window, lambda v: v.max(axis=-1))
+
+
+def rolling_min(x, window):
+    return _rolling_reduce(x, window, lambda v: v.min(axis=-1))
+
+
+def rolling_std(x, window):
+    """Sample standard deviation (ddof=1), like ``Series.rolling(window).std()``."""
+    return _rolling_reduce(x, window, lambda v: v.std(axis=-1, ddof=1))
+
+
+def ewm_mean(x, span, adjust=False):
+    """``Series.ewm(span=span, adjust=adjust).mean()``.
+
+    Leading NaNs (a symbol listed after the start of a universe) stay NaN and
+    the average starts at the first valid value. Series with interior gaps,
+    whose weights the linear filter cannot follow, are handed to pandas.
+    """
+    # Deferred: scipy costs most of a second to import and only the EMA family needs it
+    from scipy.signal import lfilter
+
+    if len(x) == 0:
+        return np.empty(x.shape)
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    missing = np.isnan(x)
+    leading = np.logical_and.accumulate(missing, axis=0)
+    if (missing & ~leading).any():
+        import pandas as pd
+
+        return pd.DataFrame(x.reshape(len(x), -1)).ewm(span=span, adjust=adjust).mean().to_numpy().reshape(x.shape)
+    if not adjust:
+        # Holding the first valid value through the lead-in leaves the recursion unchanged
+        first = x[np.argmin(leading, axis=0), np.arange(x.shape[1])] if x.ndim == 2 else x[np.argmin(leading)]
+        start = np.where(leading, first, x)
+        out, _ = lfilter([alpha], [1.0, -decay], start, axis=0, zi=decay * start[:1])
+    else:
+        weighted = lfilter([1.0], [1.0, -decay], np.where(leading, 0.0, x), axis=0)
+        weights = lfilter([1.0], [1.0, -decay], np.where(leading, 0.0, 1.0), axis=0)
+        with np.errstate(invalid="ignore"):
+            out = weighted / weights
+    out[leading] = np.nan
+    return out
+
+
+def _memoized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        key = (method.__name__,) + args
+        if key not in self._cache:
+            self._cache[key] = method(self, *args)
+        return self._cache[key]
+    return wrapper
+
+
+class IndicatorSet:
+    """Indicators for one OHLCV series, sharing intermediates across calls."""
+
+    def __init__(self, open_, high, low, close, volume):
+        self.open = _as_array(open_)
+        self.high = _as_array(high)
+        self.low = _as_array(low)
+        self.close = _as_array(close)
+        self.volume = _as_array(volume)
+        self._cache = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(*(df[column].to_numpy() for column in OHLCV_COLUMNS))
+
+    @classmethod
+    def from_panel(cls, panel):
+        """Build from a mapping of OHLCV column -> 2-D (time x symbol) array or wide frame."""
+        return cls(*(np.asarray(panel[column]) for column in OHLCV_COLUMNS))
+
+    def __len__(self):
+        return len(self.close)
+
+    # Shared intermediates
+
+    @_memoized
+    def prev_close(self):
+        return shift(self.close)
+
+    @_memoized
+    def close_change(self):
+        return self.close - self.prev_close()
+
+    @_memoized
+    def daily_return(self):
+        return pct_change(self.close)
+
+    @_memoized
+    def true_range(self):
+        # Three-way maximum; the page's old ATR dropped |Low - prev Close| (see the module docstring)
+        prev_close = self.prev_close()
+        return np.maximum(self.high - self.low,
+                          np.maximum(np.abs(self.high - prev_close), np.abs(self.low - prev_close)))
+
+    @_memoized
+    def hl_range(self):
+        return self.high - self.low
+
+    @_memoized
+    def close_ema(self, span, adjust=False):
+        return ewm_mean(self.close, span, adjust)
+
+    @_memoized
+    def close_mean(self, window):
+        return rolling_mean(self.close, window)
+
+    @_memoized
+    def close_std(self, window):
+        return rolling_std(self.close, window)
+
+    @_memoized
+    def close_max(self, window):
+        return rolling_max(self.close, window)
+
+    @_memoized
+    def close_min(self, window):
+        return rolling_min(self.close, window)
+
+    @_memoized
+    def high_max(self, window):
+        return rolling_max(self.high, window)
+
+    @_memoized
+    def low_min(self, window):
+        return rolling_min(self.low, window)
+
+    @_memoized
+    def average_true_range(self, window):
+        return rolling_mean(self.true_range(), window)
+
+    # Price trend & moving averages
+
+    def sma(self, sma_period=50):
+        return {"SMA": self.close_mean(sma_period)}
+
+    def ema(self, ema_period=50):
+        return {"EMA": self.close_ema(ema_period)}
+
+    def vwap(self):
+        return {"VWAP": cumsum(self.close * self.volume) / cumsum(self.volume)}
+
+    def macd(self):
+        macd = self.close_ema(12) - self.close_ema(26)
+        return {"MACD": macd, "Signal_Line": ewm_mean(macd, 9)}
+
+    # Volatility & risk
+
+    def volatility(self, volatility_window=30):
+        daily_return = self.daily_return()
+        return {
+            "daily_return": daily_return,
+            "annualized_volatility": np.nanstd(daily_return, axis=0, ddof=1) * np.sqrt(TRADING_DAYS),
+            "rolling_volatility": rolling_std(daily_return, volatility_window) * np.sqrt(TRADING_DAYS),
+        }
+
+    def atr(self, atr_window=14):
+        return {"TR": self.true_range(), "ATR": self.average_true_range(atr_window)}
+
+    def ulcer(self, ulcer_window=14):
+        drawdown = self.close / np.fmax.accumulate(self.close, axis=0) - 1
+        return {"drawdown": drawdown, "ulcer_index": np.sqrt(rolling_mean(drawdown ** 2, ulcer_window))}
+
+    # Momentum
+
+    def rsi(self, rsi_window=14):
+        delta = self.close_change()
+        # A missing change counts as zero (as in pandas' where), but a missing close does not: unlike
+        # the page's old formula, RSI is NaN for the window after one
+        missing = np.isnan(self.close)
+        avg_gain = rolling_mean(np.where(missing, np.nan, np.where(delta > 0, delta, 0.0)), rsi_window)
+        avg_loss = rolling_mean(np.where(missing, np.nan, np.where(delta < 0, -delta, 0.0)), rsi_window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+        return {"RSI": 100 - 100 / (1 + rs)}
+
+    def stochastic(self, stochastic_window=14):
+        low = self.low_min(stochastic_window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = 100 * (self.close - low) / (self.high_max(stochastic_window) - low)
+        return {"%K": k, "%D": rolling_mean(k, 3)}
+
+    def fisher(self, fisher_window=10):
+        low = self.close_min(fisher_window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = 2 * ((self.close - low) / (self.close_max(fisher_window) - low) - 0.5)
+            return {"Fisher": 0.5 * np.log((1 + value) / (1 - value))}
+
+    # Volume
+
+    def obv(self):
+        return {"OBV": cumsum(np.where(self.close_change() > 0, 1.0, -1.0) * self.volume)}
+
+    def iix(self, iix_window=14):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            intensity = (self.close - self.low) / self.hl_range() * self.volume
+        return {"IIX": rolling_mean(intensity, iix_window)}
+
+    def cmf(self, cmf_window=20):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mfv = ((self.close - self.low) - (self.high - self.close)) / self.hl_range() * self.volume
+            return {"CMF": rolling_sum(mfv, cmf_window) / rolling_sum(self.volume, cmf_window)}
+
+    # Support, resistance & channels
+
+    def bollinger(self, bollinger_window=20):
+        mid = self.close_mean(bollinger_window)
+        width = 2 * self.close_std(bollinger_window)
+        return {"bollinger_mid": mid, "upper_band": mid + width, "lower_band": mid - width}
+
+    def keltner(self, keltner_window=20):
+        mid = self.close_ema(keltner_window, True)
+        width = 2 * self.average_true_range(keltner_window)
+        return {"keltner_mid": mid, "upper_keltner": mid + width, "lower_keltner": mid - width}
+
+    def donchian(self, donchian_window=20):
+        return {"donchian_upper": self.high_max(donchian_window), "donchian_lower": self.low_min(donchian_window)}
+
+    # Trade & market behaviour
+
+    def returns(self):
+        daily_return = self.daily_return()
+        return {
+            "Daily Return": daily_return,
+            "Cumulative Return": cumprod(1 + daily_return) - 1,
+            "Summed Return": cumsum(daily_return),
+        }
+
+    def efi(self):
+        return {"EFI": self.volume * self.close_change()}
+
+    def compute(self, indicators=None, **params):
+        """Compute several indicator groups in one pass and merge their outputs.
+
+        ``params`` are the keyword arguments of the individual methods
+        (``sma_period``, ``atr_window``, ...); each group only receives its own.
+        """
+        out = {}
+        for name in indicators or INDICATORS:
+            method = getattr(self, INDICATORS[name])
+            accepted = inspect.signature(method).parameters
+            out.update(method(**{k: v for k, v in params.items() if k in accepted}))
+        return out
+
+
+# Indicator group name -> IndicatorSet method
+INDICATORS = {
+    "SMA": "sma",
+    "EMA": "ema",
+    "VWAP": "vwap",
+    "MACD": "macd",
+    "Volatility": "volatility",
+    "ATR": "atr",
+    "Ulcer": "ulcer",
+    "RSI": "rsi",
+    "Stochastic": "stochastic",
+    "Fisher": "fisher",
+    "OBV": "obv",
+    "IIX": "iix",
+    "CMF": "cmf",
+    "Bollinger": "bollinger",
+    "Keltner": "keltner",
+    "Donchian": "donchian",
+    "Returns": "returns",
+    "EFI": "efi",
+}
+
+# Technical Indicators page category -> the indicator groups it shows
+CATEGORIES = {
+    "Price Trend & Moving Averages": ["SMA", "EMA", "VWAP", "MACD"],
+    "Volatility & Risk Metrics": ["Volatility", "ATR", "Ulcer"],
+    "Momentum & Overbought/Oversold Indicators": ["RSI", "Stochastic", "Fisher"],
+    "Volume-Based Indicators": ["OBV", "IIX", "CMF"],
+    "Support, Resistance & Channel-Based Indicators": ["Bollinger", "Keltner", "Donchian"],
+    "Trade & Market Behavior Analysis": ["Returns", "EFI"],
+}
+
+
+def compute(df, indicators=None, **params):
+    """Compute ``indicators`` (default: all) for an OHLCV frame, returning column name -> array."""
+    return IndicatorSet.from_frame(df).compute(indicators, **params)
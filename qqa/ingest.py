@@ -0,0 +1,104 @@
+"""Bulk-load vendor CSV/Parquet dumps into the app's caches.
+
+Daily files go into the Parquet history cache with their date range marked
+as covered, so ``load_history`` serves them without asking a provider.
+Intraday files are appended to the memory-mapped bar store. Files are parsed
+in parallel (the pyarrow readers release the GIL)::
+
+    python -m qqa.ingest /data/nifty50 --suffix .NS
+
+The directory layout is the one ``qqa.providers.LocalProvider`` reads:
+``<dir>/<SYMBOL>.csv`` for daily bars and ``<dir>/<interval>/<SYMBOL>.csv``
+for any interval.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from qqa.barstore import INTRADAY_INTERVALS, store
+from qqa.data import store_history
+from qqa.providers import EXCHANGE_TZ, read_vendor_file, vendor_files
+
+
+def _symbol(stem, suffix):
+    return stem if not suffix or "." in stem else stem + suffix
+
+
+def ingest_file(path, symbol, interval="1d", tz=EXCHANGE_TZ, bar_store=None):
+    """Ingest one dump; returns ``(rows_read, rows_written)``.
+
+    Intraday bars older than the newest stored bar are skipped, since the
+    bar store is append-only; ingest history before the first live sync.
+    """
+    frame = read_vendor_file(path, tz)
+    if interval in INTRADAY_INTERVALS:
+        return len(frame), (bar_store or store).append(symbol, interval, frame)
+    store_history(symbol, frame, interval)
+    return len(frame), len(frame)
+
+
+def ingest_directory(directory, intervals=None, suffix="", tz=EXCHANGE_TZ, max_workers=8, bar_store=None):
+    """Ingest every vendor dump under ``directory``.
+
+    Returns ``(report, errors)``: ``report`` has one row per file (Symbol,
+    Interval, File, Rows, Written, Seconds) with overall totals in
+    ``report.attrs`` (rows, seconds, rows_per_second), and ``errors`` maps
+    each file that failed to its exception. One bad file never aborts the batch.
+    """
+    directory = Path(directory)
+    if intervals is None:
+        intervals = ["1d"] + [p.name for p in sorted(directory.iterdir()) if p.is_dir() and p.name != "1d"]
+    jobs = [(_symbol(stem, suffix), interval, path)
+            for interval in intervals for stem, path in vendor_files(directory, interval).items()]
+
+    def run(job):
+        symbol, interval, path = job
+        started = time.perf_counter()
+        try:
+            rows, written = ingest_file(path, symbol, interval, tz, bar_store)
+        except Exception as e:
+            return job, None, e
+        return job, {"Symbol": symbol, "Interval": interval, "File": path.name, "Rows": rows,
+                     "Written": written, "Seconds": time.perf_counter() - started}, None
+
+    started = time.perf_counter()
+    rows, errors = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+        for job, row, error in pool.map(run, jobs):
+            if error is None:
+                rows.append(row)
+            else:
+                errors[str(job[2])] = error
+    seconds = time.perf_counter() - started
+    report = pd.DataFrame(rows, columns=["Symbol", "Interval", "File", "Rows", "Written", "Seconds"])
+    total = int(report["Rows"].sum())
+    report.attrs.update(rows=total, seconds=seconds, rows_per_second=total / seconds if seconds else 0.0)
+    return report, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load vendor OHLCV dumps into the local caches.")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--interval", action="append", dest="intervals",
+                        help="interval sub-directory to ingest (repeatable; default: all)")
+    parser.add_argument("--suffix", default="", help="exchange suffix for bare file names, e.g. .NS")
+    parser.add_argument("--tz", default=EXCHANGE_TZ, help="timezone of timestamps without one")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    report, errors = ingest_directory(args.directory, args.intervals, args.suffix, args.tz, args.workers)
+    for interval, group in report.groupby("Interval"):
+        print(f"{interval:>4}: {len(group)} files, {group['Rows'].sum():,} rows, {group['Written'].sum():,} written")
+    for path, error in errors.items():
+        print(f"failed: {path}: {error}", file=sys.stderr)
+    print(f"{report.attrs['rows']:,} rows in {report.attrs['seconds']:.2f}s "
+          f"({report.attrs['rows_per_second']:,.0f} rows/sec)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
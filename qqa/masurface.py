@@ -0,0 +1,147 @@
+"""Moving averages for every period in a range, precomputed once per series.
+
+An ``MASurface`` holds the SMA and EMA of a close series for each period in
+``periods`` (the Technical Indicators page's 5-200 slider range) as rows of
+a float32 array. The SMA rows all come from one cumulative-sum pass, since
+the sum of any window is a difference of two prefix sums. Surfaces are
+stored as ``.npy`` files keyed by a hash of the series and opened
+memory-mapped, so looking up a period is a row slice and other sessions or
+restarts reuse the file.
+
+The same rows back period sweeps (``tracking_error``, ``crossover_sweep``)
+that compare every period or fast/slow pair without recomputing any average.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import CACHE_DIR
+from qqa.indicators import TRADING_DAYS, ewm_mean, pct_change
+from qqa.upstream import coordinator
+
+PERIODS = range(5, 201)
+MAX_FILES = 64
+
+
+class MASurface:
+    def __init__(self, periods, values):
+        self.periods = periods
+        self.values = values  # (2, len(periods), n_bars) float32: SMA rows, then EMA rows
+
+    def __len__(self):
+        return self.values.shape[2]
+
+    def _index(self, period):
+        if period not in self.periods:
+            raise ValueError(f"period {period} is outside the surface range {self.periods.start}-{self.periods[-1]}")
+        return self.periods.index(period)
+
+    def sma(self, period):
+        return self.values[0, self._index(period)]
+
+    def ema(self, period):
+        return self.values[1, self._index(period)]
+
+    def rows(self, kind="sma"):
+        """All rows of one kind as a (period x bar) array."""
+        return self.values[{"sma": 0, "ema": 1}[kind]]
+
+    @classmethod
+    def build(cls, close, periods=PERIODS, out=None):
+        """Compute the surface for ``close``; ``out`` may be a preallocated (e.g. memory-mapped) array."""
+        x = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(x)
+        values = np.empty((2, len(periods), n), dtype=np.float32) if out is None else out
+        missing = np.isnan(x)
+        total = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, x))))
+        gaps = np.concatenate(([0], np.cumsum(missing)))
+        for i, period in enumerate(periods):
+            # Same arithmetic as indicators.rolling_mean, one subtraction per period
+            row = values[0, i]
+            row[:period - 1] = np.nan
+            if n >= period:
+                means = (total[period:] - total[:-period]) / period
+                means[(gaps[period:] - gaps[:-period]) > 0] = np.nan
+                row[period - 1:] = means
+            values[1, i] = ewm_mean(x, period)
+        return cls(periods, values)
+
+    def tracking_error(self, close, kind="sma"):
+        """Root-mean-square distance between ``close`` and each period's average, as a series by period."""
+        rows = self.rows(kind)
+        with np.errstate(invalid="ignore"):
+            error = np.sqrt(np.nanmean((rows - np.asarray(close, dtype=np.float32)) ** 2, axis=1))
+        return pd.Series(error, index=pd.Index(list(self.periods), name="Period"), name="Tracking Error")
+
+    def crossover_sweep(self, close, kind="sma", step=1, periods_per_year=TRADING_DAYS):
+        """Score every fast/slow crossover pair, long while the fast average is above the slow one.
+
+        Returns one row per pair (Fast, Slow, Total Return, Sharpe, Trades),
+        best Sharpe first. ``step`` thins the periods considered.
+        """
+        rows = self.rows(kind)[::step]
+        periods = list(self.periods)[::step]
+        returns = np.nan_to_num(pct_change(np.asarray(close, dtype=np.float64))[1:])
+        results = []
+        for i, fast in enumerate(periods[:-1]):
+            # Positions held over each next bar, for every slower period at once
+            long = rows[i] > rows[i + 1:]
+            strategy = long[:, :-1] * returns
+            with np.errstate(invalid="ignore", divide="ignore"):
+                sharpe = strategy.mean(axis=1) / strategy.std(axis=1) * np.sqrt(periods_per_year)
+            results.append(pd.DataFrame({
+                "Fast": fast,
+                "Slow": periods[i + 1:],
+                "Total Return": np.expm1(np.log1p(strategy).sum(axis=1)),
+                "Sharpe": sharpe,
+                "Trades": np.count_nonzero(np.diff(long, axis=1), axis=1),
+            }))
+        if not results:
+            return pd.DataFrame(columns=["Fast", "Slow", "Total Return", "Sharpe", "Trades"])
+        table = pd.concat(results, ignore_index=True)
+        return table.sort_values("Sharpe", ascending=False, na_position="last", ignore_index=True)
+
+
+def _key(close, periods):
+    digest = hashlib.sha1(np.ascontiguousarray(close, dtype=np.float64).tobytes())
+    digest.update(f"{periods.start}:{periods.stop}:{periods.step}".encode())
+    return digest.hexdigest()
+
+
+@telemetry.span("ma surface")
+def surface_for(close, periods=PERIODS, directory=None):
+    """Memory-mapped ``MASurface`` for ``close``, built and stored on first use."""
+    directory = directory or CACHE_DIR / "surfaces"
+    path = directory / f"{_key(close, periods)}.npy"
+    if path.exists():
+        os.utime(path)
+        telemetry.count("cache_hits", "ma_surface")
+    else:
+        # The prefetcher and page sessions ask for the same surface at once: build it a single time
+        coordinator.single_flight(("ma surface", str(path)), lambda: _build(close, periods, path))
+    return MASurface(periods, np.load(path, mmap_mode="r"))
+
+
+def _build(close, periods, path):
+    if path.exists():
+        return  # built by a caller that finished just before this one started
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A temp file per writer, so another process building the same surface never truncates this one
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix=".tmp")
+    os.close(fd)
+    try:
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(2, len(periods), len(close)))
+        MASurface.build(close, periods, out)
+        out.flush()
+        del out
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    files = sorted(path.parent.glob("*.npy"), key=lambda p: p.stat().st_mtime)
+    for stale in files[:-MAX_FILES]:
+        stale.unlink(missing_ok=True)
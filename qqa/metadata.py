@@ -0,0 +1,158 @@
+"""Company metadata (``Ticker.info``) cache with per-field expiry.
+
+Fetching ``info`` costs several upstream requests while the values change at
+most daily, so each symbol's metadata is kept in memory and as one JSON file
+on disk. Every field carries the time it was fetched and expires after its
+own TTL: price-dependent fields such as market cap and P/E after a few
+hours, descriptive ones such as name and industry after a week. A field that
+was asked for but missing from the response is timed the same way, so a
+symbol without a P/E is not refetched on every read.
+
+Reads are stale-while-revalidate: expired values are returned immediately
+and a background refresh is started, so only a symbol that was never seen
+waits for upstream.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from qqa import telemetry
+from qqa.data import CACHE_DIR, _normalise_symbol
+from qqa.upstream import coordinator
+
+HOUR = 3600
+DEFAULT_TTL = 7 * 24 * HOUR
+# Fields that move with the share price expire sooner than descriptive ones
+FIELD_TTLS = {
+    "marketCap": 12 * HOUR,
+    "trailingPE": 12 * HOUR,
+    "forwardPE": 12 * HOUR,
+    "currentPrice": HOUR,
+    "trailingEps": 3 * 24 * HOUR,
+}
+
+
+class MetadataCache:
+    def __init__(self, directory=CACHE_DIR / "info", ttls=FIELD_TTLS, default_ttl=DEFAULT_TTL, max_workers=8):
+        self.directory = directory
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # symbol -> {"values": {...}, "fetched": {field: epoch seconds}}
+        self._refreshing = {}  # symbol -> Future of the running refresh
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qqa-metadata")
+        self.errors = {}
+        self.hits = self.stale = self.fetches = 0
+
+    def _path(self, symbol):
+        return self.directory / f"{symbol}.json"
+
+    def _entry(self, symbol):
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if entry is None and self._path(symbol).exists():
+            entry = json.loads(self._path(symbol).read_text())
+            with self._lock:
+                entry = self._entries.setdefault(symbol, entry)
+        return entry
+
+    def _fetch(self, symbol, fields=()):
+        values = coordinator.info(symbol) or {}
+        telemetry.count("upstream_calls", "metadata")
+        telemetry.count("bytes_downloaded", "metadata", len(json.dumps(values, default=str)))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(symbol) or {"values": {}, "fetched": {}}
+            # Fields missing from this response keep their previous value; requested ones count as
+            # fetched anyway, so their TTL also applies to a miss
+            entry = {"values": {**entry["values"], **values},
+                     "fetched": {**entry["fetched"], **{field: now for field in (*values, *fields)}}}
+            self._entries[symbol] = entry
+            self.fetches += 1
+            self.errors.pop(symbol, None)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(symbol).with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, default=str))
+        os.replace(tmp, self._path(symbol))
+        return entry
+
+    def _refresh_in_background(self, symbol, fields=()):
+        def run():
+            try:
+                self._fetch(symbol, fields)
+            except Exception as e:
+                self.errors[symbol] = e
+            finally:
+                with self._lock:
+                    self._refreshing.pop(symbol, None)
+
+        with self._lock:
+            if symbol not in self._refreshing:
+                self._refreshing[symbol] = self._pool.submit(run)
+            return self._refreshing[symbol]
+
+    def expired(self, symbol, fields=None, now=None):
+        """Fields of ``symbol`` (default: all cached ones) whose TTL has run out."""
+        entry = self._entry(_normalise_symbol(symbol))
+        if entry is None:
+            return list(fields or [])
+        now = time.time() if now is None else now
+        fetched = entry["fetched"]
+        return [field for field in (fields or fetched)
+                if now - fetched.get(field, 0) > self.ttls.get(field, self.default_ttl)]
+
+    def get(self, symbol, fields=None):
+        """Metadata for ``symbol`` as a dict, refreshed in the background once any of ``fields`` expires.
+
+        Blocks only when nothing is cached for ``symbol`` yet.
+        """
+        symbol = _normalise_symbol(symbol)
+        with telemetry.span("company info", "fetch"):
+            entry = self._entry(symbol)
+            if entry is None:
+                # Sessions asking for a new symbol together wait on one fetch
+                entry = coordinator.single_flight(("metadata", symbol), lambda: self._fetch(symbol, fields or ()))
+            elif self.expired(symbol, fields):
+                self.stale += 1
+                telemetry.count("cache_hits", "metadata_stale")
+                self._refresh_in_background(symbol, fields or ())
+            else:
+                self.hits += 1
+                telemetry.count("cache_hits", "metadata")
+        return dict(entry["values"])
+
+    def age(self, symbol):
+        """Seconds since the oldest cached field of ``symbol`` was fetched, or ``None``."""
+        entry = self._entry(_normalise_symbol(symbol))
+        if entry is None or not entry["fetched"]:
+            return None
+        return time.time() - min(entry["fetched"].values())
+
+    def refreshing(self, symbol):
+        return _normalise_symbol(symbol) in self._refreshing
+
+    def prefetch(self, symbols, fields=None):
+        """Fetch metadata for every symbol that is missing or expired, in parallel.
+
+        Returns ``(fetched, errors)``: the number of symbols refreshed and a map
+        of each symbol that failed to its exception.
+        """
+        symbols = [s for s in dict.fromkeys(_normalise_symbol(s) for s in symbols if s.strip())
+                   if self._entry(s) is None or self.expired(s, fields)]
+        futures = {symbol: self._refresh_in_background(symbol, fields or ()) for symbol in symbols}
+        for future in futures.values():
+            future.result()
+        errors = {symbol: self.errors[symbol] for symbol in symbols if symbol in self.errors}
+        return len(symbols) - len(errors), errors
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._entries.clear()
+        if disk:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+metadata = MetadataCache()
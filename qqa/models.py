@@ -0,0 +1,138 @@
+"""Fitted-model registry for the Predictive Modeling page.
+
+Training results are keyed by everything that determines them: symbol, date
+range, feature set, hyperparameters and a fingerprint of the training data.
+They are kept in an in-memory LRU bounded by entry count and serialised size,
+and persisted to disk with joblib so restarts and other sessions reuse them.
+A widget change that does not alter the key only costs a dictionary lookup.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import joblib
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import CACHE_DIR
+from qqa.upstream import KeyedLocks
+
+
+def fingerprint(*frames):
+    """Stable hash of the values (and index) of one or more frames or series."""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def model_key(symbol, start_date, end_date, features, params, data_hash=""):
+    payload = {
+        "symbol": symbol.strip().upper(),
+        "start": str(start_date),
+        "end": str(end_date),
+        "features": list(features),
+        "params": {k: params[k] for k in sorted(params)},
+        "data": data_hash,
+    }
+    return hashlib.sha1(json.dumps(payload, default=str).encode()).hexdigest()
+
+
+class ModelRegistry:
+    """LRU of fitted models with a joblib store on disk."""
+
+    def __init__(self, directory=CACHE_DIR / "models", max_entries=32, max_bytes=512 * 2**20, max_files=256):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._entries = OrderedDict()  # key -> (value, size in bytes)
+        self._lock = threading.Lock()
+        # Reentrant, since get_or_train calls put while holding the key's lock
+        self._key_locks = KeyedLocks(reentrant=True)
+        self.hits = self.loads = self.fits = 0
+
+    def _path(self, key):
+        return self.directory / f"{key}.joblib"
+
+    def _key_lock(self, key):
+        return self._key_locks(key)
+
+    def _remember(self, key, value, size):
+        with self._lock:
+            self._entries[key] = (value, size)
+            self._entries.move_to_end(key)
+            while len(self._entries) > 1 and (
+                    len(self._entries) > self.max_entries
+                    or sum(s for _, s in self._entries.values()) > self.max_bytes):
+                self._entries.popitem(last=False)
+
+    def _persist(self, key, value):
+        buffer = io.BytesIO()
+        joblib.dump(value, buffer)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # A temp file per writer, so another process saving the same key never interleaves with this one
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=key, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(buffer.getvalue())
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        files = sorted(self.directory.glob("*.joblib"), key=lambda p: p.stat().st_mtime)
+        for stale in files[:-self.max_files]:
+            stale.unlink(missing_ok=True)
+        return buffer.tell()
+
+    def get(self, key):
+        """Return the cached value for ``key`` or ``None``."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                telemetry.count("cache_hits", "model_memory")
+                return self._entries[key][0]
+        path = self._path(key)
+        if not path.exists():
+            return None
+        value = joblib.load(path)
+        path.touch()
+        self.loads += 1
+        telemetry.count("cache_hits", "model_disk")
+        self._remember(key, value, path.stat().st_size)
+        return value
+
+    def put(self, key, value):
+        """Store an already computed value under ``key``."""
+        with self._key_lock(key):
+            self._remember(key, value, self._persist(key, value))
+
+    def get_or_train(self, key, train):
+        """Return the value for ``key``, calling ``train()`` once if it is not cached anywhere."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._key_lock(key):
+            # Another session may have finished training while we waited
+            value = self.get(key)
+            if value is None:
+                with telemetry.span("model fit", "model"):
+                    value = train()
+                self.fits += 1
+                self.put(key, value)
+        return value
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._entries.clear()
+        if disk:
+            for path in self.directory.glob("*.joblib"):
+                path.unlink(missing_ok=True)
+
+
+registry = ModelRegistry()
@@ -0,0 +1,228 @@
+"""Server-side reduction of chart data before it is sent to the browser.
+
+Line and bar traces longer than a target point count are reduced with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the visual shape (peaks,
+troughs, trend changes) of the series. Candlesticks are aggregated into
+coarser calendar bars when the visible range holds more bars than can be
+drawn legibly, and shown at full resolution once the range is narrow enough.
+
+``prepare_figure`` then readies a figure for the browser. It switches
+figures with more than ``WEBGL_POINTS`` line or marker points to WebGL
+(``scattergl``). It hands numeric arrays to plotly as numpy arrays, which
+plotly serialises as base64 typed buffers rather than JSON number lists, and
+it encodes dates the same way as milliseconds on a date axis. Pages build
+figures with ``figure``, which starts from the shared ``LAYOUT``.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+MAX_POINTS = 2000
+MAX_CANDLES = 400
+# Browsers allow only a dozen or so WebGL contexts per page, so only figures this large get one
+WEBGL_POINTS = 10000
+LAYOUT = {
+    "margin": {"l": 40, "r": 20, "t": 50, "b": 40},
+    "hoverlabel": {"namelength": -1},
+    "uirevision": "keep",  # keep zoom and legend selections across reruns
+}
+
+# Candidate candlestick periods, finest first: (resample rule, label, approximate length)
+OHLC_RULES = [
+    ("15min", "15-minute", pd.Timedelta(minutes=15)),
+    ("h", "hourly", pd.Timedelta(hours=1)),
+    ("D", "daily", pd.Timedelta(days=1)),
+    ("W-MON", "weekly", pd.Timedelta(days=7)),
+    ("MS", "monthly", pd.Timedelta(days=28)),
+    ("QS", "quarterly", pd.Timedelta(days=90)),
+    ("YS", "yearly", pd.Timedelta(days=365)),
+]
+
+
+def _as_float(values):
+    index = pd.Index(values)
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    try:
+        return index.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.arange(len(index), dtype=np.float64)
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the ``threshold`` points LTTB keeps from the series ``(x, y)``."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.int64), n)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    # Bucket means do not depend on the points chosen, so compute them all at once
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x, edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y, edges[:-1]) / sizes
+    # A single-point bucket keeps its point whatever was chosen before it
+    kept[1:-1] = edges[:threshold - 2]
+    for i in np.flatnonzero(sizes[:threshold - 2] > 1):
+        start, stop = edges[i], edges[i + 1]
+        a = kept[i]
+        next_x, next_y = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((x[a] - next_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (next_y - y[a]))
+        kept[i + 1] = start + int(np.argmax(area))
+    return kept
+
+
+def downsample(x, y, max_points=MAX_POINTS):
+    """Return ``(x, y)`` reduced to at most ``max_points`` with LTTB; NaN gaps are dropped."""
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if len(y) <= max_points:
+        return x, y
+    finite = np.flatnonzero(np.isfinite(y))
+    kept = finite[lttb_indices(_as_float(x[finite]), y[finite], max_points)]
+    return x[kept], y[kept]
+
+
+def downsample_figure(fig, max_points=MAX_POINTS):
+    """Downsample every long line or bar trace of ``fig`` in place and return it.
+
+    Marker-only scatters (e.g. residual plots) are left alone, since their
+    points are not ordered along x.
+    """
+    for trace in fig.data:
+        if trace.type not in ("scatter", "scattergl", "bar") or trace.y is None or trace.x is None:
+            continue
+        if trace.type != "bar" and trace.mode is not None and "lines" not in trace.mode:
+            continue
+        if len(trace.y) > max_points:
+            trace.x, trace.y = downsample(trace.x, trace.y, max_points)
+    return fig
+
+
+def figure(*data, **layout):
+    """A ``go.Figure`` of ``data`` traces with the shared ``LAYOUT`` updated by ``layout``."""
+    fig = go.Figure(layout=LAYOUT)
+    # Adding the traces skips the deep copy ``go.Figure(data=...)`` makes of every array
+    fig.add_traces(list(data))
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+def wall_clock(dates):
+    """``dates`` as time-zone naive local times, the way plotly draws them anyway.
+
+    Plotly keeps time-zone aware dates as object arrays of timestamps, which
+    are slow to build and copy; charts with many traces should pass these.
+    """
+    dates = pd.DatetimeIndex(dates)
+    return dates.tz_localize(None) if dates.tz is not None else dates
+
+
+def _points(trace):
+    return len(trace.y) if trace.y is not None else 0
+
+
+def use_webgl(fig, threshold=WEBGL_POINTS):
+    """Redraw every ``scatter`` of ``fig`` as ``scattergl`` in place when together they exceed ``threshold`` points.
+
+    All or none are converted, so fills between traces keep working; a figure
+    using an option WebGL traces lack is left as it is.
+    """
+    scatters = [trace for trace in fig.data if trace.type == "scatter"]
+    if not scatters or sum(_points(trace) for trace in scatters) <= threshold:
+        return fig
+    try:
+        traces = [go.Scattergl({k: v for k, v in trace.to_plotly_json().items() if k != "type"})
+                  if trace.type == "scatter" else trace for trace in fig.data]
+    except ValueError:
+        return fig
+    fig.data = ()
+    fig.add_traces(traces)
+    return fig
+
+
+def _encoded(values):
+    """``values`` as a numpy array plotly can send as a typed buffer, or ``None`` to leave them alone."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "fiub":
+        return None
+    index = pd.Index(values)
+    if isinstance(index, pd.DatetimeIndex):
+        # Wall-clock milliseconds, as plotly would print the dates; a date axis reads them as such
+        return wall_clock(index).as_unit("ms").asi8.astype(np.float64), "date"
+    if index.dtype.kind in "fiu":
+        return index.to_numpy(), None
+    return None
+
+
+def encode_arrays(fig):
+    """Turn the ``x``/``y`` values of ``fig``'s traces into binary-encodable numpy arrays in place.
+
+    Dates become milliseconds since the epoch and their axis is marked as a
+    date axis; text and category values are left as JSON lists.
+    """
+    last = None  # (values, encoded): traces of a comparison chart usually share their dates
+    for trace in fig.data:
+        for name in ("x", "y"):
+            values = trace[name] if name in trace else None
+            if values is None or not len(values):
+                continue
+            if last is not None and len(last[0]) == len(values) and np.array_equal(last[0], values):
+                encoded = last[1]
+            else:
+                encoded = _encoded(values)
+                if encoded is None:
+                    continue
+                last = values, encoded
+            trace[name], axis_type = encoded
+            if axis_type:
+                axis = (trace[f"{name}axis"] or name).replace(name, f"{name}axis", 1)
+                if fig.layout[axis].type is None:
+                    fig.layout[axis].type = axis_type
+    return fig
+
+
+def prepare_figure(fig, max_points=MAX_POINTS, webgl_points=WEBGL_POINTS, downsample=True):
+    """Ready ``fig`` for the browser in place: shared layout defaults, downsampling, WebGL and binary arrays."""
+    own = fig.layout.to_plotly_json()
+    fig.update_layout({key: value for key, value in LAYOUT.items() if key not in own})
+    # Numeric arrays first: object arrays of timestamps make the steps after it slow to copy and reduce
+    encode_arrays(fig)
+    if downsample:
+        downsample_figure(fig, max_points)
+    return use_webgl(fig, webgl_points)
+
+
+def aggregate_ohlc(df, max_bars=MAX_CANDLES, date_column="Date"):
+    """Resample OHLCV rows into the finest calendar period giving at most ``max_bars`` bars.
+
+    Returns ``(frame, period_label)``; the frame is returned unchanged (label
+    ``None``) when it already fits.
+    """
+    if len(df) <= max_bars:
+        return df, None
+    indexed = df.set_index(date_column)
+    spacing = indexed.index.to_series().diff().median()
+    for rule, label, length in OHLC_RULES:
+        # Periods no longer than the bar spacing would not merge anything
+        if length <= spacing:
+            continue
+        bars = indexed.resample(rule, label="left", closed="left").agg(
+            {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna(subset=["Open"])
+        if len(bars) <= max_bars:
+            return bars.reset_index(), label
+    return bars.reset_index(), label
+
+
+def payload_stats(fig):
+    """Number of plotted points, JSON payload size and serialisation time of a figure."""
+    started = time.perf_counter()
+    payload = fig.to_json()
+    return {
+        "points": sum(len(trace.y if getattr(trace, "y", None) is not None else trace.x)
+                      for trace in fig.data if getattr(trace, "x", None) is not None),
+        "bytes": len(payload.encode()),
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,222 @@
+"""Background warm-up of a symbol's analyses while the user is still on another page.
+
+Choosing a symbol and date range on a page calls ``prefetcher.warm``, which
+queues what the other pages will ask for with the same inputs, in the order
+users usually visit them:
+
+1. the OHLCV history (``qqa.data``);
+2. the Technical Indicators page's ``IndicatorSet`` with every group's
+   intermediates computed, shared through ``indicator_set``;
+3. the Time Series page's default seasonal decomposition;
+4. the moving-average surface behind the SMA/EMA sliders;
+5. the Predictive Modeling page's feature store rows.
+
+Tasks run on a small pool of daemon threads (``QQA_PREFETCH_WORKERS``,
+default 2; 0 turns prefetching off). Page runs take priority: while any
+session's page run is in progress (``ui.begin_page_run`` to
+``end_page_run``), workers finish their current step and wait before
+starting the next. Runs are keyed by session, so a rerun that interrupts a
+page replaces the session's entry; a run stopped without a rerun (the Stop
+button, an uncaught exception, a closed tab) never reaches ``end_page_run``
+and is dropped as soon as the script thread that began it has exited. A new
+selection from the same session cancels its steps
+that have not started, and a symbol and range warmed in the last
+``WARM_SECONDS`` is not queued again.
+"""
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from qqa import telemetry
+from qqa.upstream import coordinator
+
+MAX_WORKERS = int(os.environ.get("QQA_PREFETCH_WORKERS", 2))
+WARM_SECONDS = 300  # how long warmed inputs are trusted, and indicator sets kept
+MAX_INDICATOR_SETS = 16
+STALE_RUN_SECONDS = 60  # a page run still going after this long stops blocking prefetch
+STEPS = ("history", "indicators", "decomposition", "ma surface", "features")
+
+_sets_lock = threading.Lock()
+_sets = OrderedDict()  # (symbol, start, end) -> (created, frame, IndicatorSet)
+
+
+def indicator_set(symbol, start_date, end_date):
+    """``(frame, IndicatorSet)`` of daily bars shared by the Technical Indicators page and the prefetcher.
+
+    ``frame`` has ``Date`` as a column, as the page plots it. Sets are kept
+    for ``WARM_SECONDS`` so the intermediates computed for one session (or
+    by the prefetcher) serve the next.
+    """
+    from qqa.data import load_history
+    from qqa.indicators import IndicatorSet
+
+    key = (symbol.strip().upper(), str(start_date), str(end_date))
+    with _sets_lock:
+        entry = _sets.get(key)
+        if entry is not None and time.monotonic() - entry[0] < WARM_SECONDS:
+            _sets.move_to_end(key)
+            telemetry.count("cache_hits", "indicator_set")
+            return entry[1:]
+
+    def build():
+        frame = load_history(symbol, start_date, end_date).reset_index()
+        return time.monotonic(), frame, IndicatorSet.from_frame(frame)
+
+    # A page asking for a set the prefetcher is building waits for it instead of building its own
+    entry = coordinator.single_flight(("indicator set",) + key, build)
+    with _sets_lock:
+        _sets[key] = entry
+        _sets.move_to_end(key)
+        while len(_sets) > MAX_INDICATOR_SETS:
+            _sets.popitem(last=False)
+    return entry[1:]
+
+
+def _history(symbol, start_date, end_date):
+    from qqa.data import load_history
+
+    load_history(symbol, start_date, end_date)
+
+
+def _indicators(symbol, start_date, end_date):
+    _, ind = indicator_set(symbol, start_date, end_date)
+    ind.compute()
+
+
+def _decomposition(symbol, start_date, end_date):
+    from qqa.data import load_history
+    from qqa.decomposition import decompositions, suggest_periods
+
+    close = load_history(symbol, start_date, end_date)["Close"].dropna()
+    _, _, periods = suggest_periods(close)
+    if periods:
+        decompositions.get(symbol, close, periods)
+
+
+def _ma_surface(symbol, start_date, end_date):
+    from qqa.masurface import surface_for
+
+    _, ind = indicator_set(symbol, start_date, end_date)
+    surface_for(ind.close)
+
+
+def _features(symbol, start_date, end_date):
+    from qqa.features import load_features
+
+    load_features(symbol, start_date, end_date)
+
+
+_STEP_FUNCTIONS = dict(zip(STEPS, (_history, _indicators, _decomposition, _ma_surface, _features)))
+
+
+class Prefetcher:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Condition()
+        self._threads = []
+        self._running = {}  # owner -> (monotonic start, script thread) of its page run in progress
+        self._pending = {}  # owner -> (symbol, start, end), futures of its queued steps
+        self._warmed = OrderedDict()  # (symbol, start, end) -> monotonic time queued, oldest first
+        self.completed = self.failed = self.cancelled = 0
+        self.errors = {}  # (step, symbol) -> the last exception
+
+    # Foreground page runs
+
+    def enter(self, owner):
+        """Mark a page run of ``owner`` on this thread as in progress; prefetch steps wait until it ends.
+
+        Replaces the owner's previous run, which a rerun may have interrupted
+        before it could ``exit``.
+        """
+        with self._lock:
+            self._running[owner] = time.monotonic(), threading.current_thread()
+
+    def exit(self, owner):
+        with self._lock:
+            self._running.pop(owner, None)
+            self._lock.notify_all()
+
+    def _busy(self):
+        now = time.monotonic()
+        for owner, (started, thread) in list(self._running.items()):
+            if not thread.is_alive() or now - started > STALE_RUN_SECONDS:
+                del self._running[owner]
+        return bool(self._running)
+
+    # Background work
+
+    def _start_workers(self):
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._work, name=f"qqa-prefetch-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self):
+        while True:
+            _, _, future, step, args = self._queue.get()
+            with self._lock:
+                # Re-check periodically so a run that never ended turns stale
+                while self._busy():
+                    self._lock.wait(timeout=1.0)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                _STEP_FUNCTIONS[step](*args)
+            except Exception as e:
+                self.failed += 1
+                self.errors[(step, args[0])] = e
+                future.set_exception(e)
+            else:
+                self.completed += 1
+                telemetry.count("prefetched", step)
+                future.set_result(None)
+
+    def _prune(self, now):
+        # Forget selections warmed longer ago than WARM_SECONDS, and sessions whose steps have all finished
+        while self._warmed and now - next(iter(self._warmed.values())) >= WARM_SECONDS:
+            self._warmed.popitem(last=False)
+        for owner, (_, futures) in list(self._pending.items()):
+            if all(future.done() for future in futures):
+                del self._pending[owner]
+
+    def warm(self, symbol, start_date, end_date, owner=None):
+        """Queue every step for ``symbol`` and the range; returns the step futures (empty when skipped)."""
+        symbol = symbol.strip().upper()
+        if not symbol or self.max_workers <= 0:
+            return []
+        key = (symbol, str(start_date), str(end_date))
+        with self._lock:
+            previous, queued = self._pending.pop(owner, (None, []))
+            if previous == key:
+                # A rerun with the same selection: its steps are already queued
+                self._pending[owner] = previous, queued
+                return queued
+            # This session moved on: drop what it queued for its previous selection
+            cancelled = sum(future.cancel() for future in queued)
+            if cancelled:
+                self.cancelled += cancelled
+                self._warmed.pop(previous, None)
+            now = time.monotonic()
+            self._prune(now)
+            if key in self._warmed:
+                return []
+            self._warmed[key] = now
+            futures = []
+            order = next(self._order)
+            for rank, step in enumerate(STEPS):
+                future = Future()
+                # Newer selections first, then the steps in page order
+                self._queue.put((-order, rank, future, step, (symbol, start_date, end_date)))
+                futures.append(future)
+            self._pending[owner] = key, futures
+            self._start_workers()
+        return futures
+
+
+prefetcher = Prefetcher()
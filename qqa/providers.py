@@ -0,0 +1,296 @@
+"""Market-data sources behind the cache.
+
+Every download goes through the active provider, chosen with the
+``QQA_PROVIDER`` environment variable:
+
+* ``yfinance`` (default) — Yahoo Finance over the network.
+* ``local`` — vendor CSV/Parquet dumps under ``QQA_DATA_DIR``, laid out as
+  ``<dir>/<SYMBOL>.csv`` (daily) or ``<dir>/<interval>/<SYMBOL>.csv``.
+* ``synthetic`` — deterministic random walks from ``qqa.synthetic``, for
+  tests and network-isolated environments.
+* ``simulated`` — the synthetic data behind a stand-in remote API with a
+  fixed latency and a server-side rate limit (``QQA_SIM_LATENCY`` seconds,
+  ``QQA_SIM_RATE`` requests per second), to exercise ``qqa.upstream``'s
+  coalescing, rate limiting and retries without a network.
+
+A provider returns frames shaped like ``yf.Ticker(symbol).history``: a
+timezone-aware ``Date`` index and the OHLCV columns.
+"""
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+EXCHANGE_TZ = "Asia/Kolkata"
+
+# Lower-cased vendor column names accepted for each OHLCV column
+_ALIASES = {
+    "Date": ("date", "datetime", "timestamp", "time", "date time"),
+    "Open": ("open", "open price", "o"),
+    "High": ("high", "high price", "h"),
+    "Low": ("low", "low price", "l"),
+    "Close": ("close", "close price", "last", "ltp", "c"),
+    "Volume": ("volume", "vol", "total traded quantity", "shares traded", "v"),
+}
+VENDOR_SUFFIXES = (".parquet", ".csv", ".csv.gz")
+
+
+class RateLimited(Exception):
+    """Upstream refused the request for exceeding its rate limit; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message="rate limited", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Unavailable(ConnectionError):
+    """A transient transport failure (connection reset, timeout, 5xx) worth retrying."""
+
+
+def _empty():
+    return pd.DataFrame({column: pd.Series(dtype="float64") for column in OHLCV_COLUMNS},
+                        index=pd.DatetimeIndex([], tz="UTC", name="Date"))
+
+
+def normalise_vendor_frame(frame, tz=EXCHANGE_TZ):
+    """Rename vendor columns to ``Date`` + OHLCV, index by ``Date`` and localise naive stamps to ``tz``."""
+    lookup = {str(column).strip().lower(): column for column in frame.columns}
+    renamed = {}
+    for target, aliases in _ALIASES.items():
+        source = next((lookup[alias] for alias in (target.lower(),) + aliases if alias in lookup), None)
+        if source is not None:
+            renamed[source] = target
+    frame = frame.rename(columns=renamed)
+    if "Date" in frame.columns:
+        frame = frame.set_index("Date")
+    missing = [column for column in OHLCV_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"vendor file has no {', '.join(missing)} column")
+    index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+    index = index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+    frame = frame[OHLCV_COLUMNS].astype("float64")
+    frame.index = index.as_unit("ns").rename("Date")
+    return frame[~frame.index.duplicated(keep="last")].sort_index()
+
+
+def read_vendor_file(path, tz=EXCHANGE_TZ):
+    """Read one vendor CSV or Parquet dump into a normalised OHLCV frame."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        frame = pd.read_parquet(path)
+        if isinstance(frame.index, pd.DatetimeIndex):
+            frame = frame.reset_index()
+    else:
+        # The pyarrow engine parses in parallel and is several times faster on large dumps
+        frame = pd.read_csv(path, engine="pyarrow")
+    return normalise_vendor_frame(frame, tz)
+
+
+def vendor_files(directory, interval="1d"):
+    """Map ``SYMBOL`` (file stem, upper-cased) to its dump for ``interval`` under ``directory``."""
+    directory = Path(directory)
+    folders = [directory / interval] + ([directory] if interval == "1d" else [])
+    files = {}
+    for folder in reversed(folders):
+        if not folder.is_dir():
+            continue
+        for path in sorted(folder.iterdir()):
+            for suffix in VENDOR_SUFFIXES:
+                if path.name.lower().endswith(suffix):
+                    files[path.name[:-len(suffix)].upper()] = path
+                    break
+    return files
+
+
+def _slice(frame, start, end):
+    if frame.empty:
+        return frame
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    dates = frame.index
+    if start.tz is None:
+        dates = dates.tz_localize(None)
+    else:
+        start, end = start.tz_convert(dates.tz), end.tz_convert(dates.tz)
+    return frame[(dates >= start) & (dates < end)]
+
+
+class Provider:
+    name = "base"
+    remote = False  # remote providers are rate limited by ``qqa.upstream``
+
+    def history(self, symbol, start, end, interval="1d"):
+        raise NotImplementedError
+
+    def info(self, symbol):
+        """Company metadata in the ``yf.Ticker(symbol).info`` vocabulary; empty when unknown."""
+        return {}
+
+
+# requests and curl_cffi exception classes (by name, anywhere in the MRO) for failures that may succeed on retry
+_TRANSIENT_ERRORS = {"ConnectionError", "Timeout", "ChunkedEncodingError", "IncompleteRead", "DNSError",
+                     "ProxyError"}
+_TRANSIENT_STATUS = {500, 502, 503, 504}
+
+
+def _raise_upstream_error(error):
+    # yfinance raises YFRateLimitError when Yahoo answers 429 Too Many Requests, and lets the
+    # transport's own exceptions through, which do not derive from the builtin ConnectionError
+    if type(error).__name__ == "YFRateLimitError":
+        raise RateLimited(str(error)) from error
+    transport = [cls.__name__ for cls in type(error).__mro__
+                 if cls.__module__.split(".")[0] in ("requests", "curl_cffi")]
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if _TRANSIENT_ERRORS.intersection(transport) or (transport and status in _TRANSIENT_STATUS):
+        raise Unavailable(str(error)) from error
+    raise error
+
+
+class YFinanceProvider(Provider):
+    name = "yfinance"
+    remote = True
+
+    def history(self, symbol, start, end, interval="1d"):
+        import yfinance as yf
+
+        try:
+            data = yf.Ticker(symbol).history(start=start, end=end, interval=interval)
+        except Exception as e:
+            _raise_upstream_error(e)
+        data.index.name = "Date"
+        return data[[c for c in OHLCV_COLUMNS if c in data.columns]]
+
+    def info(self, symbol):
+        import yfinance as yf
+
+        try:
+            return yf.Ticker(symbol).info
+        except Exception as e:
+            _raise_upstream_error(e)
+
+
+class LocalProvider(Provider):
+    """Serve history from a directory of vendor dumps; symbols without a file return no rows.
+
+    ``RELIANCE.NS`` is looked up as ``RELIANCE.NS.csv`` and then ``RELIANCE.csv``.
+    Parsed files are kept in memory, so only the first request per file pays
+    for reading it.
+    """
+
+    name = "local"
+
+    def __init__(self, directory, tz=EXCHANGE_TZ):
+        self.directory = Path(directory)
+        self.tz = tz
+        self._lock = threading.Lock()
+        self._frames = {}
+
+    def path(self, symbol, interval="1d"):
+        files = vendor_files(self.directory, interval)
+        symbol = symbol.strip().upper()
+        return files.get(symbol) or files.get(symbol.split(".")[0])
+
+    def history(self, symbol, start, end, interval="1d"):
+        path = self.path(symbol, interval)
+        if path is None:
+            return _empty()
+        with self._lock:
+            key = (path, path.stat().st_mtime_ns)
+            if key not in self._frames:
+                self._frames[key] = read_vendor_file(path, self.tz)
+            frame = self._frames[key]
+        return _slice(frame, start, end).copy()
+
+
+class SyntheticProvider(Provider):
+    name = "synthetic"
+
+    def __init__(self, seed=0, tz=EXCHANGE_TZ):
+        self.seed = seed
+        self.tz = tz
+
+    def history(self, symbol, start, end, interval="1d"):
+        from qqa.synthetic import symbol_history
+
+        return symbol_history(symbol, start, end, interval, seed=self.seed, tz=self.tz)
+
+    def info(self, symbol):
+        return {"longName": f"{symbol.strip().upper()} (synthetic)", "exchange": "SYNTHETIC"}
+
+
+class SimulatedProvider(Provider):
+    """Synthetic data served like a remote API: every request takes ``latency`` seconds and
+    requests beyond ``rate`` in any one-second window raise ``RateLimited``.
+
+    ``calls`` and ``throttled`` count the requests served and refused.
+    """
+
+    name = "simulated"
+    remote = True
+
+    def __init__(self, latency=0.2, rate=5, seed=0, tz=EXCHANGE_TZ):
+        self.source = SyntheticProvider(seed, tz)
+        self.latency = latency
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._recent = deque()  # monotonic times of the requests accepted in the last second
+        self.calls = self.throttled = 0
+
+    def _admit(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate:
+                self.throttled += 1
+                raise RateLimited("simulated 429 Too Many Requests", retry_after=1 - (now - self._recent[0]))
+            self._recent.append(now)
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def history(self, symbol, start, end, interval="1d"):
+        self._admit()
+        return self.source.history(symbol, start, end, interval)
+
+    def info(self, symbol):
+        self._admit()
+        return self.source.info(symbol)
+
+
+PROVIDERS = {"yfinance": YFinanceProvider, "local": LocalProvider, "synthetic": SyntheticProvider,
+             "simulated": SimulatedProvider}
+
+_provider = None
+
+
+def make_provider(name=None, directory=None):
+    """Build the provider called ``name`` (default ``QQA_PROVIDER``, else ``yfinance``)."""
+    name = (name or os.environ.get("QQA_PROVIDER") or "yfinance").strip().lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"unknown data provider {name!r}; choose one of {', '.join(PROVIDERS)}")
+    if name == "local":
+        directory = directory or os.environ.get("QQA_DATA_DIR")
+        if not directory:
+            raise ValueError("the local provider needs a directory (set QQA_DATA_DIR)")
+        return LocalProvider(directory)
+    if name == "simulated":
+        return SimulatedProvider(latency=float(os.environ.get("QQA_SIM_LATENCY", 0.2)),
+                                 rate=float(os.environ.get("QQA_SIM_RATE", 5)))
+    return PROVIDERS[name]()
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = make_provider()
+    return _provider
+
+
+def set_provider(provider):
+    """Replace the active provider (a ``Provider`` instance or a name) and return it."""
+    global _provider
+    _provider = make_provider(provider) if isinstance(provider, str) else provider
+    return _provider
@@ -0,0 +1,271 @@
+"""Headless batch reports: the dashboard's analyses for a symbol list, without Streamlit.
+
+For each symbol, ``symbol_report`` renders the Time Series Analysis charts
+(price, volume, open vs close, seasonal decomposition, candlesticks), one
+chart per Technical Indicators category and the walk-forward model results.
+It writes them as static HTML (and PNG when kaleido is installed) next to
+Parquet tables of the indicator series, headline metrics and model folds.
+Symbols are processed in a process pool. The parent first loads every
+symbol into the shared history cache, so workers only read Parquet files and
+walk-forward folds already in the model registry are not refitted. A
+comparison of all symbols (prices, returns, correlation matrix) is written
+once at the end::
+
+    python -m qqa.report --out reports/nightly --years 5 --format html png
+
+Output: ``<out>/<SYMBOL>/`` per symbol, ``<out>/comparison/`` and
+``<out>/summary.parquet`` with one row of metrics per symbol.
+"""
+import argparse
+import importlib.util
+import multiprocessing
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from qqa.correlation import rolling_matrices_for
+from qqa.data import load_history, load_many, load_panel
+from qqa.decomposition import decompose, dominant_periods, valid_periods
+from qqa.features import load_features
+from qqa.indicators import CATEGORIES, IndicatorSet
+from qqa.plotting import aggregate_ohlc, figure, prepare_figure
+
+FORMATS = ("html", "png")
+FEATURES = ["Prev Close", "MA50", "MA200"]
+# Indicator groups drawn over the closing price rather than on their own scale
+PRICE_OVERLAYS = {"SMA", "EMA", "VWAP", "Bollinger", "Keltner", "Donchian"}
+CORRELATION_WINDOW = 60
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def write_figure(fig, path, formats=("html",)):
+    """Write ``fig`` to ``path`` with one file per format, prepared as for the dashboard (``prepare_figure``)."""
+    prepare_figure(fig)
+    for fmt in formats:
+        if fmt == "html":
+            fig.write_html(path.with_suffix(".html"), include_plotlyjs="cdn")
+        else:
+            fig.write_image(path.with_suffix(f".{fmt}"), width=1200, height=fig.layout.height or 600)
+
+
+def time_series_figures(df):
+    """The Time Series Analysis charts for a ``Date``-column OHLCV frame, by file name."""
+    figures = {
+        "close": px.line(df, x="Date", y="Close", title="Closing Price"),
+        "volume": px.bar(df, x="Date", y="Volume", title="Volume Traded"),
+    }
+    fig = figure()
+    fig.add_trace(go.Scatter(x=df["Date"], y=df["Open"], mode="lines", name="Opening Price"))
+    fig.add_trace(go.Scatter(x=df["Date"], y=df["Close"], mode="lines", name="Closing Price"))
+    fig.update_layout(title="Opening vs Closing Prices")
+    figures["open-close"] = fig
+
+    close = df.set_index("Date")["Close"].dropna()
+    periods = dominant_periods(close)[:1] or valid_periods([30], len(close))
+    if periods:
+        decomposition = decompose(close, periods)
+        fig = figure()
+        for column in decomposition.columns.drop("Observed"):
+            fig.add_trace(go.Scatter(x=decomposition.index, y=decomposition[column], mode="lines", name=column))
+        fig.update_layout(height=600, title=f"Seasonal Decomposition ({periods[0]}-bar period)")
+        figures["decomposition"] = fig
+
+    candles, period = aggregate_ohlc(df)
+    fig = figure(go.Candlestick(x=candles["Date"], open=candles["Open"], high=candles["High"],
+                                   low=candles["Low"], close=candles["Close"]))
+    fig.update_layout(title=f"OHLC ({period} bars)" if period else "OHLC", xaxis_rangeslider_visible=False)
+    figures["candlestick"] = fig
+    return figures, periods
+
+
+def indicator_figures(dates, ind):
+    """One chart per Technical Indicators category, one row per indicator group."""
+    figures = {}
+    n = len(ind)
+    for category, groups in CATEGORIES.items():
+        fig = make_subplots(rows=len(groups), cols=1, shared_xaxes=True, subplot_titles=groups)
+        for row, group in enumerate(groups, start=1):
+            if group in PRICE_OVERLAYS:
+                fig.add_trace(go.Scatter(x=dates, y=ind.close, mode="lines", name="Close",
+                                         line=dict(color="lightgray"), showlegend=row == 1), row=row, col=1)
+            for name, values in ind.compute([group]).items():
+                if np.ndim(values) == 1 and len(values) == n:
+                    fig.add_trace(go.Scatter(x=dates, y=values, mode="lines", name=name), row=row, col=1)
+        fig.update_layout(height=300 * len(groups), title=category)
+        figures[slug(category)] = fig
+    return figures
+
+
+def model_report(symbol, start_date, end_date, n_folds=5):
+    """Walk-forward Random Forest results on the Predictive Modeling page's default features."""
+    from qqa.evaluation import walk_forward
+
+    data = load_features(symbol, start_date, end_date).frame(["Close"] + FEATURES).dropna()
+    X, y = data[FEATURES], data["Close"]
+    # One worker process per symbol already fills the machine, so folds are fitted serially
+    folds, predictions, summary = walk_forward(X, y, n_folds, n_jobs=1, cache_prefix=symbol)
+    actual = y.loc[predictions.index]
+    errors = actual - predictions
+    fig = figure()
+    fig.add_trace(go.Scatter(x=actual.index, y=actual, mode="lines", name="Actual", line=dict(color="darkcyan")))
+    fig.add_trace(go.Scatter(x=predictions.index, y=predictions, mode="lines", name="Predicted",
+                             line=dict(color="crimson", dash="dash")))
+    fig.update_layout(title="Walk-forward Actual vs Predicted Closing Prices")
+    metrics = {
+        "MSE": float((errors ** 2).mean()),
+        "R²": float(1 - (errors ** 2).sum() / ((actual - actual.mean()) ** 2).sum()),
+        "Fit Seconds": summary["Fit Seconds"],
+        "Folds Trained": summary["Folds Trained"],
+    }
+    return fig, folds, metrics
+
+
+def symbol_report(symbol, start_date, end_date, out, formats=("html",), n_folds=5):
+    """Write every chart and table for ``symbol`` under ``out/<symbol>``; returns its summary row."""
+    started = time.perf_counter()
+    df = load_history(symbol, start_date, end_date).reset_index()
+    if df.empty:
+        raise ValueError("no data returned")
+    directory = Path(out) / symbol
+    directory.mkdir(parents=True, exist_ok=True)
+
+    figures, periods = time_series_figures(df)
+    ind = IndicatorSet.from_frame(df)
+    figures.update(indicator_figures(df["Date"], ind))
+    values = ind.compute()
+    table = pd.DataFrame({name: v for name, v in values.items() if np.ndim(v) == 1 and len(v) == len(df)},
+                         index=pd.Index(df["Date"], name="Date"))
+    table.to_parquet(directory / "indicators.parquet")
+
+    drawdown = values["drawdown"]
+    row = {
+        "Symbol": symbol,
+        "Bars": len(df),
+        "First": df["Date"].iloc[0],
+        "Last": df["Date"].iloc[-1],
+        "Close": df["Close"].iloc[-1],
+        "Total Return": values["Cumulative Return"][-1],
+        "Annualized Volatility": float(values["annualized_volatility"]),
+        "Max Drawdown": float(np.nanmin(drawdown)),
+        "RSI": values["RSI"][-1],
+        "Seasonal Period": periods[0] if periods else np.nan,
+    }
+    if n_folds:
+        try:
+            figures["model"], folds, metrics = model_report(symbol, start_date, end_date, n_folds)
+        except ValueError as e:  # too little history for the folds or the 200-day average
+            row["Model Error"] = str(e)
+        else:
+            folds.to_parquet(directory / "folds.parquet")
+            row.update(metrics)
+
+    for name, fig in figures.items():
+        write_figure(fig, directory / name, formats)
+    row["Seconds"] = time.perf_counter() - started
+    pd.DataFrame([row]).to_parquet(directory / "metrics.parquet")
+    return row
+
+
+def comparison_report(symbols, start_date, end_date, out, formats=("html",)):
+    """Comparative page charts for all ``symbols`` plus the latest rolling correlation matrix."""
+    directory = Path(out) / "comparison"
+    directory.mkdir(parents=True, exist_ok=True)
+    closes, _ = load_many(symbols, start_date, end_date)
+    fig = figure()
+    for symbol in closes.columns:
+        close = closes[symbol].dropna()
+        fig.add_trace(go.Scatter(x=close.index, y=close, mode="lines", name=symbol))
+    fig.update_layout(title="Comparative Closing Prices")
+    write_figure(fig, directory / "prices", formats)
+
+    returns = closes.apply(lambda close: close.dropna().pct_change())
+    fig = px.histogram(returns, x=returns.columns, nbins=50, labels={"value": "Daily Return"},
+                       title="Histogram of Returns")
+    fig.update_layout(barmode="overlay")
+    fig.update_traces(opacity=0.75)
+    write_figure(fig, directory / "returns", formats)
+
+    if returns.shape[1] > 1:
+        matrix = rolling_matrices_for(returns, CORRELATION_WINDOW).matrix("correlation")
+        matrix.to_parquet(directory / "correlation.parquet")
+        fig = px.imshow(matrix, zmin=-1, zmax=1, color_continuous_scale="RdBu_r", aspect="auto",
+                        title=f"{CORRELATION_WINDOW}-Day Correlation to {closes.index[-1]:%Y-%m-%d}")
+        fig.update_layout(height=max(500, 14 * len(matrix)))
+        write_figure(fig, directory / "correlation", formats)
+
+
+def run(symbols, start_date, end_date, out, formats=("html",), workers=None, n_folds=5):
+    """Report on every symbol in a process pool; returns ``(summary, errors)``.
+
+    ``summary`` has one row per reported symbol (also written to
+    ``<out>/summary.parquet``); ``errors`` maps each failed symbol to its
+    exception. One bad symbol never aborts the batch.
+    """
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    # Fill the shared cache with threads first, so the workers never download
+    _, errors = load_panel(symbols, start_date, end_date, ["Close"])
+    symbols = [s for s in dict.fromkeys(s.strip() for s in symbols if s.strip()) if s not in errors]
+
+    rows = []
+    # Spawned rather than forked: the parent has just run a thread pool
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(symbol_report, symbol, start_date, end_date, out, formats, n_folds): symbol
+                   for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                errors[symbol] = e
+                continue
+            print(f"{symbol:<16} {rows[-1]['Seconds']:6.1f}s", file=sys.stderr)
+    if symbols:
+        comparison_report(symbols, start_date, end_date, out, formats)
+    summary = pd.DataFrame(rows)
+    if not summary.empty:
+        summary = summary.set_index("Symbol").loc[[s for s in symbols if s not in errors]]
+        summary.to_parquet(out / "summary.parquet")
+    return summary, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the dashboard's analyses for a list of symbols.")
+    parser.add_argument("--symbols", nargs="*", help="symbols to report on (default: the Nifty-50)")
+    parser.add_argument("--out", type=Path, default=Path("reports"))
+    parser.add_argument("--years", type=int, default=5, help="history to cover, ending today")
+    parser.add_argument("--start", help="first date (overrides --years)")
+    parser.add_argument("--end", help="last date (default: today)")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["html"], dest="formats")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--folds", type=int, default=5, help="walk-forward folds; 0 skips the model")
+    args = parser.parse_args(argv)
+    if "png" in args.formats and importlib.util.find_spec("kaleido") is None:
+        parser.error("PNG output needs the kaleido package")
+
+    from qqa.universe import NIFTY_50
+
+    end = pd.Timestamp(args.end) if args.end else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    start = pd.Timestamp(args.start) if args.start else end - pd.DateOffset(years=args.years)
+    started = time.perf_counter()
+    summary, errors = run(args.symbols or NIFTY_50, start.date(), end.date(), args.out, args.formats,
+                          args.workers, args.folds)
+    for symbol, error in errors.items():
+        print(f"failed: {symbol}: {error}", file=sys.stderr)
+    print(f"{len(summary)} symbols reported to {args.out} in {time.perf_counter() - started:.1f}s")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
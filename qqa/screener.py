@@ -0,0 +1,101 @@
+"""Cross-sectional screener over a symbol universe.
+
+The universe is loaded into one time x symbol array per OHLCV column and the
+page 3 indicators are computed for every symbol in a single vectorised pass
+along the time axis (``IndicatorSet.from_panel``). ``rank`` then reduces the
+result to one row per symbol for sorting and filtering.
+"""
+import numpy as np
+import pandas as pd
+
+from qqa import telemetry
+from qqa.data import load_panel
+from qqa.indicators import OHLCV_COLUMNS, IndicatorSet
+
+SCREEN_INDICATORS = ["RSI", "CMF", "ATR", "Volatility", "Bollinger", "Donchian", "Returns"]
+
+
+class Universe:
+    """Aligned OHLCV arrays for many symbols: ``arrays[column]`` has shape (dates, symbols)."""
+
+    def __init__(self, dates, symbols, arrays, errors=None):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.arrays = arrays
+        self.errors = errors or {}
+
+    @classmethod
+    def from_panel(cls, panel, errors=None):
+        close = panel["Close"]
+        # A symbol missing a bar that others traded is treated as a flat, zero-volume day;
+        # dates before a symbol's first bar stay NaN
+        gap = close.isna() & close.ffill().notna()
+        close = close.ffill()
+        arrays = {"Close": close.to_numpy(dtype=np.float64)}
+        for column in ["Open", "High", "Low"]:
+            arrays[column] = panel[column].where(~gap, close).to_numpy(dtype=np.float64)
+        arrays["Volume"] = panel["Volume"].where(~gap, 0.0).to_numpy(dtype=np.float64)
+        return cls(close.index, close.columns, arrays, errors)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def indicators(self):
+        return IndicatorSet.from_panel(self.arrays)
+
+
+def load_universe(symbols, start_date, end_date, interval="1d", max_workers=8):
+    """Load ``symbols`` through the shared cache into a ``Universe``."""
+    panel, errors = load_panel(symbols, start_date, end_date, OHLCV_COLUMNS, interval, max_workers)
+    return Universe.from_panel(panel, errors)
+
+
+@telemetry.span("rank")
+def rank(universe, as_of=None, sort_by="RSI", ascending=False, **params):
+    """Return one row of screening metrics per symbol at ``as_of`` (default: the last date).
+
+    ``params`` are forwarded to the indicator methods (``rsi_window``,
+    ``bollinger_window``, ...).
+    """
+    columns = ["Close", "Return %", "RSI", "CMF", "ATR %", "Volatility %", "%B", "Breakout"]
+    if len(universe) < 2:
+        return pd.DataFrame(columns=columns, index=pd.Index(universe.symbols, name="Symbol"))
+    row = len(universe) - 1
+    if as_of is not None:
+        row = int(universe.dates.searchsorted(pd.Timestamp(as_of), side="right")) - 1
+    row = max(row, 1)
+
+    out = universe.indicators().compute(SCREEN_INDICATORS, **params)
+    close = universe.arrays["Close"][row]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_b = (close - out["lower_band"][row]) / (out["upper_band"][row] - out["lower_band"][row])
+        atr_percent = 100 * out["ATR"][row] / close
+    # Close beyond the previous bar's Donchian channel: +1 upside breakout, -1 downside
+    breakout = np.where(close > out["donchian_upper"][row - 1], 1,
+                        np.where(close < out["donchian_lower"][row - 1], -1, 0))
+
+    table = pd.DataFrame({
+        "Close": close,
+        "Return %": 100 * out["Daily Return"][row],
+        "RSI": out["RSI"][row],
+        "CMF": out["CMF"][row],
+        "ATR %": atr_percent,
+        "Volatility %": 100 * out["rolling_volatility"][row],
+        "%B": percent_b,
+        "Breakout": breakout,
+    }, index=pd.Index(universe.symbols, name="Symbol"))
+    return table.sort_values(sort_by, ascending=ascending, na_position="last")
+
+
+def screen(table, rsi_range=None, min_cmf=None, max_atr_percent=None, breakout=None):
+    """Filter a ``rank`` table; each criterion is skipped when left as ``None``."""
+    keep = pd.Series(True, index=table.index)
+    if rsi_range is not None:
+        keep &= table["RSI"].between(*rsi_range)
+    if min_cmf is not None:
+        keep &= table["CMF"] >= min_cmf
+    if max_atr_percent is not None:
+        keep &= table["ATR %"] <= max_atr_percent
+    if breakout is not None:
+        keep &= table["Breakout"] == breakout
+    return table[keep]
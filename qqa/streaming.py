@@ -0,0 +1,354 @@
+"""Incremental versions of the Technical Indicators page formulas.
+
+``StreamingIndicators`` consumes one OHLCV bar at a time and keeps only the
+state each indicator needs: running window sums, recursive EMAs and monotonic
+deques for rolling highs and lows. Each update is O(1) amortised, and the
+values it returns match ``qqa.indicators.IndicatorSet`` on the same history,
+including bars with missing (NaN) fields: cumulative sums skip them, EMAs
+hold their value through them as pandas' ``ewm`` does, and rolling windows
+are NaN while they hold one.
+
+State can be checkpointed and restored, so a live feed can resume without
+replaying the full history::
+
+    stream = StreamingIndicators.from_frame(df)
+    blob = stream.checkpoint()
+    ...
+    stream = StreamingIndicators.restore(blob)
+    latest = stream.update(open_, high, low, close, volume)
+"""
+import math
+import pickle
+from collections import deque
+
+from qqa.indicators import OHLCV_COLUMNS, TRADING_DAYS
+
+NAN = float("nan")
+
+
+def _div(a, b):
+    # Same result as NumPy float division: +/-inf for x/0 and NaN for 0/0. NumPy scalars only
+    # warn on x/0, so work on Python floats
+    a, b = float(a), float(b)
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0 or math.isnan(a):
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+class RollingSum:
+    """Sum of the last ``window`` values; NaN until full or while the window holds a NaN."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nans = 0
+        self.updates = 0
+
+    def update(self, x):
+        self.values.append(x)
+        if math.isnan(x):
+            self.nans += 1
+        else:
+            self.total += x
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old
+        self.updates += 1
+        if self.updates % self.window == 0:
+            # Re-add the window exactly so rounding error cannot build up over a long stream
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+        return self.sum
+
+    @property
+    def sum(self):
+        if len(self.values) < self.window or self.nans:
+            return NAN
+        return self.total
+
+    @property
+    def mean(self):
+        return self.sum / self.window
+
+
+class RollingStd:
+    """Sample standard deviation (ddof=1) of the last ``window`` values."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.shift = None
+        self.total = 0.0
+        self.squares = 0.0
+        self.nans = 0
+        self.updates = 0
+
+    def _resync(self):
+        valid = [v for v in self.values if not math.isnan(v)]
+        # Accumulate around a recent value to avoid cancellation in sum-of-squares
+        self.shift = valid[-1] if valid else None
+        self.total = math.fsum(v - self.shift for v in valid) if valid else 0.0
+        self.squares = math.fsum((v - self.shift) ** 2 for v in valid) if valid else 0.0
+
+    def update(self, x):
+        if self.shift is None and not math.isnan(x):
+            self.shift = x
+        self.values.append(x)
+        if math.isnan(x):
+            self.nans += 1
+        else:
+            self.total += x - self.shift
+            self.squares += (x - self.shift) ** 2
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old - self.shift
+                self.squares -= (old - self.shift) ** 2
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self._resync()
+        return self.std
+
+    @property
+    def std(self):
+        if len(self.values) < self.window or self.nans or self.window < 2:
+            return NAN
+        n = self.window
+        return math.sqrt(max(self.squares - self.total * self.total / n, 0.0) / (n - 1))
+
+
+class RollingExtreme:
+    """Rolling max (or min) over ``window`` values using a monotonic deque."""
+
+    def __init__(self, window, highest=True):
+        self.window = window
+        self.highest = highest
+        self.candidates = deque()  # (position, value), values monotonic from the left
+        self.position = -1
+        self.last_nan = None
+
+    def update(self, x):
+        self.position += 1
+        if math.isnan(x):
+            self.last_nan = self.position
+        else:
+            if self.highest:
+                while self.candidates and self.candidates[-1][1] <= x:
+                    self.candidates.pop()
+            else:
+                while self.candidates and self.candidates[-1][1] >= x:
+                    self.candidates.pop()
+            self.candidates.append((self.position, x))
+        while self.candidates and self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        if self.position < self.window - 1 or not self.candidates:
+            return NAN
+        if self.last_nan is not None and self.position - self.last_nan < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+
+class EWMA:
+    """``Series.ewm(span=span, adjust=adjust).mean()`` one value at a time.
+
+    Follows pandas' recursion: NaN until the first valid value, which holds
+    through later NaNs while the older values keep decaying.
+    """
+
+    def __init__(self, span, adjust=False):
+        self.alpha = 2.0 / (span + 1.0)
+        self.adjust = adjust
+        self.value = NAN
+        self.old_weight = 1.0
+
+    def update(self, x):
+        if math.isnan(self.value):
+            if not math.isnan(x):
+                self.value, self.old_weight = x, 1.0
+            return self.value
+        self.old_weight *= 1.0 - self.alpha
+        if not math.isnan(x):
+            new_weight = 1.0 if self.adjust else self.alpha
+            if x != self.value:
+                self.value = (self.old_weight * self.value + new_weight * x) / (self.old_weight + new_weight)
+            self.old_weight = self.old_weight + new_weight if self.adjust else 1.0
+        return self.value
+
+
+class RunningMoments:
+    """Welford mean/variance over every non-NaN value seen so far."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        if not math.isnan(x):
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        return self.std
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else NAN
+
+
+class StreamingIndicators:
+    """All page 3 indicators for one symbol, updated bar by bar.
+
+    Accepts the same keyword parameters as the ``IndicatorSet`` methods and
+    returns the same output names from ``update``.
+    """
+
+    def __init__(self, sma_period=50, ema_period=50, volatility_window=30, atr_window=14,
+                 ulcer_window=14, rsi_window=14, stochastic_window=14, fisher_window=10,
+                 iix_window=14, cmf_window=20, bollinger_window=20, keltner_window=20,
+                 donchian_window=20):
+        self.prev_close = NAN
+        self.bars = 0
+        self.sma = RollingSum(sma_period)
+        self.ema = EWMA(ema_period)
+        self.price_volume = 0.0
+        self.total_volume = 0.0
+        self.ema_12 = EWMA(12)
+        self.ema_26 = EWMA(26)
+        self.signal = EWMA(9)
+        self.return_moments = RunningMoments()
+        self.return_std = RollingStd(volatility_window)
+        self.atr = RollingSum(atr_window)
+        self.peak = NAN
+        self.ulcer = RollingSum(ulcer_window)
+        self.gains = RollingSum(rsi_window)
+        self.losses = RollingSum(rsi_window)
+        self.stochastic_high = RollingExtreme(stochastic_window)
+        self.stochastic_low = RollingExtreme(stochastic_window, highest=False)
+        self.stochastic_d = RollingSum(3)
+        self.fisher_high = RollingExtreme(fisher_window)
+        self.fisher_low = RollingExtreme(fisher_window, highest=False)
+        self.obv = 0.0
+        self.iix = RollingSum(iix_window)
+        self.mfv = RollingSum(cmf_window)
+        self.cmf_volume = RollingSum(cmf_window)
+        self.bollinger_mean = RollingSum(bollinger_window)
+        self.bollinger_std = RollingStd(bollinger_window)
+        self.keltner_ema = EWMA(keltner_window, adjust=True)
+        self.keltner_atr = RollingSum(keltner_window)
+        self.donchian_high = RollingExtreme(donchian_window)
+        self.donchian_low = RollingExtreme(donchian_window, highest=False)
+        self.growth = 1.0
+        self.summed_return = 0.0
+
+    @classmethod
+    def from_frame(cls, df, **params):
+        """Warm up the state from an OHLCV history frame."""
+        stream = cls(**params)
+        for bar in zip(*(df[column].to_numpy(dtype=float).tolist() for column in OHLCV_COLUMNS)):
+            stream.update(*bar)
+        return stream
+
+    def update(self, open_, high, low, close, volume):
+        """Add one bar and return the latest value of every indicator."""
+        prev_close = self.prev_close
+        change = close - prev_close
+        daily_return = _div(close, prev_close) - 1
+        true_range = max(high - low, max(abs(high - prev_close), abs(low - prev_close)))
+        if math.isnan(high + low + prev_close):
+            true_range = NAN  # Python's max keeps its first argument when compared with NaN
+        hl_range = high - low
+        out = {}
+
+        out["SMA"] = self.sma.update(close) / self.sma.window
+        out["EMA"] = self.ema.update(close)
+        # Cumulative sums skip a missing value, and are NaN on its bar only
+        price_volume = close * volume
+        if not math.isnan(price_volume):
+            self.price_volume += price_volume
+        if not math.isnan(volume):
+            self.total_volume += volume
+        out["VWAP"] = NAN if math.isnan(price_volume) else _div(self.price_volume, self.total_volume)
+        macd = self.ema_12.update(close) - self.ema_26.update(close)
+        out["MACD"] = macd
+        out["Signal_Line"] = self.signal.update(macd)
+
+        out["daily_return"] = daily_return
+        out["annualized_volatility"] = self.return_moments.update(daily_return) * math.sqrt(TRADING_DAYS)
+        out["rolling_volatility"] = self.return_std.update(daily_return) * math.sqrt(TRADING_DAYS)
+        out["TR"] = true_range
+        out["ATR"] = self.atr.update(true_range) / self.atr.window
+        self.peak = close if math.isnan(self.peak) else max(self.peak, close)
+        drawdown = close / self.peak - 1
+        out["drawdown"] = drawdown
+        # A run of zero drawdowns can leave the running sum a rounding error below zero
+        out["ulcer_index"] = math.sqrt(max(self.ulcer.update(drawdown ** 2), 0.0) / self.ulcer.window)
+
+        # A missing change counts as zero, but a missing close does not
+        gain = NAN if math.isnan(close) else change if change > 0 else 0.0
+        loss = NAN if math.isnan(close) else -change if change < 0 else 0.0
+        rs = _div(self.gains.update(gain) / self.gains.window, self.losses.update(loss) / self.losses.window)
+        out["RSI"] = 100 - _div(100, 1 + rs)
+        lowest = self.stochastic_low.update(low)
+        k = _div(100 * (close - lowest), self.stochastic_high.update(high) - lowest)
+        out["%K"] = k
+        out["%D"] = self.stochastic_d.update(k) / 3
+        lowest = self.fisher_low.update(close)
+        value = 2 * (_div(close - lowest, self.fisher_high.update(close) - lowest) - 0.5)
+        ratio = _div(1 + value, 1 - value)
+        out["Fisher"] = NAN if math.isnan(ratio) or ratio < 0 else 0.5 * (math.log(ratio) if ratio else -math.inf)
+
+        if math.isnan(volume):
+            out["OBV"] = NAN
+        else:
+            self.obv += volume if change > 0 else -volume
+            out["OBV"] = self.obv
+        out["IIX"] = self.iix.update(_div(close - low, hl_range) * volume) / self.iix.window
+        mfv = _div((close - low) - (high - close), hl_range) * volume
+        out["CMF"] = _div(self.mfv.update(mfv), self.cmf_volume.update(volume))
+
+        mid = self.bollinger_mean.update(close) / self.bollinger_mean.window
+        width = 2 * self.bollinger_std.update(close)
+        out.update(bollinger_mid=mid, upper_band=mid + width, lower_band=mid - width)
+        mid = self.keltner_ema.update(close)
+        width = 2 * self.keltner_atr.update(true_range) / self.keltner_atr.window
+        out.update(keltner_mid=mid, upper_keltner=mid + width, lower_keltner=mid - width)
+        out["donchian_upper"] = self.donchian_high.update(high)
+        out["donchian_lower"] = self.donchian_low.update(low)
+
+        out["Daily Return"] = daily_return
+        if math.isnan(daily_return):
+            out["Cumulative Return"] = out["Summed Return"] = NAN
+        else:
+            self.growth *= 1 + daily_return
+            self.summed_return += daily_return
+            out["Cumulative Return"] = self.growth - 1
+            out["Summed Return"] = self.summed_return
+        out["EFI"] = volume * change
+
+        self.prev_close = close
+        self.bars += 1
+        return out
+
+    def checkpoint(self):
+        """Serialise the full calculator state."""
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def restore(cls, blob):
+        stream = pickle.loads(blob)
+        if not isinstance(stream, cls):
+            raise TypeError(f"checkpoint does not hold a {cls.__name__}")
+        return stream
@@ -0,0 +1,109 @@
+"""Deterministic synthetic OHLCV data for benchmarks and offline use.
+
+Prices follow a seeded geometric random walk, so the same seed always gives
+the same bars and no network access is needed.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from qqa.data import OHLCV_COLUMNS
+
+
+def _seed_for(symbol, seed):
+    # crc32 rather than hash() so a symbol maps to the same series in every process
+    return zlib.crc32(symbol.encode()) ^ seed
+
+
+def random_walk_arrays(n_bars, seed=0, start_price=100.0, volatility=0.01):
+    """OHLCV columns as a dict of float64 arrays, without building a date index."""
+    if n_bars == 0:
+        return {column: np.empty(0) for column in OHLCV_COLUMNS}
+    # One stream per column, so the first n bars do not depend on how many follow
+    close_rng, open_rng, high_rng, low_rng, volume_rng = map(
+        np.random.default_rng, np.random.SeedSequence(seed).spawn(5))
+    close = start_price * np.exp(np.cumsum(close_rng.normal(0.0, volatility, n_bars)))
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * np.exp(open_rng.normal(0.0, volatility / 4, n_bars - 1))
+    wick = np.abs([high_rng.normal(0.0, volatility / 2, n_bars), low_rng.normal(0.0, volatility / 2, n_bars)])
+    return {
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + wick[0]),
+        "Low": np.minimum(open_, close) * (1 - wick[1]),
+        "Close": close,
+        "Volume": volume_rng.integers(100_000, 10_000_000, n_bars).astype(np.float64),
+    }
+
+
+def random_walk(n_bars, seed=0, start="2000-01-03", freq="B", tz=None, start_price=100.0):
+    """A ``Date``-indexed OHLCV frame shaped like ``load_history`` output."""
+    index = pd.date_range(start, periods=n_bars, freq=freq, tz=tz, name="Date")
+    return pd.DataFrame(random_walk_arrays(n_bars, seed, start_price), index=index)[OHLCV_COLUMNS]
+
+
+def _bar_minutes(interval):
+    if interval.endswith("m"):
+        return int(interval[:-1])
+    if interval.endswith("h"):
+        return 60 * int(interval[:-1])
+    raise ValueError(f"unsupported synthetic interval {interval!r}")
+
+
+def _intraday(symbol, daily, interval, seed, session_start, session_end):
+    # Each session is a Brownian bridge from the day's open to its close,
+    # seeded per day so overlapping ranges agree
+    minutes = _bar_minutes(interval)
+    offsets = pd.timedelta_range(session_start, session_end, freq=f"{minutes}min", closed="left")
+    m = len(offsets)
+    t = np.arange(m + 1) / m
+    frames = []
+    for day, bar in daily.iterrows():
+        rng = np.random.default_rng([_seed_for(symbol, seed), day.toordinal()])
+        steps = np.concatenate(([0.0], np.cumsum(rng.normal(0.0, 0.01 / np.sqrt(m), m))))
+        path = np.log(bar["Open"]) + t * np.log(bar["Close"] / bar["Open"]) + steps - t * steps[-1]
+        prices = np.exp(path)
+        open_, close = prices[:-1], prices[1:]
+        wick = np.abs(rng.normal(0.0, 0.002, (2, m)))
+        frames.append(pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + wick[0]),
+            "Low": np.minimum(open_, close) * (1 - wick[1]),
+            "Close": close,
+            "Volume": np.floor(bar["Volume"] * rng.dirichlet(np.ones(m))),
+        }, index=day + offsets))
+    if not frames:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]), dtype=np.float64)
+    return pd.concat(frames)
+
+
+def symbol_history(symbol, start_date, end_date, interval="1d", seed=0, tz="Asia/Kolkata",
+                   session_start="09:15", session_end="15:30"):
+    """Synthetic bars for ``symbol`` on business days in ``[start_date, end_date)``.
+
+    The walk is anchored at a fixed epoch, so overlapping ranges of the same
+    symbol always agree. Intraday intervals (``"1m"``, ``"5m"``, ``"1h"``, ...)
+    fill the exchange session between each day's open and close.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if start.tz is not None:
+        start, end = start.tz_convert(tz).tz_localize(None), end.tz_convert(tz).tz_localize(None)
+    epoch = pd.Timestamp("1990-01-01")
+    dates = pd.bdate_range(epoch, end.normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+    frame = pd.DataFrame(random_walk_arrays(len(dates), _seed_for(symbol, seed)), index=dates)
+    if interval == "1d":
+        frame = frame[(frame.index >= start) & (frame.index < end)]
+    else:
+        frame = _intraday(symbol, frame[frame.index >= start.normalize()], interval, seed,
+                          pd.Timedelta(f"{session_start}:00"), pd.Timedelta(f"{session_end}:00"))
+        frame = frame[(frame.index >= start) & (frame.index < end)]
+    frame.index = frame.index.as_unit("ns").tz_localize(tz)
+    frame.index.name = "Date"
+    return frame[OHLCV_COLUMNS]
+
+
+def random_walk_universe(n_symbols, n_bars, seed=0):
+    """Time x symbol arrays for ``n_symbols`` independent walks, as used by ``IndicatorSet.from_panel``."""
+    walks = [random_walk_arrays(n_bars, seed + i) for i in range(n_symbols)]
+    return {column: np.column_stack([walk[column] for walk in walks]) for column in OHLCV_COLUMNS}
@@ -0,0 +1,252 @@
+"""Timing spans and counters for page runs, exported as JSON lines or Prometheus text.
+
+The fetch, compute, model and render paths wrap their work in
+``span(name, stage)`` and count upstream calls, bytes downloaded and cache
+hits with ``count``. A page run (``ui.begin_page_run``/``end_page_run``)
+collects the spans and counters raised while it is current, including those
+from worker threads started through ``propagate``; a section rerun on its own
+is a run of its own, under ``<page>/<section>``. Spans outside any run cost
+two clock reads and are not recorded; counters always add to the process
+totals.
+
+Each finished run is
+
+* added to per-process reservoirs of the latest ``RESERVOIR`` durations per
+  page and span, which ``prometheus()`` renders as p50/p95 summaries, and
+* appended to ``QQA_METRICS_FILE`` (default ``<cache>/metrics.jsonl``) as
+  one JSON object, or, for a ``.prom`` path, written out as the current
+  Prometheus text for node_exporter's textfile collector. An empty value
+  turns the export off.
+
+``python -m qqa.telemetry [file]`` prints p50/p95 per page and span from a
+JSON-lines file, e.g. one collected under real load.
+"""
+import argparse
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+STAGES = ("fetch", "compute", "model", "render", "section")
+RESERVOIR = 1000  # latest durations kept per page and span
+MAX_FILE_BYTES = 64 * 2**20  # the JSON-lines file moves to ``<name>.1`` past this size
+QUANTILES = (0.5, 0.95)
+
+_current = contextvars.ContextVar("qqa_telemetry_run", default=None)
+_lock = threading.Lock()
+_totals = defaultdict(float)  # (counter, kind) -> value since start-up
+_latency = defaultdict(lambda: deque(maxlen=RESERVOIR))  # (page, span, stage) -> recent seconds
+_sums = defaultdict(lambda: [0, 0.0])  # (page, span, stage) -> [count, total seconds] since start-up
+
+
+class Run:
+    """Spans and counters of one page run (or one section rerun)."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.seconds = None
+        self.spans = []  # (name, stage, start offset seconds, seconds)
+        self.counters = defaultdict(float)  # (counter, kind) -> value
+        self._lock = threading.Lock()
+
+    def record(self):
+        """The run as a JSON-serialisable dict."""
+        counters = defaultdict(dict)
+        for (name, kind), value in sorted(self.counters.items()):
+            counters[name][kind] = value
+        return {"time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "page": self.page, "seconds": self.seconds,
+                "spans": [{"name": name, "stage": stage, "start": start, "seconds": seconds}
+                          for name, stage, start, seconds in self.spans],
+                "counters": dict(counters)}
+
+
+def current():
+    return _current.get()
+
+
+def start(page):
+    """Make a new ``Run`` current for this thread and return it."""
+    run = Run(page)
+    _current.set(run)
+    return run
+
+
+def finish(run=None):
+    """End ``run`` (default the current one), aggregate it and append it to the metrics file."""
+    run = run or _current.get()
+    if run is None:
+        return None
+    if _current.get() is run:
+        _current.set(None)
+    run.seconds = time.perf_counter() - run._clock
+    with _lock:
+        for key, seconds in [((run.page, "page", "page"), run.seconds)] + [
+                ((run.page, name, stage), seconds) for name, stage, _, seconds in run.spans]:
+            _latency[key].append(seconds)
+            _sums[key][0] += 1
+            _sums[key][1] += seconds
+    try:
+        export(run)
+    except OSError:
+        pass  # metrics must never break a page
+    return run
+
+
+@contextmanager
+def span(name, stage="compute"):
+    """Time the block (or, as a decorator, each call) as ``name`` in ``stage`` of the current run."""
+    run = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if run is not None:
+            seconds = time.perf_counter() - started
+            with run._lock:
+                run.spans.append((name, stage, started - run._clock, seconds))
+
+
+def count(name, kind, value=1):
+    """Add ``value`` to counter ``name`` (e.g. ``cache_hits``) for ``kind`` (e.g. ``history_memory``)."""
+    with _lock:
+        _totals[(name, kind)] += value
+    run = _current.get()
+    if run is not None:
+        with run._lock:
+            run.counters[(name, kind)] += value
+
+
+def propagate(function):
+    """Wrap ``function`` so calls from worker threads record into the caller's current run."""
+    run = _current.get()
+
+    def call(*args, **kwargs):
+        token = _current.set(run)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return call
+
+
+def quantile(values, q):
+    """Linearly interpolated ``q`` quantile of ``values`` (NaN when empty)."""
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    position = q * (len(values) - 1)
+    lo = int(position)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (position - lo)
+
+
+def latency(page=None):
+    """``{(page, span, stage): {"count", "p50", "p95"}}`` over the reservoirs of this process."""
+    with _lock:
+        samples = {key: list(values) for key, values in _latency.items() if page is None or key[0] == page}
+    return {key: {"count": len(values), **{f"p{round(q * 100)}": quantile(values, q) for q in QUANTILES}}
+            for key, values in sorted(samples.items())}
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus():
+    """Process totals and latency summaries in the Prometheus text exposition format."""
+    with _lock:
+        totals = dict(_totals)
+        samples = {key: list(values) for key, values in _latency.items()}
+        sums = {key: tuple(value) for key, value in _sums.items()}
+    lines = []
+    for name in sorted({name for name, _ in totals}):
+        lines.append(f"# TYPE qqa_{name}_total counter")
+        lines += [f'qqa_{name}_total{{kind="{_label(kind)}"}} {value:g}'
+                  for (counter, kind), value in sorted(totals.items()) if counter == name]
+    for metric, pages in (("page", True), ("span", False)):
+        keys = sorted(key for key in samples if (key[1:] == ("page", "page")) == pages)
+        if not keys:
+            continue
+        lines.append(f"# TYPE qqa_{metric}_seconds summary")
+        for key in keys:
+            page, name, stage = key
+            labels = f'page="{_label(page)}"' + ("" if pages else f',span="{_label(name)}",stage="{stage}"')
+            lines += [f'qqa_{metric}_seconds{{{labels},quantile="{q:g}"}} {quantile(samples[key], q):.6f}'
+                      for q in QUANTILES]
+            lines.append(f"qqa_{metric}_seconds_sum{{{labels}}} {sums[key][1]:.6f}")
+            lines.append(f"qqa_{metric}_seconds_count{{{labels}}} {sums[key][0]}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_path():
+    """Where finished runs are exported, or ``None`` when ``QQA_METRICS_FILE`` is empty."""
+    value = os.environ.get("QQA_METRICS_FILE")
+    if value is None:
+        # qqa.data imports this module, so read its cache directory on first use
+        from qqa.data import CACHE_DIR
+        return CACHE_DIR / "metrics.jsonl"
+    return Path(value) if value else None
+
+
+def export(run, path=None):
+    path = path or metrics_path()
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".prom":
+        text = prometheus()
+        # Sessions finishing page runs together would otherwise share the temp file
+        with _lock:
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(text)
+            os.replace(tmp, path)
+        return
+    line = json.dumps(run.record()) + "\n"
+    with _lock:
+        if path.exists() and path.stat().st_size > MAX_FILE_BYTES:
+            os.replace(path, path.with_name(path.name + ".1"))
+        with open(path, "a") as handle:
+            handle.write(line)
+
+
+def summarise(records):
+    """p50/p95 per page and span from exported run records, as rows of dicts."""
+    samples = defaultdict(list)
+    for record in records:
+        samples[(record["page"], "page", "page")].append(record["seconds"])
+        for item in record["spans"]:
+            samples[(record["page"], item["name"], item["stage"])].append(item["seconds"])
+    return [{"page": page, "span": name, "stage": stage, "count": len(values),
+             **{f"p{round(q * 100)}": quantile(values, q) for q in QUANTILES}}
+            for (page, name, stage), values in sorted(samples.items())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise exported page-run metrics (p50/p95 per page and span).")
+    parser.add_argument("file", nargs="?", type=Path, help="JSON-lines metrics file (default: QQA_METRICS_FILE)")
+    parser.add_argument("--page", help="only this page (and its section reruns)")
+    args = parser.parse_args(argv)
+    path = args.file or metrics_path()
+    if path is None or not path.exists():
+        parser.error(f"no metrics file at {path}")
+    with open(path) as handle:
+        records = [json.loads(line) for line in handle if line.strip()]
+    if args.page:
+        records = [r for r in records if r["page"] == args.page or r["page"].startswith(args.page + "/")]
+    rows = summarise(records)
+    width = max([len(f"{r['page']} {r['span']}") for r in rows] + [10])
+    print(f"{'page / span':<{width}}  {'stage':<8} {'count':>6} {'p50 ms':>9} {'p95 ms':>9}")
+    for r in rows:
+        print(f"{r['page'] + ' ' + r['span']:<{width}}  {r['stage']:<8} {r['count']:>6} "
+              f"{r['p50'] * 1000:>9.1f} {r['p95'] * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
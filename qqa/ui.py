@@ -0,0 +1,135 @@
+"""Streamlit helpers shared by the pages."""
+import functools
+import time
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from qqa import telemetry
+from qqa.plotting import MAX_POINTS, WEBGL_POINTS, payload_stats, prepare_figure
+from qqa.prefetch import prefetcher
+
+
+def chart_options(section_timings=False):
+    """Sidebar controls for chart rendering; call once per page."""
+    with st.sidebar.expander("Chart Rendering"):
+        st.checkbox("Downsample long series", value=True, key="downsample_charts")
+        st.number_input("Max points per trace", min_value=100, max_value=100000, value=MAX_POINTS,
+                        step=100, key="max_chart_points")
+        st.checkbox(f"Draw charts over {WEBGL_POINTS:,} points with WebGL", value=True, key="webgl_charts")
+        st.checkbox("Show chart payload size", value=False, key="show_payload_stats")
+        if section_timings:
+            st.checkbox("Show section timings", value=False, key="show_section_timings")
+
+
+def _session_id():
+    return st.session_state.setdefault("_session_id", uuid.uuid4().hex)
+
+
+def begin_page_run(page="page"):
+    """Mark the start of a full script run; pair with ``end_page_run`` at the bottom of the page.
+
+    Starts a ``qqa.telemetry`` run named ``page`` that collects the spans and
+    counters of everything the page calls until ``end_page_run``, and holds
+    background prefetching back until then.
+    """
+    st.session_state["_page_run"] = st.session_state.get("_page_run", 0) + 1
+    st.session_state["_page_started"] = time.perf_counter()
+    st.session_state["_page_name"] = page
+    telemetry.start(page)
+    prefetcher.enter(_session_id())
+
+
+def end_page_run():
+    """Finish the page's telemetry run and show the sidebar performance panel."""
+    seconds = time.perf_counter() - st.session_state.pop("_page_started", time.perf_counter())
+    st.session_state["page_seconds"] = seconds
+    prefetcher.exit(_session_id())
+    if st.session_state.get("show_section_timings", False):
+        st.sidebar.caption(f"Full page run: {seconds * 1000:,.0f} ms")
+    with st.sidebar.expander("Performance", expanded=st.session_state.get("show_debug_panel", False)):
+        show = st.checkbox("Show timings for this run", value=False, key="show_debug_panel")
+        run = telemetry.finish()
+        if show and run is not None:
+            debug_panel(run)
+
+
+def prefetch(symbol, start_date, end_date):
+    """Warm the other pages' data and analyses for this selection in the background (``qqa.prefetch``)."""
+    if symbol:
+        prefetcher.warm(symbol, start_date, end_date, owner=_session_id())
+
+
+def debug_panel(run):
+    """Spans, counters and recent p50/p95 latencies of a finished telemetry run."""
+    st.caption(f"{run.page}: {run.seconds * 1000:,.0f} ms")
+    if run.spans:
+        spans = pd.DataFrame(run.spans, columns=["Span", "Stage", "Start ms", "ms"])
+        spans[["Start ms", "ms"]] *= 1000
+        st.dataframe(spans.round(1), hide_index=True)
+    counters = run.record()["counters"]
+    if counters:
+        st.dataframe(pd.DataFrame([{"Counter": name, "Kind": kind, "Value": value}
+                                   for name, kinds in counters.items() for kind, value in kinds.items()]),
+                     hide_index=True)
+    recent = telemetry.latency(run.page)
+    if recent:
+        st.caption("Latency over recent runs of this page (ms)")
+        st.dataframe(pd.DataFrame([{"Span": span, "Stage": stage, "Runs": values["count"],
+                                    "p50": values["p50"] * 1000, "p95": values["p95"] * 1000}
+                                   for (_, span, stage), values in recent.items()]).round(1),
+                     hide_index=True)
+
+
+def section(name):
+    """Decorator turning a page section into a fragment with its own timing.
+
+    Widgets inside the section rerun only that function, with the inputs it
+    was called with on the last full run, instead of the whole script. The
+    time of each run is kept in ``st.session_state["section_timings"]`` and,
+    when enabled in ``chart_options``, shown under the section next to the
+    last full page run.
+    """
+    def decorate(render):
+        @functools.wraps(render)
+        def run(*args, **kwargs):
+            # A section seen before in the same page run is being rerun on its own
+            page_run = st.session_state.get("_page_run", 0)
+            alone = st.session_state.get(f"_section_run.{name}") == page_run
+            st.session_state[f"_section_run.{name}"] = page_run
+            section_run = telemetry.start(f"{st.session_state.get('_page_name', 'page')}/{name}") if alone else None
+            started = time.perf_counter()
+            with telemetry.span(name, "section"):
+                render(*args, **kwargs)
+            seconds = time.perf_counter() - started
+            if section_run is not None:
+                telemetry.finish(section_run)
+            st.session_state.setdefault("section_timings", {})[name] = seconds
+            if st.session_state.get("show_section_timings", False):
+                page = st.session_state.get("page_seconds")
+                scope = f"section rerun, full page {page * 1000:,.0f} ms" if alone and page else "full page run"
+                st.caption(f"{name}: {seconds * 1000:,.0f} ms ({scope})")
+        return st.fragment(run)
+    return decorate
+
+
+def plotly_chart(fig, **kwargs):
+    """``st.plotly_chart`` of a figure prepared for the browser with ``qqa.plotting.prepare_figure``.
+
+    Long traces are downsampled, large figures drawn with WebGL and numeric
+    arrays sent as binary buffers, as set in ``chart_options``.
+    """
+    show_stats = st.session_state.get("show_payload_stats", False)
+    before = payload_stats(fig) if show_stats else None
+    kwargs.setdefault("use_container_width", True)
+    with telemetry.span("plotly_chart", "render"):
+        prepare_figure(fig, int(st.session_state.get("max_chart_points", MAX_POINTS)),
+                       WEBGL_POINTS if st.session_state.get("webgl_charts", True) else float("inf"),
+                       downsample=st.session_state.get("downsample_charts", True))
+        st.plotly_chart(fig, **kwargs)
+    if show_stats:
+        after = payload_stats(fig)
+        st.caption(f"Payload: {before['points']:,} → {after['points']:,} points, "
+                   f"{before['bytes'] / 1024:,.0f} → {after['bytes'] / 1024:,.0f} KiB, "
+                   f"serialised in {before['seconds'] * 1000:.0f} → {after['seconds'] * 1000:.0f} ms")
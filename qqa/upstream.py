@@ -0,0 +1,206 @@
+"""Process-wide coordination of upstream requests.
+
+Every session and page downloads through ``coordinator`` (the history cache
+via ``qqa.data._download``, company metadata and intraday syncs), which
+
+* coalesces concurrent identical requests: while a download for a key
+  (e.g. symbol, range and interval) is in flight, later callers wait for it
+  and share its result or exception instead of sending their own;
+* passes requests to remote providers through a token bucket of ``RATE``
+  requests per second with bursts of ``BURST``, so a burst of sessions at
+  market open queues briefly instead of being throttled upstream;
+* retries ``RateLimited``, ``Unavailable`` (the provider's transient
+  transport failures) and connection errors up to ``RETRIES`` times with
+  jittered exponential backoff, honouring the provider's ``retry_after``.
+
+The limits are per process, and read from ``QQA_RATE_LIMIT``,
+``QQA_RATE_BURST`` and ``QQA_FETCH_RETRIES``. The ``simulated`` provider
+(``qqa.providers.SimulatedProvider``) stands in for a remote API with latency
+and throttling to exercise all three.
+"""
+import contextlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from qqa import telemetry
+from qqa.providers import RateLimited, Unavailable, get_provider
+
+RATE = float(os.environ.get("QQA_RATE_LIMIT", 4))
+BURST = int(os.environ.get("QQA_RATE_BURST", 8))
+RETRIES = int(os.environ.get("QQA_FETCH_RETRIES", 4))
+BACKOFF = 0.5  # seconds before the first retry, doubled for each one after
+MAX_BACKOFF = 8.0
+RETRYABLE = (RateLimited, Unavailable, ConnectionError, TimeoutError)
+
+
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens a second, holding at most ``burst``."""
+
+    def __init__(self, rate=RATE, burst=BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting for it if necessary; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def penalise(self, seconds):
+        """Empty the bucket for ``seconds``, e.g. after upstream asked to back off."""
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class SingleFlight:
+    """Run a function at most once at a time per key; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the call in flight
+        self.shared = 0
+
+    def do(self, key, function):
+        """Return ``(result, shared)``; ``shared`` is true when another caller's call produced it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result(), True
+        try:
+            result = function()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+
+class KeyedLocks:
+    """One lock per key, kept only while some thread holds or waits for it.
+
+    ``with locks(key):`` serialises work on ``key``. Entries are reference
+    counted and dropped by the last user, so a long-running server that sees
+    many symbols does not keep a lock for each of them.
+    """
+
+    def __init__(self, reentrant=False):
+        self._factory = threading.RLock if reentrant else threading.Lock
+        self._lock = threading.Lock()
+        self._locks = {}  # key -> [lock, threads holding or waiting]
+
+    def __len__(self):
+        return len(self._locks)
+
+    @contextlib.contextmanager
+    def __call__(self, key):
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [self._factory(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+class FetchCoordinator:
+    def __init__(self, rate=RATE, burst=BURST, retries=RETRIES, backoff=BACKOFF, max_backoff=MAX_BACKOFF,
+                 provider=None, sleep=time.sleep):
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.flight = SingleFlight()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._provider = provider
+        self._sleep = sleep
+        self._lock = threading.Lock()  # the counters are updated from every session's thread
+        self.calls = self.retried = 0
+
+    @property
+    def provider(self):
+        return self._provider or get_provider()
+
+    def call(self, kind, function, *args):
+        """``function(*args)`` against the provider, rate limited when it is remote and retried on throttling."""
+        remote = self.provider.remote
+        for attempt in range(self.retries + 1):
+            if remote:
+                waited = self.bucket.acquire()
+                if waited:
+                    telemetry.count("rate_limit_wait_seconds", kind, waited)
+            with self._lock:
+                self.calls += 1
+            try:
+                return function(*args)
+            except RETRYABLE as e:
+                if attempt == self.retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                if getattr(e, "retry_after", None):
+                    delay = max(delay, e.retry_after)
+                    self.bucket.penalise(e.retry_after)
+                with self._lock:
+                    self.retried += 1
+                telemetry.count("upstream_retries", kind)
+                self._sleep(delay)
+
+    def single_flight(self, key, function):
+        """Run ``function()`` once for concurrent callers with the same ``key``; returns its result."""
+        result, shared = self.flight.do(key, function)
+        if shared:
+            telemetry.count("coalesced_requests", key[0])
+        return result
+
+    def history(self, symbol, start, end, interval="1d"):
+        key = ("history", symbol.strip().upper(), str(start), str(end), interval)
+        provider = self.provider
+        frame, shared = self.flight.do(
+            key, lambda: self.call("history", provider.history, symbol, start, end, interval))
+        if shared:
+            telemetry.count("coalesced_requests", "history")
+            # Callers may modify what they get, so only the leader keeps the original
+            return frame.copy()
+        return frame
+
+    def info(self, symbol):
+        provider = self.provider
+        values, shared = self.flight.do(("info", symbol.strip().upper()),
+                                        lambda: self.call("metadata", provider.info, symbol))
+        if shared:
+            telemetry.count("coalesced_requests", "metadata")
+            return dict(values or {})
+        return values
+
+
+coordinator = FetchCoordinator()
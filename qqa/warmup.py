@@ -0,0 +1,115 @@
+"""Preload heavy modules and prime the data cache before users arrive.
+
+Pages import scipy, statsmodels and scikit-learn only in the sections that
+use them, so a fresh replica renders its first page quickly. ``start()`` pays
+those imports (and spins up the joblib worker processes used by walk-forward
+evaluation) on a background thread instead, and optionally loads a symbol
+list into the history cache. Home.py calls it when ``QQA_WARMUP`` is set.
+
+Run as a container start or readiness step to prime a shared cache::
+
+    python -m qqa.warmup --years 5
+"""
+import argparse
+import importlib
+import os
+import sys
+import threading
+import time
+
+# Deferred by the pages; listed roughly in the order users reach them
+HEAVY_MODULES = [
+    "pandas",
+    "pyarrow.parquet",
+    "plotly.graph_objects",
+    "plotly.express",
+    "scipy.signal",
+    "statsmodels.tsa.seasonal",
+    "sklearn.ensemble",
+    "sklearn.model_selection",
+    "sklearn.metrics",
+]
+
+_lock = threading.Lock()
+_thread = None
+timings = {}  # module or step -> seconds, filled in as the warm-up runs
+
+
+def preload(modules=HEAVY_MODULES):
+    """Import ``modules``; returns seconds per module (near zero when already loaded)."""
+    for name in modules:
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - started
+    return {name: timings[name] for name in modules}
+
+
+def preload_workers(modules=("sklearn.ensemble", "sklearn.metrics")):
+    """Start joblib's reusable worker processes and import ``modules`` in each of them."""
+    import joblib
+
+    started = time.perf_counter()
+    n_jobs = joblib.cpu_count()
+    joblib.Parallel(n_jobs=-1)(joblib.delayed(preload)(modules) for _ in range(n_jobs))
+    timings["workers"] = time.perf_counter() - started
+    return timings["workers"]
+
+
+def prime(symbols, years=5, interval="1d", max_workers=8):
+    """Load the last ``years`` of ``symbols`` into the history cache; returns the per-symbol errors."""
+    import pandas as pd
+
+    from qqa.data import load_panel
+
+    started = time.perf_counter()
+    end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    _, errors = load_panel(symbols, end - pd.DateOffset(years=years), end, ["Close"], interval, max_workers)
+    timings["data"] = time.perf_counter() - started
+    return errors
+
+
+def run(symbols=(), years=5, workers=True):
+    preload()
+    if workers:
+        preload_workers()
+    return prime(symbols, years) if symbols else {}
+
+
+def start(symbols=None, years=5, workers=True):
+    """Run the warm-up on a daemon thread, once per process; returns the thread.
+
+    Without ``symbols``, only modules and workers are warmed, unless
+    ``QQA_WARMUP=data``, which also caches the Nifty-50.
+    """
+    global _thread
+    if symbols is None:
+        from qqa.universe import NIFTY_50
+
+        symbols = NIFTY_50 if os.environ.get("QQA_WARMUP") == "data" else ()
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run, args=(symbols, years, workers), name="qqa-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preload heavy modules and prime the history cache.")
+    parser.add_argument("--symbols", nargs="*", help="symbols to cache (default: the Nifty-50)")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--no-data", action="store_true", help="only preload modules")
+    args = parser.parse_args(argv)
+
+    from qqa.universe import NIFTY_50
+
+    symbols = () if args.no_data else (args.symbols or NIFTY_50)
+    errors = run(symbols, args.years, workers=False)
+    for step, seconds in timings.items():
+        print(f"{step:<28} {seconds:8.3f}s")
+    for symbol, error in errors.items():
+        print(f"failed: {symbol}: {error}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
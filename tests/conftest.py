@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qqa.providers import SyntheticProvider
+
+
+def ohlcv(close, seed=0, start="2020-01-01"):
+    """An OHLCV frame around ``close`` with a DatetimeIndex of business days."""
+    close = np.asarray(close, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    spread = np.abs(rng.normal(0, 0.01, len(close))) * close
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.003, len(close))),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, len(close)).astype(np.float64),
+    }, index=pd.bdate_range(start, periods=len(close), name="Date"))
+
+
+def random_walk(n, seed=0, volatility=0.02):
+    return 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, volatility, n))
+
+
+@pytest.fixture
+def bars():
+    """Two years of a seeded random walk."""
+    return ohlcv(random_walk(504))
+
+
+class RecordingProvider(SyntheticProvider):
+    """Synthetic bars, remembering every ``(symbol, start, end, interval)`` asked for."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def history(self, symbol, start, end, interval="1d"):
+        self.requests.append((symbol, pd.Timestamp(start), pd.Timestamp(end), interval))
+        return super().history(symbol, start, end, interval)
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    """A recording synthetic provider behind an empty history cache under ``tmp_path``."""
+    import qqa.data
+    from qqa.upstream import coordinator
+
+    recorder = RecordingProvider()
+    monkeypatch.setattr(qqa.data, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(qqa.data, "_memory", qqa.data.HistoryMemory())
+    monkeypatch.setattr(coordinator, "_provider", recorder)
+    return recorder
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qqa.barstore import BarStore, intraday_intensity, opening_range, session_vwap
+from qqa.ingest import ingest_directory, ingest_file
+from qqa.synthetic import symbol_history
+
+TZ = "Asia/Kolkata"
+
+
+@pytest.fixture
+def bar_store(tmp_path):
+    return BarStore(tmp_path / "bars")
+
+
+def five_minute(start="2024-03-04", end="2024-03-09"):
+    return symbol_history("RELIANCE.NS", start, end, "5m", tz=TZ)
+
+
+def test_append_writes_only_newer_bars(bar_store):
+    bars = five_minute()
+    assert bar_store.append("RELIANCE.NS", "5m", bars.iloc[:100]) == 100
+    assert bar_store.append("RELIANCE.NS", "5m", bars.iloc[50:]) == len(bars) - 100
+    assert bar_store.append("RELIANCE.NS", "5m", bars) == 0
+    assert bar_store.rows("reliance.ns", "5m") == len(bars)
+    pd.testing.assert_frame_equal(bar_store.view("RELIANCE.NS", "5m").to_frame(), bars, check_freq=False)
+
+
+def test_append_sorts_out_of_order_bars(bar_store):
+    bars = five_minute()
+    bar_store.append("X", "5m", bars.sample(frac=1, random_state=0))
+    assert (np.diff(bar_store.view("X", "5m")["Date"]) > 0).all()
+
+
+def test_append_recovers_from_an_interrupted_write(bar_store):
+    bars = five_minute()
+    bar_store.append("X", "5m", bars.iloc[:10])
+    # Bytes of an append whose meta.json update never happened
+    with open(bar_store._dir("X", "5m") / "Close.bin", "ab") as handle:
+        handle.write(b"\0" * 8 * 5)
+    bar_store.append("X", "5m", bars.iloc[10:20])
+    np.testing.assert_array_equal(bar_store.view("X", "5m")["Close"], bars["Close"].iloc[:20])
+
+
+def test_view_slices_by_exchange_dates(bar_store):
+    bars = five_minute()
+    bar_store.append("X", "5m", bars)
+    view = bar_store.view("X", "5m", "2024-03-05", "2024-03-07")
+    expected = bars.loc["2024-03-05":"2024-03-06"]
+    assert len(view) == len(expected)
+    assert isinstance(view["Close"], np.memmap)
+    assert view.dates[0] == expected.index[0]
+    assert len(bar_store.view("missing", "5m")) == 0
+
+
+def test_session_indicators_reset_each_day(bar_store):
+    bars = five_minute()
+    bar_store.append("X", "5m", bars)
+    view = bar_store.view("X", "5m")
+    vwap = session_vwap(view)
+    intensity = intraday_intensity(view)
+    high, low = opening_range(view, minutes=30)
+    typical = (bars["High"] + bars["Low"] + bars["Close"]) / 3
+    for _, day in bars.groupby(bars.index.date):
+        rows = bars.index.get_indexer(day.index)
+        expected = (typical.iloc[rows] * day["Volume"]).cumsum() / day["Volume"].cumsum()
+        np.testing.assert_allclose(vwap[rows], expected, rtol=1e-9)
+        flow = (2 * day["Close"] - day["High"] - day["Low"]) / (day["High"] - day["Low"]) * day["Volume"]
+        np.testing.assert_allclose(intensity[rows], flow.fillna(0).cumsum(), rtol=1e-9, atol=1e-6)
+        first = day.loc[day.index < day.index[0] + pd.Timedelta(minutes=30)]
+        assert (high[rows] == first["High"].max()).all() and (low[rows] == first["Low"].min()).all()
+
+
+def test_ingest_intraday_and_daily_files(provider, bar_store, tmp_path):
+    vendor = tmp_path / "vendor"
+    (vendor / "5m").mkdir(parents=True)
+    intraday = five_minute()
+    intraday.tz_localize(None).reset_index().rename(columns={"Date": "timestamp", "Close": "close"}).to_csv(
+        vendor / "5m" / "RELIANCE.csv", index=False)
+    daily = symbol_history("TCS", "2023-01-01", "2023-04-01", tz=TZ)
+    daily.tz_localize(None).reset_index().to_csv(vendor / "TCS.csv", index=False)
+
+    assert ingest_file(vendor / "5m" / "RELIANCE.csv", "RELIANCE.NS", "5m", bar_store=bar_store) == (
+        len(intraday), len(intraday))
+    np.testing.assert_allclose(bar_store.view("RELIANCE.NS", "5m")["Close"], intraday["Close"])
+
+    report, errors = ingest_directory(vendor, intervals=["1d"], suffix=".NS", bar_store=bar_store)
+    assert not errors
+    assert report[["Symbol", "Rows"]].values.tolist() == [["TCS.NS", len(daily)]]
+    from qqa.data import load_history
+    loaded = load_history("TCS.NS", daily.index[0].tz_localize(None), daily.index[-1].tz_localize(None) + pd.Timedelta(days=1))
+    assert not provider.requests
+    np.testing.assert_allclose(loaded["Close"], daily["Close"], rtol=1e-6)
+
+
+def test_ingest_reports_bad_files(provider, bar_store, tmp_path):
+    (tmp_path / "BROKEN.csv").write_text("when,price\n2024-01-01,1\n")
+    report, errors = ingest_directory(tmp_path, intervals=["1d"], bar_store=bar_store)
+    assert report.empty and list(errors) == [str(tmp_path / "BROKEN.csv")]
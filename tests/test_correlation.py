@@ -0,0 +1,53 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from conftest import random_walk
+from qqa.correlation import RollingMatrices, rolling_matrices_for
+
+
+def returns_frame(n=400, symbols=("AAPL", "MSFT", "GOOGL")):
+    frame = pd.DataFrame({symbol: random_walk(n, seed=i) for i, symbol in enumerate(symbols)},
+                         index=pd.bdate_range("2020-01-01", periods=n))
+    frame.iloc[:30, 2] = np.nan  # a later listing
+    return frame.pct_change()
+
+
+def test_matches_pandas_rolling(tmp_path):
+    returns = returns_frame()
+    matrices = rolling_matrices_for(returns, 60, directory=tmp_path)
+    np.testing.assert_allclose(matrices.pair("AAPL", "GOOGL"),
+                               returns["AAPL"].rolling(60).corr(returns["GOOGL"]), rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(matrices.pair("AAPL", "MSFT", kind="covariance"),
+                               returns["AAPL"].rolling(60).cov(returns["MSFT"]), rtol=1e-4, atol=1e-9)
+
+
+def test_concurrent_callers_build_once(tmp_path, monkeypatch):
+    calls = []
+    build = RollingMatrices.build.__func__
+
+    def slow_build(cls, *args, **kwargs):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(RollingMatrices, "build", classmethod(slow_build))
+    returns = returns_frame()
+    start = threading.Barrier(4)
+    results = [None] * 4
+
+    def load(i):
+        start.wait()
+        results[i] = rolling_matrices_for(returns, 60, directory=tmp_path).values
+
+    threads = [threading.Thread(target=load, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    for values in results:
+        np.testing.assert_array_equal(values, results[0])
+    assert [path.suffix for path in tmp_path.iterdir()] == [".npy"]
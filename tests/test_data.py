@@ -0,0 +1,132 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import qqa.data
+from qqa.data import HistoryMemory, clear_cache, compact, load_history, store_history
+from qqa.synthetic import random_walk
+
+
+def coverage(path):
+    return json.loads(pq.read_schema(path).metadata[b"qqa.coverage"])
+
+
+def test_first_load_downloads_the_range_and_records_coverage(provider, tmp_path):
+    frame = load_history("aapl", "2023-01-01", "2023-07-01")
+    assert provider.requests == [("AAPL", pd.Timestamp("2023-01-01"), pd.Timestamp("2023-07-01"), "1d")]
+    assert frame.index.min() >= pd.Timestamp("2023-01-01", tz=frame.index.tz)
+    assert frame.index.max() < pd.Timestamp("2023-07-01", tz=frame.index.tz)
+    assert coverage(tmp_path / "1d" / "AAPL.parquet") == {"start": "2023-01-01T00:00:00",
+                                                         "end": "2023-07-01T00:00:00"}
+
+
+def test_covered_ranges_are_served_without_downloads(provider):
+    whole = load_history("AAPL", "2023-01-01", "2023-07-01")
+    part = load_history("AAPL", "2023-02-01", "2023-03-01")
+    assert len(provider.requests) == 1
+    pd.testing.assert_frame_equal(part, whole.loc["2023-02-01":"2023-02-28"])
+
+
+def test_wider_ranges_download_only_the_missing_ends(provider, tmp_path):
+    load_history("AAPL", "2023-03-01", "2023-05-01")
+    frame = load_history("AAPL", "2023-01-01", "2023-07-01")
+    assert provider.requests[1:] == [
+        ("AAPL", pd.Timestamp("2023-01-01"), pd.Timestamp("2023-03-01"), "1d"),
+        ("AAPL", pd.Timestamp("2023-05-01"), pd.Timestamp("2023-07-01"), "1d"),
+    ]
+    assert coverage(tmp_path / "1d" / "AAPL.parquet") == {"start": "2023-01-01T00:00:00",
+                                                         "end": "2023-07-01T00:00:00"}
+    # The pieces join up into the same bars a single download gives
+    expected = compact(provider.history("AAPL", "2023-01-01", "2023-07-01"))
+    pd.testing.assert_frame_equal(frame, expected, check_freq=False)
+    assert frame.index.is_unique and frame.index.is_monotonic_increasing
+
+
+def test_key_locks_are_released_after_loads(provider):
+    for symbol in ("AAPL", "MSFT", "GOOGL"):
+        load_history(symbol, "2023-01-01", "2023-03-01")
+    assert len(qqa.data._key_locks) == 0
+
+
+def test_disk_cache_survives_the_memory(provider, monkeypatch):
+    first = load_history("AAPL", "2023-01-01", "2023-07-01")
+    monkeypatch.setattr(qqa.data, "_memory", HistoryMemory())
+    again = load_history("AAPL", "2023-01-01", "2023-07-01")
+    assert len(provider.requests) == 1
+    pd.testing.assert_frame_equal(again, first)
+
+
+def test_today_is_never_marked_covered(provider, tmp_path):
+    today = pd.Timestamp.today().normalize()
+    load_history("AAPL", today - pd.Timedelta(days=30), today + pd.Timedelta(days=5))
+    assert pd.Timestamp(coverage(tmp_path / "1d" / "AAPL.parquet")["end"]) == today
+    load_history("AAPL", today - pd.Timedelta(days=30), today + pd.Timedelta(days=5))
+    assert provider.requests[-1][1] == today
+
+
+def test_history_is_compact_and_read_only_for_sessions(provider):
+    frame = load_history("AAPL", "2023-01-01", "2023-07-01")
+    assert list(frame.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert frame["Close"].dtype == qqa.data.PRICE_DTYPE and frame["Volume"].dtype == np.float64
+    frame.loc[frame.index[0], "Close"] = -1.0
+    frame["Close"] *= 2
+    assert (load_history("AAPL", "2023-01-01", "2023-07-01")["Close"] > 0).all()
+
+
+def test_store_history_merges_and_extends_touching_coverage(provider, tmp_path):
+    load_history("AAPL", "2023-01-01", "2023-03-01")
+    later = random_walk(40, start="2023-03-01", tz="Asia/Kolkata")
+    rows = store_history("AAPL", later)
+    assert coverage(tmp_path / "1d" / "AAPL.parquet")["start"] == "2023-01-01T00:00:00"
+    frame = load_history("AAPL", "2023-01-01", later.index[-1].tz_localize(None) + pd.Timedelta(days=1))
+    assert len(provider.requests) == 1
+    assert len(frame) == rows
+    np.testing.assert_allclose(frame["Close"].iloc[-40:], later["Close"], rtol=1e-6)
+
+
+def test_store_history_leaves_gaps_to_be_fetched(provider, tmp_path):
+    load_history("AAPL", "2023-01-01", "2023-02-01")
+    store_history("AAPL", random_walk(20, start="2023-06-01", tz="Asia/Kolkata"))
+    assert coverage(tmp_path / "1d" / "AAPL.parquet")["start"] == "2023-06-01T00:00:00"
+
+
+def test_clear_cache(provider, tmp_path):
+    load_history("AAPL", "2023-01-01", "2023-02-01")
+    load_history("MSFT", "2023-01-01", "2023-02-01")
+    clear_cache("aapl")
+    assert not (tmp_path / "1d" / "AAPL.parquet").exists()
+    assert (tmp_path / "1d" / "MSFT.parquet").exists()
+    load_history("AAPL", "2023-01-01", "2023-02-01")
+    assert len(provider.requests) == 3
+
+
+def test_memory_evicts_least_recently_used():
+    frame = compact(random_walk(1000))
+    size = int(frame.memory_usage(index=True).sum())
+    memory = HistoryMemory(budget=int(size * 2.5))
+    for symbol in "ABC":
+        memory.put((symbol, "1d"), frame, None, None)
+    assert memory.keys() == [("B", "1d"), ("C", "1d")] and memory.evictions == 1
+    memory.get(("B", "1d"))
+    memory.put(("D", "1d"), frame, None, None)
+    assert memory.keys() == [("B", "1d"), ("D", "1d")]
+    assert memory.nbytes == 2 * size
+
+
+def test_memory_keeps_an_oversized_entry():
+    memory = HistoryMemory(budget=1)
+    memory.put(("A", "1d"), compact(random_walk(10)), None, None)
+    assert len(memory) == 1
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_compact_sorts_and_casts(dtype, monkeypatch):
+    monkeypatch.setattr(qqa.data, "PRICE_DTYPE", np.dtype(dtype))
+    frame = random_walk(10).assign(Extra=1.0).iloc[::-1]
+    out = compact(frame)
+    assert list(out.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert out.index.is_monotonic_increasing
+    assert out["Open"].dtype == dtype and out["Volume"].dtype == np.float64
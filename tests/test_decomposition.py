@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qqa.decomposition import (DecompositionCache, decompose, dominant_periods, extend, suggest_periods,
+                               valid_periods)
+
+
+def seasonal_series(n, period=21, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    log_price = np.log(100) + 0.0004 * t + 0.03 * np.sin(2 * np.pi * t / period) + rng.normal(0, 0.004, n)
+    return pd.Series(np.exp(log_price), index=pd.bdate_range("2015-01-01", periods=n, name="Date"))
+
+
+@pytest.mark.parametrize("method", ["classical", "stl"])
+@pytest.mark.parametrize("model", ["multiplicative", "additive"])
+def test_components_recombine_to_the_series(method, model):
+    close = seasonal_series(600)
+    frame = decompose(close, [21], method, model)
+    np.testing.assert_allclose(frame["Observed"], close, rtol=1e-10)
+    valid = frame.dropna()
+    combined = (valid["Trend"] * valid["Seasonal"] * valid["Residual"] if model == "multiplicative"
+                else valid["Trend"] + valid["Seasonal"] + valid["Residual"])
+    np.testing.assert_allclose(combined, valid["Observed"], rtol=1e-9)
+
+
+def test_seasonal_component_recovers_the_cycle():
+    close = seasonal_series(800)
+    seasonal = np.log(decompose(close, [21])["Seasonal"]).to_numpy()
+    expected = 0.03 * np.sin(2 * np.pi * np.arange(800) / 21)
+    assert np.corrcoef(seasonal, expected)[0, 1] > 0.95
+
+
+def test_several_periods_are_returned_separately():
+    frame = decompose(seasonal_series(800), [5, 21], "stl")
+    assert {"Seasonal (5)", "Seasonal (21)"} <= set(frame.columns)
+    np.testing.assert_allclose(frame["Seasonal (5)"] * frame["Seasonal (21)"], frame["Seasonal"], rtol=1e-9)
+
+
+def test_short_series_raise():
+    with pytest.raises(ValueError):
+        decompose(seasonal_series(30), [21])
+    assert valid_periods([5, 21, 63], 100) == [5, 21]
+
+
+def test_dominant_periods_find_the_cycle():
+    assert 21 in [round(p) for p in dominant_periods(seasonal_series(1500).to_numpy())]
+    detected, options, default = suggest_periods(seasonal_series(1500))
+    assert default and set(default) <= set(options)
+
+
+def test_stl_extension_matches_a_full_refit():
+    close = seasonal_series(1200)
+    previous = decompose(close.iloc[:1100], [21], "stl")
+    extended = extend(previous, close, [21], "stl")
+    full = decompose(close, [21], "stl")
+    assert extended.index.equals(full.index)
+    # Far from the end the cached fit is kept as it was
+    start = 1100 - 10 * 21
+    pd.testing.assert_frame_equal(extended.iloc[:start], previous.iloc[:start])
+    # Across the blend and the new bars the result stays close to a full refit
+    np.testing.assert_allclose(extended["Trend"].iloc[start:], full["Trend"].iloc[start:], rtol=2e-3)
+    np.testing.assert_allclose(extended["Observed"], close, rtol=1e-10)
+
+
+def test_extension_blends_smoothly():
+    close = seasonal_series(1200)
+    previous = decompose(close.iloc[:1100], [21], "stl")
+    trend = np.log(extend(previous, close, [21], "stl")["Trend"].to_numpy())
+    # No step where the blend starts or ends
+    assert np.abs(np.diff(trend)).max() < 5 * np.abs(np.diff(trend[:800])).max()
+
+
+def test_classical_extension_is_a_refit():
+    close = seasonal_series(700)
+    previous = decompose(close.iloc[:650], [21])
+    pd.testing.assert_frame_equal(extend(previous, close, [21]), decompose(close, [21]))
+
+
+def test_cache_hits_extends_and_refits():
+    cache = DecompositionCache()
+    close = seasonal_series(1200)
+    first = cache.get("aapl", close.iloc[:1100], [21], "stl")
+    assert cache.get("AAPL", close.iloc[:1100], [21], "stl") is first
+    cache.get("AAPL", close, [21], "stl")
+    revised = close.copy()
+    revised.iloc[500] *= 1.1
+    cache.get("AAPL", revised, [21], "stl")
+    assert (cache.hits, cache.extensions, cache.fits) == (1, 1, 2)
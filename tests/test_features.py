@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from conftest import ohlcv, random_walk
+from qqa.features import FeatureStore, compute_features, next_row
+
+SAME_BAR = {"Open", "High", "Low", "Close", "Volume", "MA50", "MA200"}
+
+
+def test_only_same_bar_features_see_the_last_bar():
+    bars = ohlcv(random_walk(400))
+    changed = bars.copy()
+    changed.iloc[-1] = changed.iloc[-1] * 1.5
+    before, after = compute_features(bars), compute_features(changed)
+    moved = {name for name in before
+             if not np.array_equal(before[name][-1], after[name][-1], equal_nan=True)}
+    assert moved <= SAME_BAR
+    assert {"Close", "MA50", "MA200"} <= moved
+
+
+def test_next_row_matches_the_stored_row():
+    bars = ohlcv(random_walk(400))
+    row = next_row(bars.iloc[:-1])
+    stored = compute_features(bars)
+    for name, value in row.items():
+        if name not in SAME_BAR:
+            assert value == pytest.approx(stored[name][-1], nan_ok=True), name
+
+
+def test_update_appends_the_same_rows_as_a_rebuild(tmp_path):
+    bars = ohlcv(random_walk(600))
+    store = FeatureStore(tmp_path)
+    store.update("X", bars.iloc[:500])
+    assert store.update("X", bars) == 100 and store.appended == 1
+    assert store.update("X", bars) == 0
+    fresh = FeatureStore(tmp_path / "fresh")
+    fresh.update("X", bars)
+    appended, rebuilt = store.view("X").frame(), fresh.view("X").frame()
+    np.testing.assert_array_equal(appended.to_numpy(), rebuilt.to_numpy())
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import qqa.features
+import qqa.forecast
+from qqa.features import FeatureStore, load_features
+from qqa.forecast import FEATURES, StackedFeatures, scale_free
+
+
+@pytest.fixture
+def feature_store(provider, tmp_path, monkeypatch):
+    feature_store = FeatureStore(tmp_path / "features")
+    monkeypatch.setattr(qqa.features, "store", feature_store)
+    monkeypatch.setattr(qqa.forecast, "store", feature_store)
+    return feature_store
+
+
+def test_latest_row_continues_the_stored_history(feature_store):
+    # Another session already stored a longer history than this range
+    later = load_features("AAPL", "2018-01-01", "2023-01-01")
+    data = StackedFeatures.load(["AAPL"], "2022-03-01", "2022-06-01")
+    row = int(np.searchsorted(later.dates, pd.Timestamp("2022-06-01", tz=later.dates.tz)))
+    expected = scale_free({name: later[name][row:row + 1] for name in later.columns})
+    np.testing.assert_allclose(data.latest[0], [expected[name][0] for name in FEATURES], rtol=1e-5)
+    assert data.last_date[0] < later.dates[row]
+
+
+def test_training_rows_are_complete_and_stacked(feature_store):
+    data = StackedFeatures.load(["AAPL", "MSFT", ""], "2020-01-01", "2022-01-01")
+    assert data.symbols == ["AAPL", "MSFT"] and not data.errors
+    assert data.X.shape == (len(data), len(FEATURES)) and np.isfinite(data.X).all()
+    (lo, hi), _ = data.bounds
+    assert (np.diff(data.dates[lo:hi]) > 0).all()
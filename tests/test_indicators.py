@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ohlcv, random_walk
+from qqa.indicators import CATEGORIES, INDICATORS, IndicatorSet, ewm_mean, rolling_std
+
+
+def baseline(df):
+    """The pandas expressions the Technical Indicators page used before ``IndicatorSet``."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _baseline(df)
+
+
+def _baseline(df):
+    close, high, low, volume = df["Close"], df["High"], df["Low"], df["Volume"]
+    out = {}
+    out["SMA"] = close.rolling(window=50).mean()
+    out["EMA"] = close.ewm(span=50, adjust=False).mean()
+    out["VWAP"] = (close * volume).cumsum() / volume.cumsum()
+    out["MACD"] = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    out["Signal_Line"] = out["MACD"].ewm(span=9, adjust=False).mean()
+    out["daily_return"] = close.pct_change()
+    out["rolling_volatility"] = out["daily_return"].rolling(window=30).std() * np.sqrt(252)
+    # The full three-way true range, as the Keltner channel used it (see IndicatorSet.true_range)
+    out["TR"] = np.maximum(high - low, np.maximum(abs(high - close.shift(1)), abs(low - close.shift(1))))
+    out["ATR"] = out["TR"].rolling(window=14).mean()
+    out["drawdown"] = close / close.cummax() - 1
+    out["ulcer_index"] = np.sqrt((out["drawdown"] ** 2).rolling(window=14).mean())
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    out["RSI"] = 100 - (100 / (1 + gain.rolling(window=14).mean() / loss.rolling(window=14).mean()))
+    low_14, high_14 = low.rolling(window=14).min(), high.rolling(window=14).max()
+    out["%K"] = 100 * (close - low_14) / (high_14 - low_14)
+    out["%D"] = out["%K"].rolling(window=3).mean()
+    max_close, min_close = close.rolling(window=10).max(), close.rolling(window=10).min()
+    value = 2 * ((close - min_close) / (max_close - min_close) - 0.5)
+    out["Fisher"] = 0.5 * np.log((1 + value) / (1 - value))
+    out["OBV"] = ((close.diff().gt(0) * 2 - 1) * volume).cumsum()
+    out["IIX"] = (((close - low) / (high - low)) * volume).rolling(window=14).mean()
+    mfv = ((close - low) - (high - close)) / (high - low) * volume
+    out["CMF"] = mfv.rolling(window=20).sum() / volume.rolling(window=20).sum()
+    out["bollinger_mid"] = close.rolling(window=20).mean()
+    out["upper_band"] = out["bollinger_mid"] + 2 * close.rolling(window=20).std()
+    out["lower_band"] = out["bollinger_mid"] - 2 * close.rolling(window=20).std()
+    out["keltner_mid"] = close.ewm(span=20).mean()
+    atr_20 = out["TR"].rolling(window=20).mean()
+    out["upper_keltner"] = out["keltner_mid"] + 2 * atr_20
+    out["lower_keltner"] = out["keltner_mid"] - 2 * atr_20
+    out["donchian_upper"] = high.rolling(window=20).max()
+    out["donchian_lower"] = low.rolling(window=20).min()
+    out["Daily Return"] = close.pct_change()
+    out["Cumulative Return"] = (1 + out["Daily Return"]).cumprod() - 1
+    out["Summed Return"] = close.pct_change().cumsum()
+    out["EFI"] = volume * (close - close.shift(1))
+    return out
+
+
+def assert_matches_baseline(df, skip=()):
+    expected = baseline(df)
+    computed = IndicatorSet.from_frame(df).compute()
+    assert computed["annualized_volatility"] == pytest.approx(df["Close"].pct_change().std() * np.sqrt(252))
+    for column, values in expected.items():
+        if column in skip:
+            continue
+        np.testing.assert_allclose(computed[column], values.to_numpy(dtype=float), rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=column)
+
+
+def test_matches_baseline_formulas(bars):
+    assert_matches_baseline(bars)
+
+
+def test_matches_baseline_with_gaps_and_flat_bars():
+    df = ohlcv(random_walk(300, seed=3))
+    df.iloc[40:43] = np.nan  # missing bars
+    df.iloc[100:120, :4] = 50.0  # a halted stretch: zero ranges and zero changes
+    # RSI is NaN rather than counting a missing close as no change (see the module docstring)
+    assert_matches_baseline(df, skip={"RSI"})
+    rsi = IndicatorSet.from_frame(df).rsi()["RSI"]
+    affected = df["Close"].isna().rolling(14, min_periods=1).max().astype(bool).to_numpy()
+    assert np.isnan(rsi[affected]).all()
+    np.testing.assert_allclose(rsi[~affected], baseline(df)["RSI"][~affected], rtol=1e-9, equal_nan=True)
+
+
+def test_short_history_is_all_nan_where_windows_do_not_fit():
+    df = ohlcv(random_walk(10))
+    computed = IndicatorSet.from_frame(df).compute(["SMA", "Bollinger", "Donchian"])
+    assert np.isnan(computed["SMA"]).all()
+    assert np.isnan(computed["upper_band"]).all()
+    assert np.isnan(computed["donchian_upper"]).all()
+
+
+def test_panel_matches_each_symbol():
+    frames = [ohlcv(random_walk(400, seed)) for seed in range(4)]
+    panel = {column: np.column_stack([df[column] for df in frames]) for column in frames[0]}
+    wide = IndicatorSet.from_panel(panel).compute()
+    for i, df in enumerate(frames):
+        single = IndicatorSet.from_frame(df).compute()
+        for column, values in single.items():
+            np.testing.assert_allclose(np.asarray(wide[column])[..., i], values, rtol=1e-12, equal_nan=True,
+                                       err_msg=column)
+
+
+def test_intermediates_are_shared():
+    ind = IndicatorSet.from_frame(ohlcv(random_walk(100)))
+    assert ind.atr()["TR"] is ind.true_range()
+    assert ind.atr(atr_window=20)["ATR"] is ind.average_true_range(20)
+    keltner = ind.keltner()
+    np.testing.assert_allclose(keltner["upper_keltner"] - keltner["keltner_mid"], 2 * ind.average_true_range(20))
+
+
+@pytest.mark.parametrize("adjust", [False, True])
+def test_ewm_mean_matches_pandas(adjust):
+    x = random_walk(500, seed=7)
+    x[:12] = np.nan  # a symbol listed after the start of the range
+    np.testing.assert_allclose(ewm_mean(x, 20, adjust), pd.Series(x).ewm(span=20, adjust=adjust).mean(), rtol=1e-12)
+    panel = np.column_stack([x, random_walk(500, seed=9)])
+    panel[200:203, 1] = np.nan  # a gap inside the history
+    np.testing.assert_allclose(ewm_mean(panel, 20, adjust), pd.DataFrame(panel).ewm(span=20, adjust=adjust).mean(),
+                               rtol=1e-12)
+
+
+def test_rolling_std_matches_pandas():
+    x = random_walk(500, seed=8) * 1e4  # large levels, where a naive sum of squares loses precision
+    np.testing.assert_allclose(rolling_std(x, 30), pd.Series(x).rolling(30).std(), rtol=1e-8, equal_nan=True)
+
+
+def test_categories_cover_every_group():
+    assert sorted(g for groups in CATEGORIES.values() for g in groups) == sorted(INDICATORS)
+
+
+def test_true_range_counts_gaps_down():
+    # The bar opens and trades far below the previous close; only |Low - prev Close| sees the whole move
+    df = pd.DataFrame({"Open": [100.0, 80.0], "High": [101.0, 82.0], "Low": [99.0, 79.0], "Close": [100.0, 81.0],
+                       "Volume": [1.0, 1.0]})
+    assert IndicatorSet.from_frame(df).true_range()[1] == 21.0
+    # The page's old ATR passed the third term positionally, i.e. as np.maximum's output: a two-way maximum
+    high, low, prev_close = df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].shift(1).to_numpy()
+    assert np.maximum(high - low, np.abs(high - prev_close), out=np.abs(low - prev_close))[1] == 18.0
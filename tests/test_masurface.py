@@ -0,0 +1,50 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from conftest import random_walk
+from qqa.masurface import MASurface, surface_for
+
+
+def test_rows_match_pandas(tmp_path):
+    close = random_walk(500)
+    surface = surface_for(close, range(5, 31), directory=tmp_path)
+    for period in (5, 17, 30):
+        expected = pd.Series(close).rolling(period).mean()
+        np.testing.assert_allclose(surface.sma(period), expected, rtol=1e-5)
+        expected = pd.Series(close).ewm(span=period, adjust=False).mean()
+        np.testing.assert_allclose(surface.ema(period), expected, rtol=1e-5)
+
+
+def test_concurrent_callers_build_once(tmp_path, monkeypatch):
+    calls = []
+    build = MASurface.build.__func__
+
+    def slow_build(cls, close, periods, out=None):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return build(cls, close, periods, out)
+
+    monkeypatch.setattr(MASurface, "build", classmethod(slow_build))
+    close = random_walk(2000)
+    start = threading.Barrier(4)
+    results = [None] * 4
+
+    def load(i):
+        start.wait()
+        results[i] = surface_for(close, directory=tmp_path).values
+
+    threads = [threading.Thread(target=load, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    for values in results:
+        np.testing.assert_array_equal(values, results[0])
+    assert np.isfinite(results[0][:, :, -1]).all()
+    assert [path.suffix for path in tmp_path.iterdir()] == [".npy"]
+    surface_for(close, directory=tmp_path)
+    assert len(calls) == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from qqa.metadata import HOUR, MetadataCache
+from qqa.upstream import coordinator
+
+FIELDS = ["longName", "industry", "marketCap", "trailingPE"]
+
+
+class PartialInfo:
+    """A provider whose ``info`` never has a P/E, as for loss-making companies."""
+
+    remote = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def info(self, symbol):
+        self.calls += 1
+        return {"longName": symbol.title(), "industry": "Software", "marketCap": 1e9}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    provider = PartialInfo()
+    monkeypatch.setattr(coordinator, "_provider", provider)
+    return provider
+
+
+def test_missing_fields_expire_like_fetched_ones(upstream, tmp_path):
+    cache = MetadataCache(tmp_path)
+    assert "trailingPE" not in cache.get("acme", FIELDS)
+    for _ in range(3):
+        cache.get("ACME", FIELDS)
+    assert upstream.calls == 1 and cache.hits == 3 and not cache.refreshing("ACME")
+    assert cache.expired("ACME", FIELDS) == []
+    later = cache._entry("ACME")["fetched"]["trailingPE"] + 13 * HOUR
+    assert cache.expired("ACME", FIELDS, now=later) == ["marketCap", "trailingPE"]
+
+
+def test_stale_reads_refresh_in_the_background(upstream, tmp_path):
+    cache = MetadataCache(tmp_path, ttls={}, default_ttl=0)
+    cache.get("ACME", FIELDS)
+    assert cache.get("ACME", FIELDS)["longName"] == "Acme"
+    refresh = cache._refreshing.get("ACME")
+    if refresh is not None:
+        refresh.result()
+    assert cache.stale == 1 and upstream.calls == 2
+    assert MetadataCache(tmp_path).get("ACME")["industry"] == "Software"
@@ -0,0 +1,42 @@
+import threading
+import time
+
+import numpy as np
+
+from qqa.models import ModelRegistry, model_key
+
+
+def run_together(target, count=4):
+    start = threading.Barrier(count)
+
+    def run(i):
+        start.wait()
+        target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_get_or_train_trains_once(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    key = model_key("AAPL", "2021-01-01", "2022-01-01", ["MA50"], {"n_estimators": 10})
+    results = [None] * 4
+
+    def train():
+        time.sleep(0.1)
+        return {"weights": np.arange(1000.0)}
+
+    run_together(lambda i: results.__setitem__(i, registry.get_or_train(key, train)))
+    assert registry.fits == 1 and all(result is results[0] for result in results)
+    assert ModelRegistry(tmp_path).get(key)["weights"].sum() == np.arange(1000.0).sum()
+
+
+def test_concurrent_puts_leave_one_complete_file(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    value = {"weights": np.arange(200_000.0)}
+    run_together(lambda i: registry.put("fold", value), count=8)
+    assert [path.name for path in tmp_path.iterdir()] == ["fold.joblib"]
+    np.testing.assert_array_equal(ModelRegistry(tmp_path).get("fold")["weights"], value["weights"])
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from qqa.plotting import (LAYOUT, aggregate_ohlc, downsample, downsample_figure, figure, lttb_indices, prepare_figure,
+                          use_webgl, wall_clock)
+from qqa.synthetic import random_walk
+
+
+def reference_lttb(x, y, threshold):
+    """Textbook Largest-Triangle-Three-Buckets, one bucket at a time."""
+    n = len(y)
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.int64), n)
+    kept, a = [0], 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_x, next_y = x[stop:edges[i + 2]].mean(), y[stop:edges[i + 2]].mean()
+        area = np.abs((x[a] - next_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept.append(a)
+    return np.array(kept + [n - 1])
+
+
+@pytest.mark.parametrize("n, threshold", [(10_000, 500), (2_600, 2_000), (4_001, 2_000), (101, 100), (5, 3)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.uniform(0.5, 1.5, n))
+    y = np.cumsum(rng.normal(size=n))
+    np.testing.assert_array_equal(lttb_indices(x, y, threshold), reference_lttb(x, y, threshold))
+
+
+def test_lttb_keeps_ends_and_spikes():
+    y = np.zeros(5000)
+    y[1234], y[3456] = 50.0, -50.0
+    kept = lttb_indices(np.arange(5000.0), y, 100)
+    assert len(kept) == 100 and kept[0] == 0 and kept[-1] == 4999
+    assert {1234, 3456} <= set(kept)
+    assert (np.diff(kept) > 0).all()
+
+
+def test_downsample_drops_gaps_and_keeps_short_series():
+    x = pd.date_range("2020-01-01", periods=5000)
+    y = np.sin(np.arange(5000) / 50)
+    y[100:200] = np.nan
+    rx, ry = downsample(x, y, 500)
+    assert len(ry) == 500 and np.isfinite(ry).all()
+    sx, sy = downsample(x[:300], y[:300], 500)
+    assert len(sy) == 300
+
+
+def test_downsample_figure_leaves_marker_scatters():
+    x = np.arange(5000.0)
+    fig = go.Figure([go.Scatter(x=x, y=x, mode="lines"), go.Scatter(x=x, y=x, mode="markers"),
+                     go.Bar(x=x, y=x)])
+    downsample_figure(fig, 1000)
+    assert [len(trace.y) for trace in fig.data] == [1000, 5000, 1000]
+
+
+def test_aggregate_ohlc_resamples_to_coarser_bars():
+    df = random_walk(3000).reset_index()
+    bars, label = aggregate_ohlc(df, max_bars=400)
+    assert label == "monthly" and len(bars) <= 400
+    month = df[(df["Date"] >= "2000-02-01") & (df["Date"] < "2000-03-01")]
+    row = bars.set_index("Date").loc["2000-02-01"]
+    assert row["Open"] == month["Open"].iloc[0] and row["Close"] == month["Close"].iloc[-1]
+    assert row["High"] == month["High"].max() and row["Low"] == month["Low"].min()
+    assert row["Volume"] == pytest.approx(month["Volume"].sum())
+
+
+def test_aggregate_ohlc_keeps_frames_that_fit():
+    df = random_walk(300).reset_index()
+    bars, label = aggregate_ohlc(df, max_bars=400)
+    assert label is None and bars is df
+
+
+def test_figure_starts_from_the_shared_layout():
+    fig = figure(go.Scatter(y=[1, 2]), title="Prices", margin={"t": 80})
+    assert fig.layout.title.text == "Prices"
+    assert fig.layout.margin.t == 80 and fig.layout.margin.l == LAYOUT["margin"]["l"]
+    assert fig.layout.uirevision == LAYOUT["uirevision"]
+
+
+def test_prepare_encodes_dates_as_wall_clock_milliseconds():
+    dates = pd.date_range("2024-01-01 09:15", periods=3, freq="D", tz="Asia/Kolkata")
+    fig = prepare_figure(go.Figure(go.Scatter(x=dates, y=np.array([1.0, 2.0, 3.0]))))
+    spec = json.loads(pio.to_json(fig))
+    assert spec["layout"]["xaxis"]["type"] == "date"
+    assert "bdata" in spec["data"][0]["x"] and "bdata" in spec["data"][0]["y"]
+    milliseconds = np.asarray(fig.data[0].x)
+    assert pd.Timestamp(milliseconds[0], unit="ms") == pd.Timestamp("2024-01-01 09:15")
+    assert wall_clock(dates)[0] == pd.Timestamp("2024-01-01 09:15")
+
+
+def test_prepare_fills_in_layout_without_overriding():
+    fig = prepare_figure(go.Figure(go.Bar(x=["A", "B"], y=[1, 2]), layout={"uirevision": "mine"}))
+    assert fig.layout.uirevision == "mine" and fig.layout.margin.l == LAYOUT["margin"]["l"]
+    assert list(fig.data[0].x) == ["A", "B"]
+
+
+def test_subplot_axes_get_their_date_type():
+    from plotly.subplots import make_subplots
+
+    dates = pd.date_range("2024-01-01", periods=10)
+    fig = make_subplots(rows=2, cols=1)
+    fig.add_trace(go.Scatter(x=dates, y=np.arange(10.0)), 2, 1)
+    prepare_figure(fig)
+    assert fig.layout.xaxis2.type == "date" and fig.layout.xaxis.type is None
+
+
+def test_webgl_above_the_threshold_only():
+    x = np.arange(3000.0)
+    small = use_webgl(figure(go.Scatter(x=x, y=x)), threshold=5000)
+    assert small.data[0].type == "scatter"
+    large = use_webgl(figure(*(go.Scatter(x=x, y=x + i, fill="tonexty") for i in range(3))), threshold=5000)
+    assert [trace.type for trace in large.data] == ["scattergl"] * 3
+    assert large.data[1].fill == "tonexty"
+
+
+def test_webgl_is_all_or_nothing():
+    x = np.arange(3000.0)
+    fig = figure(go.Scatter(x=x, y=x), go.Scatter(x=x, y=x, line_shape="spline"))
+    assert [trace.type for trace in use_webgl(fig, threshold=1000).data] == ["scatter", "scatter"]
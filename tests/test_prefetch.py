@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from qqa import prefetch
+from qqa.prefetch import Prefetcher
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Replace the prefetch steps with ones recording ``(step, symbol)`` as they run."""
+    ran = []
+    monkeypatch.setattr(prefetch, "_STEP_FUNCTIONS",
+                        {step: (lambda symbol, *_, step=step: ran.append((step, symbol))) for step in prefetch.STEPS})
+    return ran
+
+
+def run_in_thread(target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+
+def test_page_runs_block_prefetch_until_they_exit(steps):
+    prefetcher = Prefetcher(max_workers=1)
+    prefetcher.enter("session")
+    futures = prefetcher.warm("aapl", "2024-01-01", "2024-06-01", owner="session")
+    time.sleep(0.2)
+    assert not steps and len(futures) == len(prefetch.STEPS)
+    prefetcher.exit("session")
+    for future in futures:
+        future.result(timeout=5)
+    assert steps == [(step, "AAPL") for step in prefetch.STEPS]
+
+
+def test_an_interrupted_run_stops_blocking_when_its_thread_exits(steps):
+    prefetcher = Prefetcher(max_workers=1)
+    # A page run stopped by an exception: enter without exit on the script thread
+    run_in_thread(lambda: prefetcher.enter("stopped"))
+    futures = prefetcher.warm("AAPL", "2024-01-01", "2024-06-01", owner="stopped")
+    futures[-1].result(timeout=5)
+    assert len(steps) == len(prefetch.STEPS)
+
+
+def test_a_rerun_replaces_the_sessions_run():
+    prefetcher = Prefetcher(max_workers=0)
+    prefetcher.enter("session")
+    prefetcher.enter("session")
+    prefetcher.exit("session")
+    with prefetcher._lock:
+        assert not prefetcher._busy()
+
+
+def test_finished_selections_are_forgotten(steps, monkeypatch):
+    prefetcher = Prefetcher(max_workers=1)
+    for i in range(5):
+        prefetcher.warm("AAPL", f"2024-01-0{i + 1}", "2024-06-01", owner=f"session {i}")[-1].result(timeout=5)
+    assert len(prefetcher._warmed) == 5
+    monkeypatch.setattr(prefetch, "WARM_SECONDS", 0)
+    prefetcher.warm("MSFT", "2024-01-01", "2024-06-01", owner="session 0")[-1].result(timeout=5)
+    assert list(prefetcher._warmed) == [("MSFT", "2024-01-01", "2024-06-01")]
+    assert list(prefetcher._pending) == ["session 0"]
+
+
+def test_a_new_selection_cancels_queued_steps(steps):
+    prefetcher = Prefetcher(max_workers=1)
+    prefetcher.enter("other")
+    first = prefetcher.warm("AAPL", "2024-01-01", "2024-06-01", owner="session")
+    assert prefetcher.warm("AAPL", "2024-01-01", "2024-06-01", owner="session") is first
+    second = prefetcher.warm("MSFT", "2024-01-01", "2024-06-01", owner="session")
+    assert all(future.cancelled() for future in first[1:])
+    prefetcher.exit("other")
+    second[-1].result(timeout=5)
+    assert [symbol for _, symbol in steps].count("MSFT") == len(prefetch.STEPS)
+    assert prefetcher.warm("MSFT", "2024-01-01", "2024-06-01", owner="another") == []
@@ -0,0 +1,82 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ohlcv, random_walk
+from qqa.indicators import IndicatorSet
+from qqa.streaming import StreamingIndicators
+
+
+def dip_then_rally(seed):
+    dip = random_walk(20, seed)
+    return np.concatenate([dip, dip[-1] * np.cumprod(np.full(400, 1.01))])
+
+
+SERIES = {
+    "random walk": random_walk(1500),
+    "steady rise": 100 * np.cumprod(np.full(2000, 1.001)),
+    "steady fall": 100 * np.cumprod(np.full(2000, 0.999)),
+    "dip then rally": dip_then_rally(1),
+    "flat": np.full(300, 100.0),
+}
+
+
+def stream(df):
+    indicators = StreamingIndicators()
+    return pd.DataFrame([indicators.update(*bar) for bar in zip(*(df[c].tolist() for c in df))])
+
+
+@pytest.mark.parametrize("name", SERIES)
+def test_matches_indicator_set(name):
+    df = ohlcv(SERIES[name])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        streamed = stream(df)
+    expected = IndicatorSet.from_frame(df).compute()
+    for column, values in expected.items():
+        if np.ndim(values) == 0:
+            continue  # full-sample statistics (annualized volatility) have no running equivalent
+        np.testing.assert_allclose(streamed[column], values, rtol=1e-7, atol=1e-8, equal_nan=True, err_msg=column)
+
+
+def test_matches_indicator_set_with_missing_fields():
+    df = ohlcv(random_walk(400, seed=5))
+    df.iloc[:3] = np.nan  # listed after the start of the range
+    df.iloc[100:103] = np.nan  # missing bars
+    df.iloc[150, df.columns.get_loc("Close")] = np.nan
+    df.iloc[200, df.columns.get_loc("Volume")] = np.nan
+    df.iloc[250, df.columns.get_loc("High")] = np.nan
+    df.iloc[300, df.columns.get_loc("Low")] = np.nan
+    streamed = stream(df)
+    expected = IndicatorSet.from_frame(df).compute()
+    for column, values in expected.items():
+        if np.ndim(values) == 0:
+            continue
+        np.testing.assert_allclose(streamed[column], values, rtol=1e-7, atol=1e-8, equal_nan=True, err_msg=column)
+    # Nothing stays NaN once the windows are clear of the gaps
+    assert streamed.iloc[-1].notna().all()
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_ulcer_index_after_new_highs(seed):
+    streamed = stream(ohlcv(dip_then_rally(seed), seed))
+    assert (streamed["ulcer_index"].iloc[13:] >= 0).all()
+    assert streamed["ulcer_index"].iloc[-1] == 0
+
+
+def test_from_frame_without_warnings():
+    df = ohlcv(np.full(40, 100.0))
+    df["High"] = df["Low"] = df["Close"]  # zero ranges divide by zero in IIX and CMF
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        StreamingIndicators.from_frame(df)
+
+
+def test_checkpoint_resumes(bars):
+    head, tail = bars.iloc[:300], bars.iloc[300:]
+    resumed = StreamingIndicators.restore(StreamingIndicators.from_frame(head).checkpoint())
+    whole = StreamingIndicators.from_frame(head)
+    for bar in zip(*(tail[c].tolist() for c in tail)):
+        assert resumed.update(*bar) == pytest.approx(whole.update(*bar), nan_ok=True)
@@ -0,0 +1,183 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from qqa.providers import Provider, RateLimited, SimulatedProvider, Unavailable, _raise_upstream_error
+from qqa.upstream import FetchCoordinator, KeyedLocks, SingleFlight, TokenBucket
+
+START, END = "2024-01-01", "2024-07-01"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Flaky(Provider):
+    """Fails ``failures`` times with ``error`` before answering."""
+
+    remote = True
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def info(self, symbol):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return {"symbol": symbol}
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(7)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3:] == pytest.approx([0.5] * 4)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_token_bucket_penalty_delays_the_next_request():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, burst=4, clock=clock, sleep=clock.sleep)
+    bucket.penalise(2.0)
+    assert bucket.acquire() == pytest.approx(2.25)
+
+
+def test_keyed_locks_serialise_a_key_and_are_dropped_after_use():
+    locks = KeyedLocks()
+    inside, overlaps = [], []
+
+    def work(i):
+        with locks(("AAPL", "1d")):
+            overlaps.append(len(inside))
+            inside.append(i)
+            threading.Event().wait(0.01)
+            inside.remove(i)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(16)))
+    assert overlaps == [0] * 16 and len(locks) == 0
+
+    reentrant = KeyedLocks(reentrant=True)
+    with reentrant("key"), reentrant("key"):
+        assert len(reentrant) == 1
+    assert len(reentrant) == 0
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "value"
+
+    with ThreadPoolExecutor(5) as pool:
+        leader = pool.submit(flight.do, "key", slow)
+        started.wait()
+        followers = [pool.submit(flight.do, "key", slow) for _ in range(4)]
+        while flight.shared < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+    assert calls == [1]
+    assert results == [("value", False)] + [("value", True)] * 4
+
+
+def test_concurrent_history_requests_are_coalesced():
+    provider = SimulatedProvider(latency=0.3, rate=100)
+    coordinator = FetchCoordinator(rate=100, burst=100, provider=provider)
+    with ThreadPoolExecutor(8) as pool:
+        frames = list(pool.map(lambda _: coordinator.history("AAPL", START, END), range(8)))
+    assert provider.calls == 1
+    assert all(frame.equals(frames[0]) for frame in frames)
+    # Followers get copies, so editing one session's frame leaves the others alone
+    assert len({id(frame) for frame in frames}) == 8
+
+
+def test_bucket_keeps_requests_under_the_upstream_limit():
+    provider = SimulatedProvider(latency=0, rate=3)
+    coordinator = FetchCoordinator(rate=2, burst=2, provider=provider)
+    for symbol in ["A", "B", "C", "D", "E", "F"]:
+        coordinator.history(symbol, START, END)
+    assert provider.calls == 6
+    assert provider.throttled == 0
+
+
+def test_throttled_requests_are_retried_until_they_succeed():
+    provider = SimulatedProvider(latency=0, rate=2)
+    coordinator = FetchCoordinator(rate=1000, burst=1000, backoff=0.01, provider=provider)
+    frames = [coordinator.history(symbol, START, END) for symbol in ["A", "B", "C", "D"]]
+    assert all(len(frame) for frame in frames)
+    assert provider.throttled > 0
+    assert coordinator.retried == provider.throttled
+
+
+def test_backoff_grows_and_honours_retry_after():
+    delays = []
+    coordinator = FetchCoordinator(retries=4, backoff=0.5, provider=Flaky(3, Unavailable("reset")),
+                                   sleep=delays.append)
+    assert coordinator.info("AAPL") == {"symbol": "AAPL"}
+    assert len(delays) == 3
+    for attempt, delay in enumerate(delays):
+        assert 0.25 * 2 ** attempt <= delay <= 0.5 * 2 ** attempt
+
+    delays.clear()
+    clock = FakeClock()
+    coordinator = FetchCoordinator(provider=Flaky(1, RateLimited(retry_after=3.0)), sleep=delays.append)
+    coordinator.bucket = TokenBucket(rate=4, burst=8, clock=clock, sleep=clock.sleep)
+    coordinator.info("AAPL")
+    assert delays[0] >= 3.0
+    # The retry also waited for the bucket the 429 emptied
+    assert clock.now == pytest.approx(3.25)
+
+
+def test_gives_up_after_the_last_retry():
+    provider = Flaky(10, RateLimited())
+    coordinator = FetchCoordinator(retries=2, provider=provider, sleep=lambda _: None)
+    with pytest.raises(RateLimited):
+        coordinator.info("AAPL")
+    assert provider.calls == 3
+
+
+def test_other_errors_are_not_retried():
+    provider = Flaky(1, KeyError("no such field"))
+    coordinator = FetchCoordinator(provider=provider, sleep=lambda _: None)
+    with pytest.raises(KeyError):
+        coordinator.info("AAPL")
+    assert provider.calls == 1
+
+
+def test_transport_errors_become_retryable():
+    requests = pytest.importorskip("requests")
+    for error in (requests.exceptions.ConnectionError("reset"), requests.exceptions.ReadTimeout("slow")):
+        with pytest.raises(Unavailable):
+            _raise_upstream_error(error)
+    response = requests.Response()
+    response.status_code = 503
+    with pytest.raises(Unavailable):
+        _raise_upstream_error(requests.exceptions.HTTPError("unavailable", response=response))
+    response.status_code = 404
+    with pytest.raises(requests.exceptions.HTTPError):
+        _raise_upstream_error(requests.exceptions.HTTPError("not found", response=response))
+
+
+def test_curl_transport_errors_become_retryable():
+    exceptions = pytest.importorskip("curl_cffi.requests.exceptions")
+    with pytest.raises(Unavailable):
+        _raise_upstream_error(exceptions.ConnectionError("reset"))
+    with pytest.raises(Unavailable):
+        _raise_upstream_error(exceptions.Timeout("timed out"))